@@ -0,0 +1,112 @@
+import os
+import time
+import threading
+import collections
+
+from speculation import speculative
+
+# --- Agenda Store Configuration ---
+MAX_MEETINGS = 10000          # Meetings tracked at once before the least recently used is dropped
+MEETING_IDLE_SECONDS = 4 * 3600  # Meetings untouched this long are treated as finished
+
+_parsed_agendas = {}
+_parse_lock = threading.Lock()
+
+
+@speculative()
+def load_agenda(file_path):
+    """
+    Parses an agenda file into a tuple of items. The result is cached by the
+    file's mtime and size, so the file is only re-read after it changes, and
+    every meeting using the same file shares one immutable tuple.
+    """
+    stat = os.stat(file_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _parse_lock:
+        cached = _parsed_agendas.get(file_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    print(f"DEBUG: Reading agenda from: {file_path}")
+    with open(file_path, 'r') as f:
+        items = tuple(line.strip() for line in f if line.strip())
+    with _parse_lock:
+        _parsed_agendas[file_path] = (key, items)
+    return items
+
+
+class MeetingAgenda:
+    """Per-meeting agenda position; slots keep each of many meetings small."""
+
+    __slots__ = ("items", "current_item_index", "last_used")
+
+    def __init__(self, items):
+        self.items = items
+        self.current_item_index = -1
+        self.last_used = time.monotonic()
+
+
+class AgendaStore:
+    """
+    Agenda state for every meeting the process is serving, keyed by meeting ID.
+
+    Lookups are O(1) in an OrderedDict kept in least-recently-used order, which
+    also makes eviction cheap: meetings idle for longer than `idle_seconds`
+    or beyond `max_meetings` are dropped from the front, and `end_meeting`
+    drops one explicitly.
+    """
+
+    def __init__(self, max_meetings=MAX_MEETINGS, idle_seconds=MEETING_IDLE_SECONDS):
+        self.max_meetings = max_meetings
+        self.idle_seconds = idle_seconds
+        self._meetings = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _evict(self, now):
+        while self._meetings:
+            meeting_id, state = next(iter(self._meetings.items()))
+            if len(self._meetings) <= self.max_meetings and now - state.last_used < self.idle_seconds:
+                break
+            del self._meetings[meeting_id]
+            self.evictions += 1
+
+    def start(self, meeting_id, items):
+        """(Re)starts a meeting's agenda from the top."""
+        now = time.monotonic()
+        with self._lock:
+            state = MeetingAgenda(items)
+            state.last_used = now
+            self._meetings[meeting_id] = state
+            self._meetings.move_to_end(meeting_id)
+            self._evict(now)
+            return state
+
+    def advance(self, meeting_id):
+        """
+        Moves a meeting to its next item. Returns the item, None once the agenda
+        is finished, or raises KeyError if the agenda was never read.
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._meetings[meeting_id]
+            state.last_used = now
+            self._meetings.move_to_end(meeting_id)
+            state.current_item_index += 1
+            if state.current_item_index < len(state.items):
+                return state.items[state.current_item_index]
+            return None
+
+    def get(self, meeting_id):
+        with self._lock:
+            return self._meetings.get(meeting_id)
+
+    def end_meeting(self, meeting_id):
+        with self._lock:
+            return self._meetings.pop(meeting_id, None) is not None
+
+    def __len__(self):
+        return len(self._meetings)
+
+
+agenda_store = AgendaStore()
@@ -1,62 +1,78 @@
 import os
+import sys
 from google.adk.agents import Agent
+from google.adk.tools import ToolContext
 
-# --- The rest of your code remains the same ---
+sys.path.append('..')
+from tracing import (
+    trace_model_start, trace_model_end, trace_model_error, trace_tool_start, trace_tool_end, trace_tool_error,
+)
+from context_budget import context_budget, budget_context, record_prompt_tokens
+from note_store import meeting_id_from_context
+from response_cache import invalidate_responses
+from agenda_tracker_agent.agenda_store import agenda_store, load_agenda
 
-meeting_state = {
-    "agenda": [],
-    "current_item_index": -1
-}
+# Agenda used when the session state does not name one ("agenda_path").
+DEFAULT_AGENDA_PATH = os.path.join(os.path.dirname(__file__), 'agenda.txt')
 
-# --- Tool 1: Read the agenda (Corrected Version) ---
+# --- Tool 1: Read the agenda ---
 
-def read_the_full_agenda() -> dict:
+def read_the_full_agenda(tool_context: ToolContext = None) -> dict:
     """
     Reads the meeting agenda from the 'agenda.txt' file,
     stores it in memory, and returns the full agenda.
     This should be the first tool called in any meeting.
     """
     try:
-        # Get the directory where this python script is located
-        script_dir = os.path.dirname(__file__)
-        
-        # Create the full path to the agenda.txt file
-        file_path = os.path.join(script_dir, 'agenda.txt')
-        
-        print(f"DEBUG: Attempting to read agenda from: {file_path}")
+        file_path = DEFAULT_AGENDA_PATH
+        if tool_context is not None:
+            file_path = tool_context.state.get("agenda_path") or DEFAULT_AGENDA_PATH
 
-        with open(file_path, 'r') as f:
-            agenda_items = [line.strip() for line in f.readlines()]
+        agenda_items = load_agenda(file_path)
+        meeting_id = meeting_id_from_context(tool_context)
+        agenda_store.start(meeting_id, agenda_items)
+        invalidate_responses(meeting_id)
         
-        meeting_state["agenda"] = agenda_items
-        meeting_state["current_item_index"] = -1
-        
-        return {"status": "success", "agenda": agenda_items}
+        return {"status": "success", "agenda": list(agenda_items)}
     except FileNotFoundError:
         # Return a more specific error message
         return {"status": "error", "message": "The 'agenda.txt' file was not found. Please ensure it is in the same folder as the agent.py script."}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-# --- The rest of your code (Tool 2 and Agent Definition) remains the same ---
-def get_next_agenda_item() -> dict:
+# --- Tool 2: Step through the agenda ---
+def get_next_agenda_item(tool_context: ToolContext = None) -> dict:
     """
     Gets the next item from the agenda that is stored in memory.
     Call this when the user asks 'what's next?' or to move on.
     """
-    if not meeting_state["agenda"]:
+    meeting_id = meeting_id_from_context(tool_context)
+    try:
+        next_item = agenda_store.advance(meeting_id)
+    except KeyError:
         return {"status": "error", "message": "The agenda has not been read yet. Please call 'read_the_full_agenda' first."}
-        
-    meeting_state["current_item_index"] += 1
-    
-    index = meeting_state["current_item_index"]
+    invalidate_responses(meeting_id)
     
-    if index < len(meeting_state["agenda"]):
-        next_item = meeting_state["agenda"][index]
+    if next_item is not None:
         return {"status": "success", "next_item": next_item}
     else:
         return {"status": "finished", "message": "We have reached the end of the agenda."}
 
+# --- The only context this agent needs besides the request ---
+def agenda_slice(callback_context):
+    """Where this meeting is in its agenda, so the model never needs the conversation history."""
+    meeting = agenda_store.get(meeting_id_from_context(callback_context))
+    if meeting is None:
+        return "Agenda status: the agenda has not been read yet in this meeting."
+    index = meeting.current_item_index
+    if index < 0:
+        return f"Agenda status: read, {len(meeting.items)} items, none discussed yet."
+    if index >= len(meeting.items):
+        return f"Agenda status: all {len(meeting.items)} items have been covered."
+    return f"Agenda status: on item {index + 1} of {len(meeting.items)}: {meeting.items[index]}."
+
+context_budget.add_state_slice("agenda_tracker_agent", agenda_slice)
+
 root_agent = Agent(
     name="agenda_tracker_agent",
     model="gemini-2.0-flash",
@@ -68,6 +84,12 @@ root_agent = Agent(
     2.  When the user asks "what's next?" or to move on, you MUST call the `get_next_agenda_item` tool.
     3.  Politely inform the user if they try to get the next item before reading the agenda first.
     """,
-    tools=[read_the_full_agenda, get_next_agenda_item]
+    tools=[read_the_full_agenda, get_next_agenda_item],
+    before_model_callback=[budget_context, trace_model_start],
+    after_model_callback=[record_prompt_tokens, trace_model_end],
+    before_tool_callback=trace_tool_start,
+    after_tool_callback=trace_tool_end,
+    on_model_error_callback=trace_model_error,
+    on_tool_error_callback=trace_tool_error,
 )
 
@@ -0,0 +1,186 @@
+import time
+import queue
+import threading
+import collections
+import concurrent.futures
+import numpy as np
+
+from model_manager import get_model_manager
+
+# --- Batch Decoder Configuration ---
+MAX_BATCH_SIZE = 8            # Clips decoded in one encoder pass
+BATCH_WINDOW_MS = 50          # Longest the oldest pending clip waits for others to join
+CHUNK_SECONDS = 30            # Whisper's fixed input window; longer clips are split
+SAMPLE_RATE = 16000
+STATS_WINDOW = 1000
+
+
+def _to_float32(audio):
+    if isinstance(audio, (bytes, bytearray)):
+        audio = np.frombuffer(audio, dtype=np.int16)
+    if audio.dtype == np.int16:
+        return audio.astype(np.float32) / 32768.0
+    return audio.astype(np.float32, copy=False)
+
+
+def _chunks(audio):
+    """Splits a clip into Whisper-sized 30 s pieces (one piece for anything shorter)."""
+    size = CHUNK_SECONDS * SAMPLE_RATE
+    if len(audio) <= size:
+        return [audio]
+    return [audio[start:start + size] for start in range(0, len(audio), size)]
+
+
+def decode_batch(audios, model_type, language="en", backend=None, max_batch=MAX_BATCH_SIZE):
+    """
+    Decodes clips that already form a batch and returns their transcripts in
+    order. Clips longer than 30 s are split and their pieces rejoined; more
+    than `max_batch` pieces are decoded in several encoder passes. Each pass
+    borrows one model replica, so concurrent callers decode in parallel.
+    """
+    pieces = [_chunks(_to_float32(audio)) for audio in audios]
+    clips = [chunk for chunks in pieces for chunk in chunks]
+    texts = []
+    for start in range(0, len(clips), max_batch):
+        texts.extend(get_model_manager().transcribe_batch(
+            clips[start:start + max_batch], model_type, language, backend
+        ))
+    transcripts, position = [], 0
+    for chunks in pieces:
+        parts = texts[position:position + len(chunks)]
+        position += len(chunks)
+        transcripts.append(" ".join(part for part in parts if part).strip())
+    return transcripts
+
+
+class _Job:
+    __slots__ = ("audio", "chunks", "future", "submitted")
+
+    def __init__(self, audio, future):
+        self.audio = audio
+        self.chunks = max(1, -(-len(audio) // (CHUNK_SECONDS * SAMPLE_RATE)))   # 30 s pieces
+        self.future = future
+        self.submitted = time.perf_counter()
+
+
+class BatchDecoder:
+    """
+    Collects utterances from any number of callers and decodes them together.
+
+    `submit` returns a concurrent.futures.Future. A background thread waits
+    for the first pending clip, then keeps collecting until `max_batch` clips
+    are queued or `max_wait_ms` has passed since that first one, pads every
+    clip to a 30 s mel window and decodes the batch with a single encoder
+    pass (`ModelManager.transcribe_batch`). Each caller's future gets its own
+    transcript. Clips longer than 30 s are split and their pieces rejoined.
+    """
+
+    def __init__(self, model_type, language="en", backend=None, max_batch=MAX_BATCH_SIZE,
+                 max_wait_ms=BATCH_WINDOW_MS):
+        self.model_type = model_type
+        self.language = language
+        self.backend = backend
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="batch-decoder", daemon=True)
+        self._thread.start()
+        self.batches = 0
+        self.clips = 0
+        self.batch_sizes = collections.deque(maxlen=STATS_WINDOW)
+        self.queue_waits = collections.deque(maxlen=STATS_WINDOW)
+
+    def submit(self, audio):
+        """Queues int16/float32 audio (or raw int16 bytes); the future resolves to its transcript."""
+        future = concurrent.futures.Future()
+        self._queue.put(_Job(_to_float32(audio), future))
+        return future
+
+    def transcribe(self, audio):
+        return self.submit(audio).result()
+
+    def transcribe_many(self, audios):
+        """Submits every clip at once so they can share batches; returns the transcripts in order."""
+        futures = [self.submit(audio) for audio in audios]
+        return [future.result() for future in futures]
+
+    def _collect(self, first):
+        jobs = [first]
+        pieces = first.chunks
+        deadline = first.submitted + self.max_wait
+        while pieces < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                self._queue.put(None)
+                break
+            jobs.append(job)
+            pieces += job.chunks
+        return jobs
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            jobs = self._collect(first)
+            started = time.perf_counter()
+            try:
+                transcripts = decode_batch([job.audio for job in jobs], self.model_type, self.language,
+                                           self.backend, self.max_batch)
+            except Exception as e:
+                print(f"ERROR: Batched decode of {len(jobs)} clips failed. {e}")
+                for job in jobs:
+                    job.future.set_exception(e)
+                continue
+
+            for job, transcript in zip(jobs, transcripts):
+                self.queue_waits.append(started - job.submitted)
+                job.future.set_result(transcript)
+            clips = sum(job.chunks for job in jobs)
+            self.batches += 1
+            self.clips += clips
+            self.batch_sizes.append(clips)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        waits = sorted(self.queue_waits)
+        return {
+            "batches": self.batches,
+            "clips": self.clips,
+            "avg_batch_size": round(sum(self.batch_sizes) / len(self.batch_sizes), 2) if self.batch_sizes else None,
+            "queue_wait_p50_ms": round(waits[len(waits) // 2] * 1000, 1) if waits else None,
+            "max_batch": self.max_batch,
+            "max_wait_ms": round(self.max_wait * 1000),
+        }
+
+
+# --- Process-wide instance ---
+_decoder = None
+_decoder_lock = threading.Lock()
+
+def configure_batch_decoder(model_type, language="en", backend=None, max_batch=MAX_BATCH_SIZE,
+                            max_wait_ms=BATCH_WINDOW_MS):
+    """Replaces the shared decoder, e.g. with another batch size or deadline."""
+    global _decoder
+    with _decoder_lock:
+        if _decoder is not None:
+            _decoder.close()
+        _decoder = BatchDecoder(model_type, language, backend, max_batch, max_wait_ms)
+        return _decoder
+
+def get_batch_decoder(model_type, language="en"):
+    """Returns the shared decoder, creating it for `model_type` on first use."""
+    global _decoder
+    with _decoder_lock:
+        if _decoder is None:
+            _decoder = BatchDecoder(model_type, language)
+        return _decoder
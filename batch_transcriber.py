@@ -0,0 +1,206 @@
+import os
+import sys
+import json
+import time
+import wave
+import argparse
+import concurrent.futures
+import numpy as np
+import webrtcvad
+
+import model_manager
+import transcriber_whisper
+from segmentation import BlockSegmenter
+from transcriber_whisper import (
+    FRAME_SIZE,
+    SAMPLE_RATE,
+    VAD_AGGRESSIVENESS,
+    UtteranceSegmenter,
+    transcribe_audio,
+)
+
+# --- Batch Configuration ---
+AUDIO_EXTENSIONS = (".wav", ".flac")
+DEFAULT_OUTPUT_DIR = "transcripts"
+
+
+# --- Step 1: Load recordings as 16 kHz mono int16 ---
+
+def _resample(samples, source_rate):
+    """Linear resampling to SAMPLE_RATE; deterministic so segmentation is reproducible."""
+    if source_rate == SAMPLE_RATE:
+        return samples
+    duration = len(samples) / source_rate
+    target_length = int(round(duration * SAMPLE_RATE))
+    source_times = np.arange(len(samples)) / source_rate
+    target_times = np.arange(target_length) / SAMPLE_RATE
+    return np.interp(target_times, source_times, samples.astype(np.float64))
+
+def load_audio(path):
+    """Reads a WAV or FLAC file and returns 16 kHz mono int16 samples."""
+    if path.lower().endswith(".flac"):
+        try:
+            import soundfile
+        except ImportError:
+            raise RuntimeError("Reading FLAC files requires the 'soundfile' package.")
+        samples, rate = soundfile.read(path, dtype="int16", always_2d=True)
+        samples = samples.mean(axis=1)
+    else:
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise RuntimeError(f"{path}: only 16-bit PCM WAV files are supported.")
+            rate = wav.getframerate()
+            channels = wav.getnchannels()
+            raw = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        samples = raw.reshape(-1, channels).mean(axis=1) if channels > 1 else raw
+
+    samples = _resample(samples, rate)
+    return np.clip(np.round(samples), -32768, 32767).astype(np.int16)
+
+def find_audio_files(inputs):
+    """Expands the given files and directories into a sorted list of recordings."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                paths.extend(
+                    os.path.join(root, name) for name in names
+                    if name.lower().endswith(AUDIO_EXTENSIONS)
+                )
+        else:
+            paths.append(item)
+    return sorted(paths)
+
+
+# --- Step 2: Offline VAD segmentation (same rules as the live pipeline) ---
+
+def segment_audio(samples):
+    """
+    Runs webrtcvad over the recording frame by frame and returns utterance
+    boundaries as (start_sample, end_sample) pairs. This runs in the parent
+    process only, so the segments never depend on the worker count.
+    """
+    vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+    segmenter = UtteranceSegmenter()
+    segments = []
+    start = None
+    frame_count = len(samples) // FRAME_SIZE
+    for i in range(frame_count):
+        offset = i * FRAME_SIZE
+        frame = samples[offset:offset + FRAME_SIZE].tobytes()
+        event = segmenter.push(vad.is_speech(frame, SAMPLE_RATE))
+        if event == "start":
+            start = offset
+        elif event == "end":
+            segments.append((start, offset + FRAME_SIZE))
+            start = None
+    if start is not None:
+        segments.append((start, frame_count * FRAME_SIZE))
+    return segments
+
+def segment_audio_vectorized(samples):
+    """
+    Same boundaries rule as `segment_audio`, but with the block-wise NumPy
+    energy VAD from `segmentation` instead of one webrtcvad call per frame.
+    The recording is already in memory, so no ring buffer copy is kept.
+    """
+    segmenter = BlockSegmenter()
+    return [(start, end) for start, end, _ in segmenter.utterances(samples)]
+
+SEGMENTERS = {
+    "webrtc": segment_audio,
+    "numpy": segment_audio_vectorized,
+}
+
+
+# --- Step 3: Worker processes (one Whisper model per process) ---
+
+def _init_worker(model_type, backend):
+    model_manager.configure_model_manager(backend=backend)
+    transcriber_whisper.MODEL_TYPE = model_type
+    transcriber_whisper.initialize_model()
+
+def _decode_segment(audio):
+    return transcribe_audio(audio)
+
+
+# --- Step 4: Drive the pool and write transcripts ---
+
+def _format_timestamp(seconds):
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+def transcribe_file(path, executor, output_dir, segmenter="webrtc"):
+    """Segments one recording, decodes the segments on the pool and writes its transcript."""
+    started = time.perf_counter()
+    samples = load_audio(path)
+    segments = SEGMENTERS[segmenter](samples)
+    segmented = time.perf_counter()
+
+    # map() yields results in submission order regardless of which worker finished first.
+    texts = list(executor.map(_decode_segment, [samples[start:end] for start, end in segments]))
+    finished = time.perf_counter()
+
+    base_name = os.path.splitext(os.path.basename(path))[0]
+    transcript_path = os.path.join(output_dir, f"{base_name}.transcript.txt")
+    with open(transcript_path, "w") as f:
+        for (start, end), text in zip(segments, texts):
+            if text:
+                f.write(f"[{_format_timestamp(start / SAMPLE_RATE)} --> "
+                        f"{_format_timestamp(end / SAMPLE_RATE)}] {text}\n")
+
+    audio_seconds = len(samples) / SAMPLE_RATE
+    wall_seconds = finished - started
+    return {
+        "file": path,
+        "transcript": transcript_path,
+        "audio_seconds": round(audio_seconds, 3),
+        "segments": len(segments),
+        "segmentation_seconds": round(segmented - started, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "real_time_factor": round(wall_seconds / audio_seconds, 4) if audio_seconds else None,
+        "segments_per_second": round(len(segments) / wall_seconds, 3) if wall_seconds else None,
+    }
+
+def run_batch(inputs, workers=None, output_dir=DEFAULT_OUTPUT_DIR, model_type=transcriber_whisper.MODEL_TYPE,
+              segmenter="webrtc", backend=model_manager.DEFAULT_BACKEND):
+    """Transcribes every recording in `inputs` and returns the per-file stats."""
+    paths = find_audio_files(inputs)
+    if not paths:
+        print("No WAV/FLAC files found.")
+        return []
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    print(f"Transcribing {len(paths)} file(s) with {workers} worker process(es)...")
+    all_stats = []
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(model_type, backend)
+    ) as executor:
+        for path in paths:
+            stats = transcribe_file(path, executor, output_dir, segmenter)
+            all_stats.append(stats)
+            print(f"{path}: {stats['segments']} segments, {stats['audio_seconds']:.1f}s audio in "
+                  f"{stats['wall_seconds']:.1f}s (RTF {stats['real_time_factor']}, "
+                  f"{stats['segments_per_second']} segments/s)")
+
+    with open(os.path.join(output_dir, "batch_stats.json"), "w") as f:
+        json.dump(all_stats, f, indent=2)
+    return all_stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline transcription of recorded meetings.")
+    parser.add_argument("inputs", nargs="+", help="WAV/FLAC files or directories containing them.")
+    parser.add_argument("--workers", type=int, default=None, help="Decoder processes (default: CPU count).")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="Where transcripts are written.")
+    parser.add_argument("--model", default=transcriber_whisper.MODEL_TYPE, help="Whisper model size.")
+    parser.add_argument("--segmenter", choices=sorted(SEGMENTERS), default="webrtc",
+                        help="Per-frame webrtcvad or the vectorized NumPy energy VAD.")
+    parser.add_argument("--backend", choices=sorted(model_manager.BACKENDS), default=model_manager.DEFAULT_BACKEND,
+                        help="Whisper inference backend; 'openai-int8' and 'faster-whisper' are CPU-optimized.")
+    args = parser.parse_args()
+
+    if not run_batch(args.inputs, args.workers, args.output_dir, args.model, args.segmenter, args.backend):
+        sys.exit(1)
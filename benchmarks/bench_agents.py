@@ -0,0 +1,107 @@
+"""
+Drives coordinator_agent.root_agent through the ADK Runner against a local
+stand-in model with configurable latency, so agent-framework overhead and
+end-to-end turn latency can be measured without Gemini.
+
+    python -m benchmarks.bench_agents --turns 200 --llm-latency-ms 50 --meetings 4
+    python -m benchmarks.bench_agents --llm-latency-ms 300 --api-latency-ms 150 --cold-tools --speculate
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks import harness
+
+UTTERANCES = [
+    "Please read the agenda",
+    "Take a note that the budget review moved to Friday",
+    "We need to send the vendor contract to legal",
+    "What's next on the agenda",
+    "What's on my calendar",
+    "Remember that Priya owns the launch checklist",
+    "Move on to the next agenda item",
+    "Send the follow-up email to the team",
+]
+
+
+async def _run_meeting(runner, meeting_index, turns, latencies, speculate, cold_tools):
+    from google.genai import types as genai_types
+    from response_cache import tool_cache
+    from speculation import speculator
+
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="bench", state={"meeting_id": f"bench-meeting-{meeting_index}"}
+    )
+    for turn in range(turns):
+        text = UTTERANCES[turn % len(UTTERANCES)]
+        message = genai_types.Content(role="user", parts=[genai_types.Part(text=text)])
+        if cold_tools:
+            tool_cache.invalidate()
+        started = time.perf_counter()
+        turn = speculator.begin_turn(text, f"bench-meeting-{meeting_index}") if speculate else None
+        async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            pass
+        if turn is not None:
+            speculator.end_turn(turn)
+        latencies.append(time.perf_counter() - started)
+
+
+async def _run(turns, meetings, llm_latency_ms, api_latency_ms, speculate=False, cold_tools=False):
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from coordinator_agent.agent import root_agent
+    from speculation import speculator
+
+    model = harness.make_fake_llm(latency_ms=llm_latency_ms)
+    harness.use_model(root_agent, model)
+    http = harness.install_fake_google(api_latency_ms)
+    runner = Runner(agent=root_agent, app_name="AI_Meeting_Assistant_Bench", session_service=InMemorySessionService())
+
+    latencies = []
+    per_meeting = max(1, turns // meetings)
+    started = time.perf_counter()
+    await asyncio.gather(*(_run_meeting(runner, i, per_meeting, latencies, speculate, cold_tools) for i in range(meetings)))
+    elapsed = time.perf_counter() - started
+
+    llm_seconds = model.calls * llm_latency_ms / 1000
+    return {
+        "turns": len(latencies),
+        "meetings": meetings,
+        "llm_latency_ms": llm_latency_ms,
+        "google_api_latency_ms": api_latency_ms,
+        "turns_per_second": round(len(latencies) / elapsed, 2),
+        "turn_latency": harness.percentiles(latencies),
+        "llm_calls_per_turn": round(model.calls / len(latencies), 2),
+        "google_api_requests": http.requests,
+        # Time per turn not spent waiting on the stand-in model.
+        "framework_overhead_ms_per_turn": round((sum(latencies) - llm_seconds) / len(latencies) * 1000, 3),
+        "cold_tools": cold_tools,
+        "speculation": speculator.summary() if speculate else None,
+    }
+
+
+def run(turns=200, meetings=1, llm_latency_ms=0.0, api_latency_ms=0.0, speculate=False, cold_tools=False):
+    return asyncio.run(_run(turns, meetings, llm_latency_ms, api_latency_ms, speculate, cold_tools))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--meetings", type=int, default=1, help="Concurrent sessions sharing the turns")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--api-latency-ms", type=float, default=0.0)
+    parser.add_argument("--speculate", action="store_true", help="Prefetch likely tool calls as run_app does")
+    parser.add_argument("--cold-tools", action="store_true", help="Empty the tool cache before every turn")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    harness.isolate()
+    report = {
+        "environment": harness.environment(),
+        "agents": run(args.turns, args.meetings, args.llm_latency_ms, args.api_latency_ms, args.speculate, args.cold_tools),
+        "peak_rss_mb": harness.peak_rss_mb(),
+    }
+    harness.write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Indexing throughput and query latency of the meeting archive over a
+generated year of meetings (notes, action items and transcript segments).
+
+    python -m benchmarks.bench_archive --days 365 --meetings-per-day 3
+"""
+import argparse
+import datetime
+import os
+import random
+import time
+
+from benchmarks import harness
+
+TOPICS = ("budget roadmap hiring vendor launch design review marketing campaign quarter metrics customer "
+          "deadline contract security onboarding pricing release migration incident outage interview "
+          "forecast partnership retention churn analytics dashboard compliance audit invoice").split()
+FILLER_WORDS = 4000               # Zipf-distributed general vocabulary besides the topics
+NOTES_PER_MEETING = 12
+ACTIONS_PER_MEETING = 4
+SEGMENTS_PER_MEETING = 120        # Transcript segments (utterances) per meeting
+
+
+def _vocabulary(rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = {"".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(FILLER_WORDS * 2)}
+    words = sorted(words)[:FILLER_WORDS]
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+def _sentence(rng, words, weights, topics, length):
+    filler = rng.choices(words, weights, k=length - 2)
+    return " ".join(filler + rng.sample(topics, 2))
+
+
+def generate_year(days, meetings_per_day, seed=0):
+    """Yields one list of note-store style records per meeting, oldest first."""
+    rng = random.Random(seed)
+    words, weights = _vocabulary(rng)
+    start = datetime.datetime.now().astimezone() - datetime.timedelta(days=days)
+    for day in range(days):
+        for number in range(meetings_per_day):
+            began = start + datetime.timedelta(days=day, hours=9 + 2 * number)
+            meeting_id = f"meeting-{began:%Y-%m-%d-%H%M}"
+            topics = rng.sample(TOPICS, 4)
+            records = []
+            for index in range(SEGMENTS_PER_MEETING + NOTES_PER_MEETING + ACTIONS_PER_MEETING):
+                if index < SEGMENTS_PER_MEETING:
+                    doc_type, length = "transcript", rng.randint(6, 30)
+                elif index < SEGMENTS_PER_MEETING + NOTES_PER_MEETING:
+                    doc_type, length = "note", rng.randint(5, 15)
+                else:
+                    doc_type, length = "action_item", rng.randint(5, 12)
+                records.append({
+                    "ts": (began + datetime.timedelta(seconds=20 * index)).isoformat(),
+                    "meeting_id": meeting_id,
+                    "speaker": rng.choice(("alice", "bob", "carol", "dan")),
+                    "type": doc_type,
+                    "text": _sentence(rng, words, weights, topics, length),
+                })
+            yield records
+
+
+def run(days=365, meetings_per_day=3, queries=500, seed=0):
+    from meeting_archive import MeetingArchive, DOCUMENT_TYPES
+
+    data_dir = os.environ["MEETING_DATA_DIR"]
+    archive = MeetingArchive(os.path.join(data_dir, "archive.db"), legacy_dir=data_dir)
+
+    indexed, started = 0, time.perf_counter()
+    for records in generate_year(days, meetings_per_day, seed):
+        # One listener call per meeting-sized batch, as the note store's writer would make.
+        archive.index_records(records)
+        indexed += len(records)
+    archive.flush()
+    index_seconds = time.perf_counter() - started
+
+    rng = random.Random(seed + 1)
+    words, weights = _vocabulary(random.Random(seed))
+    now = datetime.datetime.now().astimezone()
+    latencies = {"plain": [], "last_month": [], "action_items": []}
+    hits = 0
+    for i in range(queries):
+        query = " ".join(rng.sample(TOPICS, 2) + rng.choices(words, weights, k=1))
+        for kind, options in (
+            ("plain", {}),
+            ("last_month", {"since": now - datetime.timedelta(days=31)}),
+            ("action_items", {"types": ["action_item"]}),
+        ):
+            started = time.perf_counter()
+            results = archive.search(query, **options)
+            latencies[kind].append(time.perf_counter() - started)
+            hits += bool(results)
+
+    # How soon an append becomes searchable.
+    started = time.perf_counter()
+    archive.add_transcript("meeting-live", "the zeppelin vendor contract is signed")
+    archive.wait_for_meeting("meeting-live")
+    fresh = archive.search("zeppelin")
+    fresh_seconds = time.perf_counter() - started
+
+    report = {
+        "days": days,
+        "documents": indexed,
+        "archive": archive.stats(),
+        "db_mb": round(os.path.getsize(archive.db_path) / 1e6, 1),
+        "index_docs_per_second": round(indexed / index_seconds),
+        "queries": queries,
+        "queries_with_results": round(hits / (3 * queries), 3),
+        "search_ms": {kind: harness.percentiles(samples) for kind, samples in latencies.items()},
+        "add_then_search_ms": round(fresh_seconds * 1000, 2),
+        "fresh_result_found": bool(fresh),
+    }
+    archive.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--meetings-per-day", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    harness.isolate()
+    harness.write_report({
+        "environment": harness.environment(),
+        "archive": run(args.days, args.meetings_per_day, args.queries, args.seed),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
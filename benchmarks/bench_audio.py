@@ -0,0 +1,88 @@
+"""
+Replays fixture WAV files through the live assistant's segmentation path
+(webrtcvad + UtteranceSegmenter, frame by frame) and, with --model, decodes
+every utterance through transcriber_whisper.transcribe_audio.
+
+    python -m benchmarks.bench_audio --model tiny --output audio.json
+"""
+import argparse
+import time
+
+from benchmarks import harness
+
+
+def run(paths=None, model=None):
+    import transcriber_whisper
+    from batch_transcriber import load_audio, segment_audio
+
+    paths = paths or harness.ensure_fixtures()
+    decode_latencies = []
+    decode_error = None
+    if model:
+        try:
+            transcriber_whisper.MODEL_TYPE = model
+            transcriber_whisper.initialize_model()
+        except Exception as e:
+            decode_error = f"{type(e).__name__}: {e}"
+
+    files = []
+    total_audio = total_segment = total_decode = 0.0
+    for path in paths:
+        samples = load_audio(path)
+        audio_seconds = len(samples) / transcriber_whisper.SAMPLE_RATE
+
+        started = time.perf_counter()
+        segments = segment_audio(samples)
+        segment_seconds = time.perf_counter() - started
+        frames = len(samples) // transcriber_whisper.FRAME_SIZE
+
+        decode_seconds = 0.0
+        if model and decode_error is None:
+            for start, end in segments:
+                started = time.perf_counter()
+                transcriber_whisper.transcribe_audio(samples[start:end])
+                elapsed = time.perf_counter() - started
+                decode_latencies.append(elapsed)
+                decode_seconds += elapsed
+
+        total_audio += audio_seconds
+        total_segment += segment_seconds
+        total_decode += decode_seconds
+        files.append({
+            "file": path,
+            "audio_seconds": round(audio_seconds, 2),
+            "utterances": len(segments),
+            "segmentation_frames_per_second": round(frames / segment_seconds),
+            "segmentation_realtime_factor": round(segment_seconds / audio_seconds, 6),
+            "decode_realtime_factor": round(decode_seconds / audio_seconds, 4) if decode_seconds else None,
+        })
+
+    report = {
+        "files": files,
+        "audio_seconds": round(total_audio, 2),
+        "segmentation_realtime_factor": round(total_segment / total_audio, 6),
+        "decode": {"model": model, "skipped": decode_error or (None if model else "no --model given")},
+    }
+    if decode_latencies:
+        report["decode"].update({
+            "utterance_latency": harness.percentiles(decode_latencies),
+            "realtime_factor": round(total_decode / total_audio, 4),
+            "utterances_per_second": round(len(decode_latencies) / total_decode, 2),
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", help="WAV/FLAC files (default: generated fixtures)")
+    parser.add_argument("--model", default=None, help="Whisper model to decode with, e.g. tiny")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    harness.isolate()
+    report = {"environment": harness.environment(), "audio": run(args.paths, args.model)}
+    report["peak_rss_mb"] = harness.peak_rss_mb()
+    harness.write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compares per-utterance Whisper calls with the cross-stream BatchDecoder:
+segments/s and per-segment latency for each batch size, on utterances cut
+from the fixture recordings.
+
+    python -m benchmarks.bench_batched_decode --model tiny --batch-sizes 1,4,8,16
+"""
+import argparse
+import time
+import concurrent.futures
+
+from benchmarks import harness
+
+
+def _per_utterance(segments, model):
+    from model_manager import get_model_manager
+    manager = get_model_manager()
+    latencies = []
+    started = time.perf_counter()
+    for audio in segments:
+        call_started = time.perf_counter()
+        manager.transcribe(audio, model)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    return {"segments_per_second": round(len(segments) / elapsed, 2), "latency": harness.percentiles(latencies)}
+
+
+def _batched(segments, model, batch_size, max_wait_ms, callers):
+    from batch_decoder import BatchDecoder
+    decoder = BatchDecoder(model, max_batch=batch_size, max_wait_ms=max_wait_ms)
+    latencies = []
+
+    def caller(clips):
+        # Each caller stands in for one meeting stream submitting its utterances in order.
+        for audio in clips:
+            call_started = time.perf_counter()
+            decoder.transcribe(audio)
+            latencies.append(time.perf_counter() - call_started)
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(callers) as pool:
+        list(pool.map(caller, [segments[i::callers] for i in range(callers)]))
+    elapsed = time.perf_counter() - started
+    stats = decoder.stats()
+    decoder.close()
+    return {
+        "segments_per_second": round(len(segments) / elapsed, 2),
+        "latency": harness.percentiles(latencies),
+        "avg_batch_size": stats["avg_batch_size"],
+    }
+
+
+def run(model="tiny", batch_sizes=(1, 4, 8, 16), max_wait_ms=50, segments_limit=64, callers=None):
+    from batch_transcriber import load_audio, segment_audio
+    from model_manager import get_model_manager
+
+    segments = []
+    for path in harness.ensure_fixtures((120, 600)):
+        samples = load_audio(path)
+        segments.extend(samples[start:end].astype("float32") / 32768.0 for start, end in segment_audio(samples))
+    segments = segments[:segments_limit]
+
+    get_model_manager().preload(model)
+    report = {
+        "model": model,
+        "segments": len(segments),
+        "audio_seconds": round(sum(len(s) for s in segments) / 16000, 1),
+        "per_utterance": _per_utterance(segments, model),
+        "batched": {},
+    }
+    for batch_size in batch_sizes:
+        result = _batched(segments, model, batch_size, max_wait_ms, callers or max(batch_sizes))
+        result["speedup"] = round(result["segments_per_second"] / report["per_utterance"]["segments_per_second"], 2)
+        report["batched"][str(batch_size)] = result
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    parser.add_argument("--max-wait-ms", type=float, default=50)
+    parser.add_argument("--segments", type=int, default=64)
+    parser.add_argument("--callers", type=int, default=None, help="Concurrent submitters (default: largest batch size)")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    harness.isolate()
+    report = {
+        "environment": harness.environment(),
+        "decode": run(args.model, [int(b) for b in args.batch_sizes.split(",")], args.max_wait_ms,
+                      args.segments, args.callers),
+        "peak_rss_mb": harness.peak_rss_mb(),
+    }
+    harness.write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
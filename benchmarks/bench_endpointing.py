@@ -0,0 +1,125 @@
+"""
+Compares the fixed 1.5 s endpointing hangover with the adaptive endpointer
+on the same webrtcvad decisions.
+
+The generated recording has known turn boundaries: short commands and
+longer dictation made of phrases separated by natural pauses. That lets the
+benchmark measure the endpoint delay after each turn really ended, and how
+many turns were split in two by ending too early.
+
+    python -m benchmarks.bench_endpointing --turns 200
+    python -m benchmarks.bench_endpointing --turns 200 --command-hints
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks import harness
+
+SAMPLE_RATE = harness.FIXTURE_SAMPLE_RATE
+COMMAND_SHARE = 0.4               # Turns that are a short command rather than dictation
+PAUSE_MEDIAN_SECONDS = 0.35       # Pauses between phrases of one turn (log-normal)
+TURN_GAP_SECONDS = (2.0, 5.0)     # Silence between turns (the assistant answering)
+
+
+def _voice(rng, seconds):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = rng.uniform(110, 220)
+    voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+    return 4000 * voice * (0.55 + 0.45 * np.sin(2 * np.pi * rng.uniform(3, 6) * t) ** 2)
+
+
+def synthesize_turns(turns, seed=0):
+    """Returns (int16 audio, [(start_s, end_s, kind)]) for `turns` commands and dictations."""
+    rng = np.random.default_rng(seed)
+    pieces, truth, position = [rng.normal(0, 60, SAMPLE_RATE)], [], 1.0
+    for _ in range(turns):
+        kind = "command" if rng.random() < COMMAND_SHARE else "dictation"
+        if kind == "command":
+            phrases = [rng.uniform(0.6, 1.4)]
+        else:
+            phrases = [rng.uniform(0.8, 2.5) for _ in range(rng.integers(3, 9))]
+        start = position
+        for index, length in enumerate(phrases):
+            pieces.append(_voice(rng, length) + rng.normal(0, 60, int(length * SAMPLE_RATE)))
+            position += int(length * SAMPLE_RATE) / SAMPLE_RATE
+            if index < len(phrases) - 1:
+                pause = float(np.clip(rng.lognormal(np.log(PAUSE_MEDIAN_SECONDS), 0.5), 0.1, 1.2))
+                pieces.append(rng.normal(0, 60, int(pause * SAMPLE_RATE)))
+                position += int(pause * SAMPLE_RATE) / SAMPLE_RATE
+        truth.append((start, position, kind))
+        gap = rng.uniform(*TURN_GAP_SECONDS)
+        pieces.append(rng.normal(0, 60, int(gap * SAMPLE_RATE)))
+        position += int(gap * SAMPLE_RATE) / SAMPLE_RATE
+    audio = np.concatenate(pieces)
+    return np.clip(audio, -32768, 32767).astype(np.int16), truth
+
+
+def _vad_decisions(samples):
+    import webrtcvad
+    from transcriber_whisper import FRAME_SIZE, VAD_AGGRESSIVENESS
+    vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+    raw = samples.tobytes()
+    frame_bytes = FRAME_SIZE * 2
+    return [vad.is_speech(raw[i:i + frame_bytes], SAMPLE_RATE) for i in range(0, len(raw) - frame_bytes + 1, frame_bytes)]
+
+
+def _score(segmenter, decisions, truth, command_hints=False):
+    """Endpoint delay after each true turn end, and ends that fell inside a turn (splits)."""
+    from transcriber_whisper import FRAME_DURATION_MS
+    frame_seconds = FRAME_DURATION_MS / 1000
+    ends = []
+    turn = 0
+    for index, is_speech in enumerate(decisions):
+        now = index * frame_seconds
+        while turn < len(truth) - 1 and now >= truth[turn + 1][0]:
+            turn += 1
+        event = segmenter.push(is_speech)
+        if event == "start" and command_hints and truth[turn][2] == "command":
+            # Stands in for a streaming partial that matched a router command.
+            segmenter.hint("what's next")
+        if event == "end":
+            ends.append(now)
+
+    delays, splits = [], 0
+    for start, end, _ in truth:
+        inside = [t for t in ends if start < t < end]
+        splits += len(inside)
+        after = [t for t in ends if end <= t]
+        if after:
+            delays.append(after[0] - end)
+    return {"endpoint_delay": harness.percentiles(delays), "split_turns": splits}
+
+
+def run(turns=200, seed=0, command_hints=False):
+    from endpointing import AdaptiveEndpointer
+    from transcriber_whisper import UtteranceSegmenter, SILENCE_FRAMES
+
+    audio, truth = synthesize_turns(turns, seed)
+    decisions = _vad_decisions(audio)
+    adaptive = AdaptiveEndpointer(default_hangover_frames=SILENCE_FRAMES)
+    return {
+        "turns": len(truth),
+        "audio_seconds": round(len(audio) / SAMPLE_RATE, 1),
+        "fixed": _score(UtteranceSegmenter(), decisions, truth),
+        "adaptive": {**_score(adaptive, decisions, truth, command_hints), "endpointer": adaptive.stats()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--command-hints", action="store_true",
+                        help="Give the endpointer a matching partial for every command turn")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    harness.isolate()
+    harness.write_report({
+        "environment": harness.environment(),
+        "endpointing": run(args.turns, args.seed, args.command_hints),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
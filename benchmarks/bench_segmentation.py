@@ -0,0 +1,90 @@
+"""
+Compares segmentation throughput (frames/s) of the live per-frame loop
+against the block-wise NumPy path in `segmentation`.
+
+    python -m benchmarks.bench_segmentation --seconds 600
+"""
+import argparse
+import collections
+import time
+import numpy as np
+
+from transcriber_whisper import FRAME_SIZE, SAMPLE_RATE, VAD_AGGRESSIVENESS, UtteranceSegmenter
+from segmentation import AudioRingBuffer, BlockSegmenter
+
+
+def synthetic_meeting(seconds, seed=0):
+    """Background noise with tone bursts standing in for speech; deterministic per seed."""
+    rng = np.random.default_rng(seed)
+    audio = rng.normal(0, 40, seconds * SAMPLE_RATE)
+    position = 0.5
+    while position < seconds - 1:
+        length = rng.uniform(0.5, 6.0)
+        t = np.arange(int(min(length, seconds - position) * SAMPLE_RATE)) / SAMPLE_RATE
+        start = int(position * SAMPLE_RATE)
+        audio[start:start + len(t)] += 4000 * np.sin(2 * np.pi * rng.uniform(120, 300) * t)
+        position += length + rng.uniform(0.3, 3.0)
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def bench_frame_loop(audio):
+    """The current loop: one webrtcvad call per frame and a deque joined per utterance."""
+    import webrtcvad
+    vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+    segmenter = UtteranceSegmenter()
+    raw = audio.tobytes()
+    frame_bytes = FRAME_SIZE * 2
+    frame_count = len(raw) // frame_bytes
+    frames = collections.deque()
+    utterances = 0
+
+    started = time.perf_counter()
+    for i in range(frame_count):
+        audio_frame = raw[i * frame_bytes:(i + 1) * frame_bytes]
+        event = segmenter.push(vad.is_speech(audio_frame, SAMPLE_RATE))
+        if event is None and not segmenter.is_speaking:
+            continue
+        frames.append(audio_frame)
+        if event == "end":
+            b"".join(list(frames))
+            frames = collections.deque()
+            utterances += 1
+    elapsed = time.perf_counter() - started
+    return frame_count, utterances, elapsed
+
+
+def bench_block_segmenter(audio, block_seconds):
+    segmenter = BlockSegmenter(ring=AudioRingBuffer())
+    block_size = int(block_seconds * SAMPLE_RATE)
+    utterances = 0
+
+    started = time.perf_counter()
+    for offset in range(0, len(audio), block_size):
+        for start, end in segmenter.push(audio[offset:offset + block_size]):
+            segmenter.ring.view(start, end)
+            utterances += 1
+    utterances += len(segmenter.flush())
+    elapsed = time.perf_counter() - started
+    return len(audio) // FRAME_SIZE, utterances, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=600, help="Length of the synthetic recording.")
+    parser.add_argument("--block-seconds", type=float, default=10.0, help="Block size for the NumPy path.")
+    args = parser.parse_args()
+
+    audio = synthetic_meeting(args.seconds)
+    results = []
+    try:
+        results.append(("per-frame webrtcvad loop", *bench_frame_loop(audio)))
+    except ImportError:
+        print("webrtcvad is not installed; skipping the per-frame baseline.")
+    results.append((f"numpy blocks ({args.block_seconds}s)", *bench_block_segmenter(audio, args.block_seconds)))
+
+    for name, frames, utterances, elapsed in results:
+        print(f"{name:32s} {frames / elapsed:14,.0f} frames/s  {utterances:4d} utterances  {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
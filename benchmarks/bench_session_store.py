@@ -0,0 +1,89 @@
+"""
+Event write throughput and recall latency of the durable SQLite session and
+memory backends.
+
+    python -m benchmarks.bench_session_store --events 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from google.adk.events import Event
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types as genai_types
+
+from durable_services import SqliteMemoryService, SqliteSessionService
+
+WORDS = ("budget roadmap hiring vendor launch design review marketing campaign quarter "
+         "metrics customer deadline contract security onboarding pricing release").split()
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda pct: ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+    return f"p50={pick(50):.2f}ms p95={pick(95):.2f}ms p99={pick(99):.2f}ms"
+
+
+async def run(events, sessions, queries, seed):
+    rng = random.Random(seed)
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_sessions.db")
+    memory = SqliteMemoryService(db_path)
+    service = SqliteSessionService(db_path, on_compact=memory.add_compacted_events)
+
+    live = [
+        await service.create_session(app_name="bench", user_id="user", state={"meeting_id": f"m{i}"})
+        for i in range(sessions)
+    ]
+
+    started = time.perf_counter()
+    for i in range(events):
+        session = live[i % sessions]
+        text = " ".join(rng.choice(WORDS) for _ in range(12))
+        await service.append_event(session, Event(
+            invocation_id=f"inv-{i}",
+            author="user" if i % 2 == 0 else "meeting_coordinator",
+            content=genai_types.Content(role="user", parts=[genai_types.Part(text=f"{i} {text}")]),
+        ))
+    write_seconds = time.perf_counter() - started
+    for session in live:
+        await memory.add_session_to_memory(session)
+
+    recent, full, search = [], [], []
+    for i in range(queries):
+        session = live[i % sessions]
+        started = time.perf_counter()
+        await service.get_session(app_name="bench", user_id="user", session_id=session.id,
+                                  config=GetSessionConfig(num_recent_events=50))
+        recent.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await service.get_session(app_name="bench", user_id="user", session_id=session.id)
+        full.append(time.perf_counter() - started)
+
+        query = " ".join(rng.sample(WORDS, 2))
+        started = time.perf_counter()
+        await memory.search_memory(app_name="bench", user_id="user", query=query)
+        search.append(time.perf_counter() - started)
+
+    print(f"events={events} sessions={sessions} db={os.path.getsize(db_path) / 1e6:.1f} MB")
+    print(f"append_event: {events / write_seconds:,.0f} events/s ({write_seconds:.1f}s)")
+    print(f"get_session (last 50):  {_percentiles(recent)}")
+    print(f"get_session (full):     {_percentiles(full)}")
+    print(f"search_memory:          {_percentiles(search)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.events, args.sessions, args.queries, args.seed))
+
+
+if __name__ == "__main__":
+    main()
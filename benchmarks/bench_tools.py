@@ -0,0 +1,87 @@
+"""
+Times the note, agenda, calendar and email tool functions directly, with the
+Google APIs answered by a fake transport.
+
+    python -m benchmarks.bench_tools --iterations 500 --api-latency-ms 20
+"""
+import argparse
+import time
+
+from benchmarks import harness
+
+
+def _time_calls(func, iterations):
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        result = func(i)
+        latencies.append(time.perf_counter() - call_started)
+        if isinstance(result, dict) and result.get("status") == "error":
+            errors += 1
+    elapsed = time.perf_counter() - started
+    return {"calls_per_second": round(iterations / elapsed, 1), "errors": errors, **harness.percentiles(latencies)}
+
+
+def run(iterations=500, api_latency_ms=0.0):
+    from note_store import MeetingContext, get_note_store
+    from note_taker_agent.agent import save_note, save_action_item
+    from agenda_tracker_agent.agent import read_the_full_agenda, get_next_agenda_item
+    from calendar_agent.agent import get_upcoming_events
+    from email_agent.agent import send_follow_up_email, outbox
+    from summary_builder import get_summary_builder
+    from response_cache import tool_cache
+
+    harness.install_fake_google(api_latency_ms)
+    context = MeetingContext("bench-tools", speaker="bench")
+
+    def next_item(i):
+        if i % 5 == 0:
+            read_the_full_agenda(context)
+        return get_next_agenda_item(context)
+
+    def calendar_uncached(i):
+        tool_cache.invalidate()
+        return get_upcoming_events()
+
+    results = {
+        "save_note": _time_calls(lambda i: save_note(f"Note number {i} about the roadmap", context), iterations),
+        "save_action_item": _time_calls(lambda i: save_action_item(f"Follow up on item {i}", context), iterations),
+        "read_the_full_agenda": _time_calls(lambda i: read_the_full_agenda(context), iterations),
+        "get_next_agenda_item": _time_calls(next_item, iterations),
+        "get_upcoming_events": _time_calls(calendar_uncached, iterations),
+        "get_upcoming_events_cached": _time_calls(lambda i: get_upcoming_events(), iterations),
+        # Emails are only queued; the digest is rebuilt only when notes were saved since the last one.
+        "send_follow_up_email": _time_calls(
+            lambda i: send_follow_up_email("team@example.com", f"Follow-up {i}", tool_context=context), max(1, iterations // 10)
+        ),
+    }
+    outbox.flush(timeout=60)
+    get_note_store().close_all()
+    return {
+        "iterations": iterations,
+        "google_api_latency_ms": api_latency_ms,
+        "tools": results,
+        "email_outbox": dict(outbox.stats),
+        "email_digest": get_summary_builder().stats(context.state["meeting_id"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--api-latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    harness.isolate()
+    report = {
+        "environment": harness.environment(),
+        "tools": run(args.iterations, args.api_latency_ms),
+        "peak_rss_mb": harness.peak_rss_mb(),
+    }
+    harness.write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
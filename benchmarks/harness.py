@@ -0,0 +1,253 @@
+"""
+Shared pieces of the benchmark suite: an isolated data directory, a
+deterministic stand-in for Gemini, fake Google API transports, fixture
+audio and the JSON report format.
+
+Call `isolate()` before importing any of the app's modules so notes,
+sessions and traces go to a scratch directory instead of ./data.
+"""
+import os
+import sys
+import json
+import time
+import wave
+import random
+import asyncio
+import platform
+import resource
+import tempfile
+import subprocess
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_SAMPLE_RATE = 16000
+
+
+# --- Environment ---
+
+def isolate(data_dir=None, tracing=False):
+    """Points every store at a scratch directory; must run before the app modules are imported."""
+    data_dir = data_dir or tempfile.mkdtemp(prefix="meeting-bench-")
+    os.environ["MEETING_DATA_DIR"] = data_dir
+    os.environ["TRACE_DIR"] = os.path.join(data_dir, "traces")
+    os.environ["TRACING"] = "1" if tracing else "0"
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    return data_dir
+
+
+# --- Measurements ---
+
+def percentiles(samples):
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 3)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_report(report, path=None):
+    """Prints the report as JSON and, with `path`, writes it there too."""
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+# --- Fixture audio ---
+
+def synthesize_meeting(seconds, seed=0, sample_rate=FIXTURE_SAMPLE_RATE):
+    """
+    Deterministic speech-like int16 audio: voiced bursts of 0.8-4 s (harmonic
+    tones with a syllable-rate envelope) separated by 0.3-2.5 s pauses over a
+    low noise floor. webrtcvad segments it much like a real conversation.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sample_rate)
+    audio = rng.normal(0, 60, total)
+    position = int(rng.uniform(0.3, 1.0) * sample_rate)
+    while position < total:
+        length = min(int(rng.uniform(0.8, 4.0) * sample_rate), total - position)
+        t = np.arange(length) / sample_rate
+        pitch = rng.uniform(110, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = 0.55 + 0.45 * np.sin(2 * np.pi * rng.uniform(3, 6) * t) ** 2
+        audio[position:position + length] += 4000 * voice * envelope
+        position += length + int(rng.uniform(0.3, 2.5) * sample_rate)
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def write_wav(path, samples, sample_rate=FIXTURE_SAMPLE_RATE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+
+
+def ensure_fixtures(durations=(30, 120, 600), fixture_dir=FIXTURE_DIR):
+    """Generates the fixture WAVs (once) and returns their paths."""
+    paths = []
+    for index, seconds in enumerate(durations):
+        path = os.path.join(fixture_dir, f"meeting_{seconds}s.wav")
+        if not os.path.exists(path):
+            write_wav(path, synthesize_meeting(seconds, seed=index))
+        paths.append(path)
+    return paths
+
+
+# --- Deterministic stand-in for Gemini ---
+
+# (keywords, tool) pairs checked in order against the latest user text; the
+# first tool that matches and is offered to the agent is called.
+FAKE_TOOL_ROUTES = [
+    (("email", "follow-up", "follow up"), "email_agent"),
+    (("calendar", "schedule", "events"), "calendar_agent"),
+    (("agenda", "next", "move on"), "agenda_tracker_agent"),
+    (("note", "action", "remember", "we need to", "i will"), "note_taker_agent"),
+    (("email", "follow"), "send_follow_up_email"),
+    (("calendar", "schedule", "events"), "get_upcoming_events"),
+    (("read", "start", "show", "full"), "read_the_full_agenda"),
+    (("next", "move on"), "get_next_agenda_item"),
+    (("action", "we need to", "i will"), "save_action_item"),
+    (("note", "remember"), "save_note"),
+]
+
+
+def _fake_tool_args(tool_name, text):
+    if tool_name.endswith("_agent"):
+        return {"request": text}
+    if tool_name == "save_note":
+        return {"note": text}
+    if tool_name == "save_action_item":
+        return {"action_item": text}
+    if tool_name == "send_follow_up_email":
+        return {"recipient": "team@example.com", "subject": "Meeting follow-up"}
+    return {}
+
+
+def make_fake_llm(latency_ms=0.0, jitter_ms=0.0, seed=0):
+    """
+    A BaseLlm that answers like the real agents would, without a network:
+    it calls the tool the keywords point to, then acknowledges the tool's
+    result. Each call sleeps `latency_ms` +/- `jitter_ms` (seeded).
+    """
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai import types as genai_types
+
+    rng = random.Random(seed)
+
+    class FakeLlm(BaseLlm):
+        calls: int = 0
+
+        async def generate_content_async(self, llm_request, stream=False):
+            self.calls += 1
+            delay = latency_ms + (rng.uniform(-jitter_ms, jitter_ms) if jitter_ms else 0.0)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+
+            last = llm_request.contents[-1] if llm_request.contents else None
+            responses = [part.function_response for part in (last.parts if last else []) if part.function_response]
+            if responses:
+                text = "; ".join(f"{r.name} finished" for r in responses)
+                yield LlmResponse(content=genai_types.Content(role="model", parts=[genai_types.Part(text=text)]))
+                return
+
+            request_text = ""
+            if last is not None:
+                request_text = " ".join(part.text for part in last.parts if part.text)
+            lowered = request_text.lower()
+            for keywords, tool_name in FAKE_TOOL_ROUTES:
+                if tool_name in llm_request.tools_dict and any(word in lowered for word in keywords):
+                    call = genai_types.FunctionCall(name=tool_name, args=_fake_tool_args(tool_name, request_text))
+                    yield LlmResponse(content=genai_types.Content(role="model", parts=[genai_types.Part(function_call=call)]))
+                    return
+            yield LlmResponse(content=genai_types.Content(
+                role="model", parts=[genai_types.Part(text="I am not sure how to help with that.")]
+            ))
+
+    return FakeLlm(model="fake-gemini")
+
+
+def use_model(agent, model):
+    """Swaps `model` into an agent and every agent reachable through its AgentTools."""
+    agent.model = model
+    for tool in getattr(agent, "tools", []):
+        if hasattr(tool, "agent"):
+            use_model(tool.agent, model)
+
+
+# --- Fake Google API transport ---
+
+class FakeGoogleHttp:
+    """
+    Stand-in for httplib2.Http that answers Calendar and Gmail requests with
+    canned JSON after `latency_ms`, and counts the requests it served.
+    """
+
+    def __init__(self, latency_ms=0.0, event_count=5):
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self.events = {"items": [
+            {"summary": f"Sync #{i}", "start": {"dateTime": f"2030-01-0{i + 1}T10:00:00Z"}}
+            for i in range(event_count)
+        ]}
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        import httplib2
+        self.requests += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if "/calendar/" in uri:
+            payload = self.events
+        elif "/gmail/" in uri:
+            payload = {"id": f"msg-{self.requests}", "labelIds": ["SENT"]}
+        else:
+            return httplib2.Response({"status": "404"}), b"{}"
+        return httplib2.Response({"status": "200", "content-type": "application/json"}), json.dumps(payload).encode()
+
+
+def install_fake_google(latency_ms=0.0):
+    """Replaces the shared Google client pool with one backed by FakeGoogleHttp."""
+    from google_clients import configure_google_clients
+    http = FakeGoogleHttp(latency_ms)
+    configure_google_clients(http_factory=lambda: http)
+    return http
@@ -0,0 +1,73 @@
+"""
+Load test for per-meeting agenda state: one asyncio worker drives hundreds
+of meetings at once through the agenda tools and checks they never mix.
+
+    python -m benchmarks.load_agenda --meetings 500
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+
+from agenda_tracker_agent.agent import read_the_full_agenda, get_next_agenda_item
+from agenda_tracker_agent.agenda_store import agenda_store
+from note_store import MeetingContext
+
+
+async def run_meeting(meeting_id, rounds, latencies, errors):
+    context = MeetingContext(meeting_id)
+    started = time.perf_counter()
+    agenda = read_the_full_agenda(context)["agenda"]
+    latencies.append(time.perf_counter() - started)
+
+    for expected_index in range(rounds):
+        # Yield so every meeting's calls interleave with everyone else's.
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        result = get_next_agenda_item(context)
+        latencies.append(time.perf_counter() - started)
+        expected = agenda[expected_index] if expected_index < len(agenda) else None
+        if result.get("next_item") != expected:
+            errors.append((meeting_id, expected_index, result))
+
+
+async def main_async(meetings, rounds, seed):
+    random.seed(seed)
+    latencies, errors = [], []
+    ids = [f"load-{i}" for i in range(meetings)]
+    random.shuffle(ids)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(run_meeting(meeting_id, rounds, latencies, errors) for meeting_id in ids))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    print(f"meetings={meetings} tool_calls={len(latencies)} elapsed={elapsed:.3f}s "
+          f"throughput={len(latencies) / elapsed:,.0f} calls/s")
+    print(f"latency p50={latencies[len(latencies) // 2] * 1e6:.1f}us "
+          f"p99={latencies[int(len(latencies) * 0.99)] * 1e6:.1f}us")
+    print(f"tracked meetings={len(agenda_store)} peak traced memory={peak / 1024:.0f} KiB "
+          f"(~{peak / meetings:.0f} B/meeting)")
+    print("state isolation: " + ("OK" if not errors else f"{len(errors)} mismatches, e.g. {errors[0]}"))
+
+    for meeting_id in ids:
+        agenda_store.end_meeting(meeting_id)
+    return not errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=6, help="'what's next' calls per meeting.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not asyncio.run(main_async(args.meetings, args.rounds, args.seed)):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Load generator for meeting_server.py: replays WAV files as many concurrent
+real-time meeting streams and finds how many one box can sustain within the
+per-stream transcript latency SLO.
+
+    python -m benchmarks.load_meeting_server --streams 1,2,4,8,16 --seconds 60
+    python -m benchmarks.load_meeting_server --connect 10.0.0.5:8765 --streams 32
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+
+from benchmarks import harness
+
+SAMPLE_RATE = harness.FIXTURE_SAMPLE_RATE
+CHUNK_MS = 300          # PCM sent per write, at real-time pace
+SEND_LAG_LIMIT = 0.10   # A level fails if streams fall this far behind real time
+
+
+async def _replay(host, port, stream_index, samples, seconds, speed):
+    reader, writer = await asyncio.open_connection(host, port)
+    header = {"meeting_id": f"load-{stream_index}", "user_id": f"speaker-{stream_index}"}
+    writer.write((json.dumps(header) + "\n").encode())
+
+    # Start each stream at a different offset so their utterances do not line up.
+    chunk = int(SAMPLE_RATE * CHUNK_MS / 1000)
+    total = int(seconds * SAMPLE_RATE)
+    offset = (stream_index * 7919 * chunk) % max(1, len(samples) - chunk)
+    transcripts = []
+
+    async def receive():
+        async for line in reader:
+            message = json.loads(line)
+            if message["type"] == "stats":
+                return message
+            if message["type"] == "transcript":
+                transcripts.append(message)
+        return None
+
+    receiver = asyncio.create_task(receive())
+    started = time.perf_counter()
+    sent = 0
+    while sent < total:
+        piece = samples[(offset + sent) % len(samples):][:chunk]
+        writer.write(piece.tobytes())
+        await writer.drain()
+        sent += len(piece)
+        due = started + sent / SAMPLE_RATE / speed
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+    send_lag = (time.perf_counter() - started) * speed / seconds - 1
+    writer.write_eof()
+    stats = await receiver
+    writer.close()
+    return {"transcripts": transcripts, "stats": stats, "send_lag": send_lag}
+
+
+async def _run_level(host, port, streams, samples, seconds, speed):
+    results = await asyncio.gather(*(
+        _replay(host, port, i, samples, seconds, speed) for i in range(streams)
+    ))
+    latencies = [t["latency_ms"] / 1000 for r in results for t in r["transcripts"]]
+    dropped = sum((r["stats"] or {}).get("dropped", 0) for r in results)
+    slo_met = [t["slo_met"] for r in results for t in r["transcripts"]]
+    worst_lag = max(r["send_lag"] for r in results)
+    return {
+        "streams": streams,
+        "transcripts": len(latencies),
+        "transcript_latency": harness.percentiles(latencies),
+        "slo_met_fraction": round(sum(slo_met) / len(slo_met), 3) if slo_met else None,
+        "dropped": dropped,
+        "worst_send_lag": round(worst_lag, 3),
+    }
+
+
+def _wait_for_port(host, port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def _server_peak_rss_mb(pid):
+    """Peak RSS of the spawned server from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", help="WAV files to replay (default: generated fixtures)")
+    parser.add_argument("--streams", default="1,2,4,8,16", help="Concurrent meetings per level")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Audio sent per stream per level")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed (1.0 = real time)")
+    parser.add_argument("--slo", type=float, default=2.0, help="Transcript latency target (s)")
+    parser.add_argument("--connect", default=None, help="host:port of a running server (default: spawn one)")
+    parser.add_argument("--workers", type=int, default=2, help="Decode workers for the spawned server")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    data_dir = harness.isolate()
+    from batch_transcriber import load_audio
+    paths = args.paths or harness.ensure_fixtures((600,))
+    import numpy as np
+    samples = np.concatenate([load_audio(path) for path in paths])
+
+    server = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        host, port = "127.0.0.1", 8700 + os.getpid() % 100
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(harness.REPO_ROOT, "meeting_server.py"), "--no-agents",
+             "--port", str(port), "--workers", str(args.workers), "--slo", str(args.slo)],
+            env={**os.environ, "MEETING_DATA_DIR": data_dir},
+        )
+        if not _wait_for_port(host, port, timeout=300):
+            server.kill()
+            sys.exit("meeting_server.py did not start listening in time.")
+
+    levels = []
+    max_sustained = 0
+    server_rss = None
+    try:
+        for streams in [int(s) for s in args.streams.split(",")]:
+            level = asyncio.run(_run_level(host, port, streams, samples, args.seconds, args.speed))
+            p95 = level["transcript_latency"].get("p95_ms")
+            level["sustained"] = (
+                level["dropped"] == 0
+                and level["worst_send_lag"] <= SEND_LAG_LIMIT
+                and (p95 is None or p95 <= args.slo * 1000)
+            )
+            levels.append(level)
+            print(f"{streams} streams: p95 {p95} ms, sustained={level['sustained']}", file=sys.stderr)
+            if not level["sustained"]:
+                break
+            max_sustained = streams
+    finally:
+        if server is not None:
+            server_rss = _server_peak_rss_mb(server.pid)
+            server.terminate()
+            server.wait(timeout=30)
+
+    harness.write_report({
+        "environment": harness.environment(),
+        "slo_seconds": args.slo,
+        "audio_seconds_per_stream": args.seconds,
+        "levels": levels,
+        "max_sustained_meetings": max_sustained,
+        "server_peak_rss_mb": server_rss,
+        "peak_rss_mb": harness.peak_rss_mb(),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
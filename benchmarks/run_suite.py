@@ -0,0 +1,49 @@
+"""
+Runs the audio, agent and tool benchmarks in one process and writes a single
+JSON report (throughput, latency percentiles, peak RSS) for CI to compare.
+Everything runs on CPU with no microphone, Gemini or Google account.
+
+    python -m benchmarks.run_suite --output bench-results.json
+    python -m benchmarks.run_suite --quick --model tiny
+"""
+import argparse
+import time
+
+from benchmarks import harness
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default=None, help="Where to write the JSON report")
+    parser.add_argument("--quick", action="store_true", help="Smaller run for CI smoke checks")
+    parser.add_argument("--model", default=None, help="Also decode fixtures with this Whisper model (e.g. tiny)")
+    parser.add_argument("--llm-latency-ms", type=float, default=20.0)
+    parser.add_argument("--api-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    harness.isolate()
+    from benchmarks import bench_audio, bench_agents, bench_tools
+
+    durations = (30, 120) if args.quick else (30, 120, 600)
+    turns = 40 if args.quick else 200
+    iterations = 100 if args.quick else 500
+
+    report = {"environment": harness.environment(), "config": vars(args), "suites": {}}
+    for name, suite in (
+        ("audio", lambda: bench_audio.run(harness.ensure_fixtures(durations), args.model)),
+        ("agents", lambda: bench_agents.run(turns, 4, args.llm_latency_ms, args.api_latency_ms)),
+        ("tools", lambda: bench_tools.run(iterations, args.api_latency_ms)),
+    ):
+        started = time.perf_counter()
+        try:
+            report["suites"][name] = suite()
+        except Exception as e:
+            report["suites"][name] = {"error": f"{type(e).__name__}: {e}"}
+        report["suites"][name]["wall_seconds"] = round(time.perf_counter() - started, 2)
+        report["suites"][name]["peak_rss_mb_after"] = harness.peak_rss_mb()
+    report["peak_rss_mb"] = harness.peak_rss_mb()
+    harness.write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
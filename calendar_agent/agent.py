@@ -1,11 +1,17 @@
 import os.path
+import sys
 import datetime
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from google.adk.agents import Agent
 
+sys.path.append('..')
+from tracing import (
+    trace_model_start, trace_model_end, trace_model_error, trace_tool_start, trace_tool_end, trace_tool_error,
+)
+from context_budget import budget_context, record_prompt_tokens
+from response_cache import cached_tool
+from speculation import speculative
+from google_clients import get_google_clients
+
 # --- Define Scopes (No Change) ---
 SCOPES = ["https://www.googleapis.com/auth/calendar.readonly"]
 
@@ -17,32 +23,21 @@ CREDENTIALS_PATH = os.path.join(SCRIPT_DIR, 'credentials.json')
 TOKEN_PATH = os.path.join(SCRIPT_DIR, 'token.json')
 
 
+@speculative()
+@cached_tool()
 def get_upcoming_events() -> dict:
     """
     Connects to the Google Calendar API and retrieves the next upcoming events.
     """
-    creds = None
-    # Use the absolute path to check for and load the token.
-    if os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
-        
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            # Use the absolute path to load the client secrets file.
-            flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
-            creds = flow.run_local_server(port=0)
-        # Save the credentials to the absolute path for the next run.
-        with open(TOKEN_PATH, "w") as token:
-            token.write(creds.to_json())
-
     try:
-        service = build("calendar", "v3", credentials=creds)
+        # The shared pool builds the client once and keeps the token fresh.
+        calendar = get_google_clients().get_client(
+            "calendar", "v3", SCOPES, TOKEN_PATH, CREDENTIALS_PATH
+        )
 
         now = datetime.datetime.utcnow().isoformat() + "Z"
-        events_result = (
-            service.events()
+        events_result = calendar.execute(
+            calendar.service.events()
             .list(
                 calendarId="primary",
                 timeMin=now,
@@ -50,7 +45,6 @@ def get_upcoming_events() -> dict:
                 singleEvents=True,
                 orderBy="startTime",
             )
-            .execute()
         )
         events = events_result.get("items", [])
 
@@ -79,4 +73,10 @@ root_agent = Agent(
     Summarize the events found in a clear, readable list for the user.
     """,
     tools=[get_upcoming_events],
+    before_model_callback=[budget_context, trace_model_start],
+    after_model_callback=[record_prompt_tokens, trace_model_end],
+    before_tool_callback=trace_tool_start,
+    after_tool_callback=trace_tool_end,
+    on_model_error_callback=trace_model_error,
+    on_tool_error_callback=trace_tool_error,
 )
@@ -0,0 +1,249 @@
+import json
+import hashlib
+import threading
+
+# --- Context Budget Configuration ---
+CHARS_PER_TOKEN = 4               # Rough estimate for Gemini tokenization of English text
+DEFAULT_TOKEN_BUDGET = 2000       # Contents budget for agents not listed below
+AGENT_TOKEN_BUDGETS = {
+    "meeting_coordinator": 3000,  # Needs recent conversation to resolve "that", "it", ...
+    "note_taker_agent": 800,      # Only the current request and its tool calls
+    "agenda_tracker_agent": 600,  # Everything else it needs comes from the agenda slice
+    "calendar_agent": 1500,       # Event listings can be long
+    "email_agent": 1000,
+}
+SUMMARY_SHARE = 0.25              # Part of each budget reserved for the running summary
+SUMMARY_LINE_CHARS = 160          # Each summarized turn is cut to this length
+SUMMARY_STATE_PREFIX = "context_summary:"
+RESUME_FINGERPRINTS = 8           # Last folded contents remembered to check the resume position
+LOG_EVERY_TURN = True
+
+
+def estimate_tokens(content):
+    """Cheap token estimate for one Content, without a round trip to count_tokens."""
+    chars = 0
+    for part in content.parts or ():
+        if part.text:
+            chars += len(part.text)
+        elif part.function_call:
+            chars += len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+        elif part.function_response:
+            chars += len(part.function_response.name or "") + len(json.dumps(part.function_response.response or {}, default=str))
+    return chars // CHARS_PER_TOKEN + 1
+
+
+def _fingerprint(content):
+    return hashlib.sha1(content.model_dump_json(exclude_none=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _summary_line(content):
+    """One short line per folded Content; tool results are only acknowledged."""
+    pieces = []
+    for part in content.parts or ():
+        if part.text:
+            pieces.append(" ".join(part.text.split()))
+        elif part.function_call:
+            args = json.dumps(part.function_call.args or {}, default=str)
+            pieces.append(f"called {part.function_call.name}({args})")
+        elif part.function_response:
+            pieces.append(f"{part.function_response.name} returned")
+    if not pieces:
+        return None
+    line = f"{content.role or 'user'}: {'; '.join(pieces)}"
+    if len(line) > SUMMARY_LINE_CHARS:
+        line = line[:SUMMARY_LINE_CHARS - 3] + "..."
+    return line
+
+
+def _is_turn_start(content):
+    """A user message with text, i.e. a point where the history can be cut without splitting a tool call."""
+    return content.role == "user" and any(part.text for part in content.parts or ())
+
+
+class ContextBudget:
+    """
+    Keeps each agent's request under a token budget for long meetings.
+
+    Runs as an ADK `before_model_callback`. The most recent turns that fit the
+    agent's budget are sent as-is. Older turns are folded into a running
+    summary that lives in session state (`context_summary:<agent>`), so it
+    survives restarts with a persistent session backend. The fold is
+    incremental: the summary remembers how many Contents it has absorbed and
+    the fingerprints of the last few, and only turns evicted since then are
+    added. Once the summary outgrows its share of the budget its oldest lines
+    are dropped.
+
+    Agents can register a state slice, a function of the callback context that
+    returns the only extra facts the agent needs (e.g. the agenda position for
+    the agenda tracker), which is appended to its instructions.
+
+    `record_usage` (the `after_model_callback`) logs the prompt tokens Gemini
+    actually billed next to the estimate.
+    """
+
+    def __init__(self, budgets=AGENT_TOKEN_BUDGETS, default_budget=DEFAULT_TOKEN_BUDGET):
+        self.budgets = dict(budgets)
+        self.default_budget = default_budget
+        self._slices = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def add_state_slice(self, agent_name, state_slice):
+        self._slices[agent_name] = state_slice
+
+    def budget_for(self, agent_name):
+        return self.budgets.get(agent_name, self.default_budget)
+
+    def _agent_stats(self, agent_name):
+        stats = self._stats.get(agent_name)
+        if stats is None:
+            stats = {"turns": 0, "tokens_full": 0, "tokens_sent": 0, "turns_summarized": 0, "prompt_tokens_billed": 0}
+            self._stats[agent_name] = stats
+        return stats
+
+    # --- Step 1: Choose what to keep ---
+
+    def _cut_index(self, contents, window_budget):
+        """Index of the oldest turn start whose suffix still fits the budget (the newest turn is always kept)."""
+        cut = None
+        suffix_tokens = 0
+        for index in range(len(contents) - 1, -1, -1):
+            suffix_tokens += estimate_tokens(contents[index])
+            if _is_turn_start(contents[index]):
+                if cut is not None and suffix_tokens > window_budget:
+                    break
+                cut = index
+        return cut or 0
+
+    # --- Step 2: Fold evicted turns into the running summary ---
+
+    @staticmethod
+    def _resume_index(summary, evicted):
+        """
+        Where the previous fold stopped in `evicted`. The history only grows at
+        the end, so that is normally the number of Contents already folded.
+        The fingerprints of the last ones confirm it; fingerprints alone would
+        match any repeated message ("what's next?", "Note saved.").
+
+        If they do not match, older events were compacted away, so the
+        position can only have moved earlier. The nearest earlier position
+        where the whole fingerprint tail matches is used. If there is none,
+        everything that was folded is gone and all of `evicted` is new.
+        """
+        # Summaries saved before positions were tracked only have "last".
+        tail = summary.get("tail") or ([summary["last"]] if summary.get("last") else [])
+        if not tail:
+            return 0
+        folded = min(summary.get("folded", len(evicted)), len(evicted))
+        if folded >= len(tail) and [_fingerprint(c) for c in evicted[folded - len(tail):folded]] == tail:
+            return folded
+        prints = [_fingerprint(content) for content in evicted[:folded]]
+        for end in range(folded - 1, len(tail) - 1, -1):
+            if prints[end - len(tail):end] == tail:
+                return end
+        return 0
+
+    def _fold(self, state, agent_name, evicted, summary_budget):
+        key = SUMMARY_STATE_PREFIX + agent_name
+        summary = state.get(key) or {"lines": [], "folded": 0, "tail": [], "dropped": 0}
+        start = self._resume_index(summary, evicted)
+        new_contents = evicted[start:]
+        if not new_contents:
+            return summary, 0
+
+        lines = list(summary["lines"])
+        for content in new_contents:
+            line = _summary_line(content)
+            if line:
+                lines.append(line)
+        dropped = summary["dropped"]
+        max_chars = summary_budget * CHARS_PER_TOKEN
+        total = sum(len(line) + 1 for line in lines)
+        while lines and total > max_chars:
+            total -= len(lines.pop(0)) + 1
+            dropped += 1
+
+        summary = {
+            "lines": lines,
+            "folded": len(evicted),
+            "tail": [_fingerprint(content) for content in evicted[-RESUME_FINGERPRINTS:]],
+            "dropped": dropped,
+        }
+        state[key] = summary
+        return summary, len(new_contents)
+
+    # --- Step 3: The callbacks ---
+
+    def before_model(self, callback_context, llm_request):
+        agent_name = callback_context.agent_name
+        budget = self.budget_for(agent_name)
+        summary_budget = int(budget * SUMMARY_SHARE)
+        contents = list(llm_request.contents)
+        tokens_full = sum(estimate_tokens(content) for content in contents)
+
+        folded = 0
+        summary = callback_context.state.get(SUMMARY_STATE_PREFIX + agent_name)
+        if tokens_full > budget - summary_budget:
+            cut = self._cut_index(contents, budget - summary_budget)
+            if cut > 0:
+                summary, folded = self._fold(callback_context.state, agent_name, contents[:cut], summary_budget)
+                llm_request.contents = contents[cut:]
+
+        extra = []
+        if summary and summary["lines"]:
+            header = "Summary of the earlier conversation in this meeting"
+            if summary["dropped"]:
+                header += f" ({summary['dropped']} older messages omitted)"
+            extra.append(header + ":\n" + "\n".join(summary["lines"]))
+        state_slice = self._slices.get(agent_name)
+        if state_slice is not None:
+            try:
+                text = state_slice(callback_context)
+                if text:
+                    extra.append(text)
+            except Exception as e:
+                print(f"ERROR: Context slice for {agent_name} failed. {e}")
+        if extra:
+            llm_request.append_instructions(extra)
+
+        tokens_sent = sum(estimate_tokens(content) for content in llm_request.contents)
+        tokens_sent += sum(len(text) for text in extra) // CHARS_PER_TOKEN
+        with self._lock:
+            stats = self._agent_stats(agent_name)
+            stats["turns"] += 1
+            stats["tokens_full"] += tokens_full
+            stats["tokens_sent"] += tokens_sent
+            stats["turns_summarized"] += folded
+        if LOG_EVERY_TURN:
+            print(f"DEBUG: Context for {agent_name}: ~{tokens_sent} tokens sent "
+                  f"(~{tokens_full} in full history, {folded} contents summarized)")
+        return None
+
+    def record_usage(self, callback_context, llm_response):
+        usage = llm_response.usage_metadata
+        if usage is not None and usage.prompt_token_count:
+            with self._lock:
+                self._agent_stats(callback_context.agent_name)["prompt_tokens_billed"] += usage.prompt_token_count
+        return None
+
+    def stats(self):
+        with self._lock:
+            summary = {}
+            for agent_name, stats in self._stats.items():
+                entry = dict(stats)
+                if stats["tokens_full"]:
+                    entry["tokens_saved_pct"] = round(100 * (1 - stats["tokens_sent"] / stats["tokens_full"]), 1)
+                summary[agent_name] = entry
+            return summary
+
+
+# --- Shared instance used by every agent ---
+context_budget = ContextBudget()
+
+def budget_context(callback_context, llm_request):
+    """before_model_callback: trims the request to the agent's budget."""
+    return context_budget.before_model(callback_context, llm_request)
+
+def record_prompt_tokens(callback_context, llm_response):
+    """after_model_callback: records the prompt tokens reported by the model."""
+    return context_budget.record_usage(callback_context, llm_response)
@@ -5,20 +5,27 @@ from google.adk.tools import agent_tool
 
 # --- Step 1: Import All Your Specialist Agents ---
 sys.path.append('..')
+from tracing import (
+    trace_model_start, trace_model_end, trace_model_error, trace_tool_start, trace_tool_end, trace_tool_error,
+)
+from context_budget import budget_context, record_prompt_tokens
+from lazy_agent_tool import LazyAgentTool
 from note_taker_agent.agent import root_agent as note_taker_agent
 from agenda_tracker_agent.agent import root_agent as agenda_tracker_agent
-from calendar_agent.agent import root_agent as calendar_agent
-# Import the new Email Agent
-from email_agent.agent import root_agent as email_agent
 
 
 # --- Step 2: Wrap All Agents as Tools ---
 # The tool's name is derived from the 'name' attribute inside each agent's definition.
 note_taker_as_tool = agent_tool.AgentTool(agent=note_taker_agent)
 agenda_tracker_as_tool = agent_tool.AgentTool(agent=agenda_tracker_agent)
-calendar_as_tool = agent_tool.AgentTool(agent=calendar_agent)
-# Wrap the new Email Agent
-email_as_tool = agent_tool.AgentTool(agent=email_agent)
+# Calendar and email are used rarely in a meeting, so they (and the Google API
+# client libraries) are only imported the first time the coordinator calls them.
+calendar_as_tool = LazyAgentTool(
+    "calendar_agent.agent", "calendar_agent", "An agent that can read a user's Google Calendar."
+)
+email_as_tool = LazyAgentTool(
+    "email_agent.agent", "email_agent", "An agent that can send a summary email of the meeting."
+)
 
 
 # --- Step 3: Define the Final Coordinator Agent ---
@@ -31,7 +38,7 @@ root_agent = Agent(
     You are the lead coordinator for a meeting. Your job is to understand the user's request and delegate it to the correct specialist agent.
 
     - If the user's request is about taking a note or remembering an action item,
-      you MUST use the `note_taker_agent` tool.
+      or asks what was said or decided in an earlier meeting, you MUST use the `note_taker_agent` tool.
 
     - If the user's request is about the meeting agenda (reading it, asking what's next, etc.),
       you MUST use the `agenda_tracker_agent` tool.
@@ -49,5 +56,11 @@ root_agent = Agent(
         agenda_tracker_as_tool,
         calendar_as_tool,
         email_as_tool  # Add the final tool to the list
-    ]
+    ],
+    before_model_callback=[budget_context, trace_model_start],
+    after_model_callback=[record_prompt_tokens, trace_model_end],
+    before_tool_callback=trace_tool_start,
+    after_tool_callback=trace_tool_end,
+    on_model_error_callback=trace_model_error,
+    on_tool_error_callback=trace_tool_error,
 )
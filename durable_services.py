@@ -0,0 +1,437 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import datetime
+import threading
+
+from google.adk.events import Event
+from google.adk.memory import BaseMemoryService
+from google.adk.memory.base_memory_service import SearchMemoryResponse
+from google.adk.memory.memory_entry import MemoryEntry
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+from google.genai import types as genai_types
+
+from note_store import DATA_DIR
+from text_index import tokenize
+
+# --- Durable Backend Configuration ---
+SESSION_DB_PATH = os.environ.get("SESSION_DB_PATH", os.path.join(DATA_DIR, "sessions.db"))
+KEEP_RECENT_EVENTS = 200       # Events per session kept verbatim; older ones are compacted
+COMPACT_EVERY = 50             # Compaction runs once this many events piled up past the limit
+SNAPSHOT_MAX_CHARS = 8000      # Size cap of the rolled-up summary of compacted events
+SNAPSHOT_LINE_CHARS = 200      # Each compacted event contributes at most this much text
+MEMORY_SEARCH_LIMIT = 10
+
+
+def _connect(db_path):
+    if os.path.dirname(db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def _starts_turn(event):
+    """A user message (not a function response sent back as the user) begins a new turn."""
+    return event.author == "user" and not event.get_function_responses()
+
+def _event_text(event):
+    if not event.content or not event.content.parts:
+        return ""
+    return " ".join(part.text for part in event.content.parts if part.text)
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    Durable session service on SQLite in WAL mode.
+
+    Every event is appended as one row as it happens, so nothing is rewritten
+    per turn and a restart loses nothing. Once a session holds more than
+    KEEP_RECENT_EVENTS events the oldest whole turns are folded into a running
+    text snapshot (extended incrementally, never rebuilt) and deleted, which keeps
+    both the table and the session the Runner loads bounded. The snapshot is
+    returned as a synthetic first event so the agents still see the gist.
+    `get_session` honours GetSessionConfig for bounded recent-context reads.
+
+    `on_compact(session, events)` is called with events before they are
+    deleted, e.g. to hand them to a memory service.
+    """
+
+    def __init__(self, db_path=SESSION_DB_PATH, keep_recent_events=KEEP_RECENT_EVENTS,
+                 compact_every=COMPACT_EVERY, on_compact=None):
+        self.db_path = db_path
+        self.keep_recent_events = keep_recent_events
+        self.compact_every = compact_every
+        self.on_compact = on_compact
+        self._conn = _connect(db_path)
+        self._lock = threading.Lock()
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    snapshot TEXT NOT NULL DEFAULT '',
+                    event_count INTEGER NOT NULL DEFAULT 0,
+                    update_time REAL NOT NULL,
+                    PRIMARY KEY (app_name, user_id, id)
+                );
+                CREATE TABLE IF NOT EXISTS events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS events_by_session
+                    ON events (app_name, user_id, session_id, seq);
+                CREATE TABLE IF NOT EXISTS app_state (
+                    app_name TEXT PRIMARY KEY,
+                    state TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS user_state (
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    PRIMARY KEY (app_name, user_id)
+                );
+            """)
+
+    # --- State helpers ---
+
+    def _load_state(self, table, where, args):
+        row = self._conn.execute(f"SELECT state FROM {table} WHERE {where}", args).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _merged_state(self, app_name, user_id, session_state):
+        state = dict(session_state)
+        for key, value in self._load_state("app_state", "app_name = ?", (app_name,)).items():
+            state[State.APP_PREFIX + key] = value
+        for key, value in self._load_state(
+            "user_state", "app_name = ? AND user_id = ?", (app_name, user_id)
+        ).items():
+            state[State.USER_PREFIX + key] = value
+        return state
+
+    def _write_scoped_state(self, app_name, user_id, delta):
+        """Splits a state delta into app/user/session parts and persists the shared ones."""
+        app_delta, user_delta, session_delta = {}, {}, {}
+        for key, value in delta.items():
+            if key.startswith(State.APP_PREFIX):
+                app_delta[key[len(State.APP_PREFIX):]] = value
+            elif key.startswith(State.USER_PREFIX):
+                user_delta[key[len(State.USER_PREFIX):]] = value
+            elif not key.startswith(State.TEMP_PREFIX):
+                session_delta[key] = value
+        if app_delta:
+            state = self._load_state("app_state", "app_name = ?", (app_name,))
+            state.update(app_delta)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO app_state (app_name, state) VALUES (?, ?)",
+                (app_name, json.dumps(state)),
+            )
+        if user_delta:
+            state = self._load_state("user_state", "app_name = ? AND user_id = ?", (app_name, user_id))
+            state.update(user_delta)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_state (app_name, user_id, state) VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(state)),
+            )
+        return session_delta
+
+    # --- BaseSessionService ---
+
+    async def create_session(self, *, app_name, user_id, state=None, session_id=None):
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                session_state = self._write_scoped_state(app_name, user_id, state or {})
+                self._conn.execute(
+                    "INSERT INTO sessions (app_name, user_id, id, state, update_time) VALUES (?, ?, ?, ?, ?)",
+                    (app_name, user_id, session_id, json.dumps(session_state), now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            merged = self._merged_state(app_name, user_id, session_state)
+        return Session(app_name=app_name, user_id=user_id, id=session_id, state=merged, last_update_time=now)
+
+    async def get_session(self, *, app_name, user_id, session_id, config: GetSessionConfig = None):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, snapshot, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            session_state, snapshot, update_time = json.loads(row[0]), row[1], row[2]
+
+            where = "app_name = ? AND user_id = ? AND session_id = ?"
+            args = [app_name, user_id, session_id]
+            if config is not None and config.after_timestamp is not None:
+                where += " AND timestamp >= ?"
+                args.append(config.after_timestamp)
+            if config is not None and config.num_recent_events is not None:
+                # Only the newest rows are read and decoded, however long the session is.
+                rows = self._conn.execute(
+                    f"SELECT data FROM (SELECT seq, data FROM events WHERE {where} "
+                    "ORDER BY seq DESC LIMIT ?) ORDER BY seq",
+                    args + [config.num_recent_events],
+                ).fetchall()
+            else:
+                rows = self._conn.execute(f"SELECT data FROM events WHERE {where} ORDER BY seq", args).fetchall()
+            merged = self._merged_state(app_name, user_id, session_state)
+
+        events = [Event.model_validate_json(data) for (data,) in rows]
+        wants_full_history = config is None or (
+            config.after_timestamp is None and config.num_recent_events is None
+        )
+        if snapshot and wants_full_history:
+            events.insert(0, Event(
+                invocation_id="compacted-history",
+                author="user",
+                timestamp=events[0].timestamp if events else update_time,
+                content=genai_types.Content(role="user", parts=[genai_types.Part(
+                    text=f"[Summary of earlier conversation]\n{snapshot}"
+                )]),
+            ))
+        return Session(
+            app_name=app_name, user_id=user_id, id=session_id,
+            state=merged, events=events, last_update_time=update_time,
+        )
+
+    async def list_sessions(self, *, app_name, user_id=None):
+        with self._lock:
+            if user_id is None:
+                rows = self._conn.execute(
+                    "SELECT user_id, id, state, update_time FROM sessions WHERE app_name = ?", (app_name,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT user_id, id, state, update_time FROM sessions WHERE app_name = ? AND user_id = ?",
+                    (app_name, user_id),
+                ).fetchall()
+            sessions = [
+                Session(
+                    app_name=app_name, user_id=row_user, id=session_id,
+                    state=self._merged_state(app_name, row_user, json.loads(state)),
+                    last_update_time=update_time,
+                )
+                for row_user, session_id, state, update_time in rows
+            ]
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name, user_id, session_id):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            )
+            self._conn.execute(
+                "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            )
+            self._conn.execute("COMMIT")
+
+    async def append_event(self, session, event):
+        if event.partial:
+            return event
+        event = await super().append_event(session, event)
+        session.last_update_time = event.timestamp
+
+        compacted = None
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(
+                    "SELECT state, event_count FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                    (session.app_name, session.user_id, session.id),
+                ).fetchone()
+                if row is None:
+                    raise ValueError(f"Session {session.id} not found.")
+                session_state, event_count = json.loads(row[0]), row[1] + 1
+                if event.actions and event.actions.state_delta:
+                    session_state.update(
+                        self._write_scoped_state(session.app_name, session.user_id, event.actions.state_delta)
+                    )
+                self._conn.execute(
+                    "INSERT INTO events (app_name, user_id, session_id, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+                    (session.app_name, session.user_id, session.id, event.timestamp,
+                     event.model_dump_json(exclude_none=True)),
+                )
+                self._conn.execute(
+                    "UPDATE sessions SET state = ?, event_count = ?, update_time = ? "
+                    "WHERE app_name = ? AND user_id = ? AND id = ?",
+                    (json.dumps(session_state), event_count, event.timestamp,
+                     session.app_name, session.user_id, session.id),
+                )
+                if event_count > self.keep_recent_events + self.compact_every:
+                    compacted = self._compact(session, event_count, event_count - self.keep_recent_events)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if compacted:
+            # Keep the live object in step with what get_session would now return.
+            compacted_ids = {compacted_event.id for compacted_event in compacted}
+            session.events[:] = [e for e in session.events if e.id not in compacted_ids]
+            if self.on_compact is not None:
+                await self.on_compact(session, compacted)
+        return event
+
+    def _compact(self, session, event_count, count):
+        """
+        Folds up to the oldest `count` events into the snapshot (runs inside
+        append_event's transaction). The cut is moved back to the start of a
+        user turn, so a model's function call is never folded away from its
+        function response; if the range holds no turn boundary nothing is
+        folded yet.
+        """
+        key = (session.app_name, session.user_id, session.id)
+        # One row past `count`, so that a turn starting right after the range still counts as a boundary.
+        rows = self._conn.execute(
+            "SELECT seq, data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? "
+            "ORDER BY seq LIMIT ?",
+            key + (count + 1,),
+        ).fetchall()
+        events = [Event.model_validate_json(data) for _, data in rows]
+        cut = next((index for index in range(len(events) - 1, 0, -1) if _starts_turn(events[index])), 0)
+        if cut == 0:
+            return []
+        rows, events = rows[:cut], events[:cut]
+
+        lines = []
+        for event in events:
+            text = _event_text(event).strip()
+            if text:
+                lines.append(f"{event.author}: {text[:SNAPSHOT_LINE_CHARS]}")
+        snapshot = self._conn.execute(
+            "SELECT snapshot FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key
+        ).fetchone()[0]
+        snapshot = "\n".join(filter(None, [snapshot] + lines))
+        if len(snapshot) > SNAPSHOT_MAX_CHARS:
+            snapshot = snapshot[-SNAPSHOT_MAX_CHARS:].split("\n", 1)[-1]
+
+        self._conn.execute(
+            "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND seq <= ?",
+            key + (rows[-1][0],),
+        )
+        self._conn.execute(
+            "UPDATE sessions SET snapshot = ?, event_count = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+            (snapshot, event_count - len(events)) + key,
+        )
+        return events
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SqliteMemoryService(BaseMemoryService):
+    """
+    Durable memory with an inverted index instead of a linear scan.
+
+    Each text event becomes one memory row; its distinct terms go into a
+    (term, memory_id) postings table, so a search only touches the rows that
+    share a term with the query. Results are ranked by matched query terms,
+    then recency. Re-adding a session only indexes events not seen before.
+    """
+
+    def __init__(self, db_path=SESSION_DB_PATH):
+        self.db_path = db_path
+        self._conn = _connect(db_path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS memories (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    event_id TEXT NOT NULL UNIQUE,
+                    author TEXT,
+                    timestamp REAL NOT NULL,
+                    content TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS memory_postings (
+                    term TEXT NOT NULL,
+                    memory_id INTEGER NOT NULL,
+                    PRIMARY KEY (term, memory_id)
+                ) WITHOUT ROWID;
+            """)
+
+    def _index_events(self, app_name, user_id, events):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for event in events:
+                    text = _event_text(event)
+                    terms = set(tokenize(text))
+                    if not terms:
+                        continue
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO memories (app_name, user_id, event_id, author, timestamp, content) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (app_name, user_id, event.id or str(uuid.uuid4()), event.author, event.timestamp,
+                         event.content.model_dump_json(exclude_none=True)),
+                    )
+                    if cursor.rowcount == 0:
+                        continue
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO memory_postings (term, memory_id) VALUES (?, ?)",
+                        [(term, cursor.lastrowid) for term in terms],
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    async def add_session_to_memory(self, session):
+        self._index_events(session.app_name, session.user_id, session.events)
+
+    async def add_compacted_events(self, session, events):
+        """`SqliteSessionService.on_compact` hook: keep compacted events searchable."""
+        self._index_events(session.app_name, session.user_id, events)
+
+    async def search_memory(self, *, app_name, user_id, query):
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return SearchMemoryResponse(memories=[])
+        placeholders = ",".join("?" * len(terms))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT m.author, m.timestamp, m.content, COUNT(*) AS matched
+                FROM memory_postings p JOIN memories m ON m.id = p.memory_id
+                WHERE p.term IN ({placeholders}) AND m.app_name = ? AND m.user_id = ?
+                GROUP BY m.id
+                ORDER BY matched DESC, m.timestamp DESC
+                LIMIT ?
+                """,
+                (*terms, app_name, user_id, MEMORY_SEARCH_LIMIT),
+            ).fetchall()
+        return SearchMemoryResponse(memories=[
+            MemoryEntry(
+                content=genai_types.Content.model_validate_json(content),
+                author=author,
+                timestamp=datetime.datetime.fromtimestamp(timestamp).isoformat(),
+            )
+            for author, timestamp, content, _ in rows
+        ])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,12 +1,21 @@
 import os
+import sys
+import atexit
 import base64
-import datetime  # Import the datetime module
+import datetime
 from email.mime.text import MIMEText
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from google.adk.agents import Agent
+from google.adk.tools import ToolContext
+
+sys.path.append('..')
+from tracing import (
+    trace_model_start, trace_model_end, trace_model_error, trace_tool_start, trace_tool_end, trace_tool_error,
+)
+from context_budget import budget_context, record_prompt_tokens
+from google_clients import get_google_clients
+from note_store import meeting_id_from_context
+from summary_builder import get_summary_builder
+from email_outbox import EmailOutbox
 
 # --- Define Scopes and Paths (No Change) ---
 SCOPES = ["https://www.googleapis.com/auth/gmail.send"]
@@ -14,70 +23,70 @@ SCRIPT_DIR = os.path.dirname(__file__)
 CREDENTIALS_PATH = os.path.join(SCRIPT_DIR, 'credentials.json')
 TOKEN_PATH = os.path.join(SCRIPT_DIR, 'token_gmail.json')
 
-def send_follow_up_email(recipient: str, subject: str) -> dict:
-    """
-    Reads the meeting notes and action items, then sends them in a follow-up email.
-    """
-    # --- Part 1: Gather notes (THE CRITICAL FIX) ---
-    try:
-        # Get today's date in the same format used by the note-taker
-        today_str = datetime.date.today().strftime("%Y-%m-%d")
-        
-        # Dynamically create the filenames with today's date
-        notes_filename = f"meeting_notes_{today_str}.txt"
-        actions_filename = f"action_items_{today_str}.txt"
 
-        notes_path = os.path.join(SCRIPT_DIR, '..', notes_filename)
-        actions_path = os.path.join(SCRIPT_DIR, '..', actions_filename)
+def _send_via_gmail(recipient, subject, body):
+    """Sends one email through the shared Gmail client and returns its message ID."""
+    gmail = get_google_clients().get_client("gmail", "v1", SCOPES, TOKEN_PATH, CREDENTIALS_PATH)
+    message = MIMEText(body)
+    message["to"] = recipient
+    message["subject"] = subject
+    create_message = {"raw": base64.urlsafe_b64encode(message.as_bytes()).decode()}
+    send_message = gmail.execute(
+        gmail.service.users().messages().send(userId="me", body=create_message)
+    )
+    return send_message["id"]
 
-        email_body = "Hello,\n\nHere is a summary of our meeting.\n\n"
-        
-        email_body += "--- Meeting Notes ---\n"
-        if os.path.exists(notes_path):
-            with open(notes_path, 'r') as f:
-                email_body += f.read()
-        else:
-            email_body += "No general notes were taken for today.\n"
+# Gmail calls happen on the outbox's thread; the tool only queues the email.
+outbox = EmailOutbox(_send_via_gmail)
+atexit.register(outbox.close)
 
-        email_body += "\n--- Action Items ---\n"
-        if os.path.exists(actions_path):
-            with open(actions_path, 'r') as f:
-                email_body += f.read()
-        else:
-            email_body += "No action items were identified for today.\n"
-            
-        email_body += "\nBest regards,\nYour AI Meeting Assistant"
 
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to read note files: {str(e)}"}
+def _parse_time(value):
+    if not value:
+        return None
+    parsed = datetime.datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.astimezone()
 
-    # --- Part 2: Authenticate and Send (No Change) ---
-    creds = None
-    if os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
-        
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open(TOKEN_PATH, "w") as token:
-            token.write(creds.to_json())
+def send_follow_up_email(recipient: str, subject: str, since: str = "", until: str = "",
+                         tool_context: ToolContext = None) -> dict:
+    """
+    Sends this meeting's notes and action items in a follow-up email.
+    `since` and `until` optionally limit it to notes taken in that range
+    (ISO date/times, e.g. "2025-10-01T14:00").
+    """
+    # --- Part 1: Build the summary from this meeting's notes ---
+    try:
+        meeting_id = meeting_id_from_context(tool_context)
+        email_body = get_summary_builder().render(meeting_id, _parse_time(since), _parse_time(until))
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to read meeting notes: {str(e)}"}
 
+    # --- Part 2: Queue it for the outbox to send ---
     try:
-        service = build("gmail", "v1", credentials=creds)
-        message = MIMEText(email_body)
-        message["to"] = recipient
-        message["subject"] = subject
-        create_message = {"raw": base64.urlsafe_b64encode(message.as_bytes()).decode()}
-        send_message = (
-            service.users().messages().send(userId="me", body=create_message).execute()
-        )
-        return {"status": "success", "message_id": send_message["id"]}
+        email = outbox.enqueue(recipient, subject, email_body, meeting_id)
+        return {
+            "status": "success",
+            "message": f"The summary email to {recipient} is queued and will be sent in the background.",
+            "email_id": email["email_id"],
+        }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+def check_email_status(email_id: str = "", tool_context: ToolContext = None) -> dict:
+    """
+    Reports whether a follow-up email was sent. Without an email_id it lists
+    every email queued for this meeting.
+    """
+    if email_id:
+        email = outbox.status(email_id=email_id)
+        if email is None:
+            return {"status": "error", "message": f"No email with id '{email_id}' was queued."}
+        return {"status": "success", "emails": [email]}
+    emails = outbox.status(meeting_id=meeting_id_from_context(tool_context))
+    if not emails:
+        return {"status": "success", "message": "No emails have been queued for this meeting.", "emails": []}
+    return {"status": "success", "emails": emails}
+
 # --- Define the Agent (No Change) ---
 root_agent = Agent(
     name="email_agent",
@@ -87,6 +96,14 @@ root_agent = Agent(
     You are a helpful assistant that sends follow-up emails.
     When the user asks you to send the meeting summary, you MUST use the `send_follow_up_email` tool.
     You will need to ask the user for the recipient's email address and the subject line.
+    Emails are sent in the background, so tell the user the email is queued rather than sent.
+    When the user asks whether an email went out, use the `check_email_status` tool.
     """,
-    tools=[send_follow_up_email],
+    tools=[send_follow_up_email, check_email_status],
+    before_model_callback=[budget_context, trace_model_start],
+    after_model_callback=[record_prompt_tokens, trace_model_end],
+    before_tool_callback=trace_tool_start,
+    after_tool_callback=trace_tool_end,
+    on_model_error_callback=trace_model_error,
+    on_tool_error_callback=trace_tool_error,
 )
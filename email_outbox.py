@@ -0,0 +1,193 @@
+import time
+import heapq
+import random
+import secrets
+import datetime
+import threading
+
+# --- Outbox Configuration ---
+MAX_ATTEMPTS = 5                  # Sends tried before an email is marked failed
+RETRY_BASE_SECONDS = 2.0          # First retry delay; doubles on every further attempt
+RETRY_MAX_SECONDS = 120.0
+RETRY_JITTER = 0.25               # +/- fraction added to each delay so retries do not line up
+RETRYABLE_HTTP_STATUSES = (408, 429, 500, 502, 503, 504)
+EXIT_DRAIN_SECONDS = 30.0         # How long shutdown waits for queued emails to go out
+
+
+def is_transient(error):
+    """True for errors worth retrying: rate limits, server errors and dropped connections."""
+    status = getattr(getattr(error, "resp", None), "status", None)
+    if status is not None:
+        return int(status) in RETRYABLE_HTTP_STATUSES
+    if isinstance(error, (FileNotFoundError, PermissionError)):
+        return False   # Missing credentials will not appear on their own.
+    try:
+        import httplib2
+    except ImportError:
+        httplib2 = None
+    if httplib2 is not None and isinstance(error, httplib2.HttpLib2Error):
+        return True    # Transport failures: server not found, bad redirects, truncated responses.
+    return isinstance(error, (OSError, TimeoutError, ConnectionError))
+
+
+class OutboxEmail:
+    __slots__ = ("email_id", "meeting_id", "recipient", "subject", "body", "status",
+                 "attempts", "message_id", "error", "queued_at", "sent_at")
+
+    def __init__(self, meeting_id, recipient, subject, body):
+        self.email_id = secrets.token_hex(4)
+        self.meeting_id = meeting_id
+        self.recipient = recipient
+        self.subject = subject
+        self.body = body
+        self.status = "queued"      # queued -> sending -> sent | retrying | failed
+        self.attempts = 0
+        self.message_id = None
+        self.error = None
+        self.queued_at = datetime.datetime.now().astimezone().isoformat(timespec="seconds")
+        self.sent_at = None
+
+    def to_dict(self):
+        return {
+            "email_id": self.email_id,
+            "recipient": self.recipient,
+            "subject": self.subject,
+            "status": self.status,
+            "attempts": self.attempts,
+            "message_id": self.message_id,
+            "error": self.error,
+            "queued_at": self.queued_at,
+            "sent_at": self.sent_at,
+        }
+
+
+class EmailOutbox:
+    """
+    Sends emails from a background thread so a tool call only has to queue one.
+
+    `send(recipient, subject, body)` does the actual delivery and returns the
+    provider's message ID. Transient failures (see `is_transient`) are retried
+    with exponential backoff and jitter up to `max_attempts`; anything else
+    fails the email at once. Every email's progress stays queryable through
+    `status` for the rest of the session.
+    """
+
+    def __init__(self, send, max_attempts=MAX_ATTEMPTS, retry_base_seconds=RETRY_BASE_SECONDS,
+                 retry_max_seconds=RETRY_MAX_SECONDS):
+        self.send = send
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._emails = {}
+        self._due = []            # heap of (due_monotonic, sequence, email_id)
+        self._sequence = 0
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+        self.stats = {"queued": 0, "sent": 0, "retries": 0, "failed": 0}
+
+    def enqueue(self, recipient, subject, body, meeting_id=None):
+        """Queues an email for delivery and returns its outbox entry as a dict."""
+        email = OutboxEmail(meeting_id, recipient, subject, body)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("The outbox is shut down.")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+                self._thread.start()
+            self._emails[email.email_id] = email
+            self._schedule(email.email_id, 0.0)
+            self.stats["queued"] += 1
+            return email.to_dict()
+
+    def status(self, email_id=None, meeting_id=None):
+        """One email as a dict (None if unknown), or every email of a meeting, oldest first."""
+        with self._cond:
+            if email_id:
+                email = self._emails.get(email_id)
+                return email.to_dict() if email is not None else None
+            return [e.to_dict() for e in self._emails.values() if meeting_id is None or e.meeting_id == meeting_id]
+
+    def _schedule(self, email_id, delay):
+        self._sequence += 1
+        heapq.heappush(self._due, (time.monotonic() + delay, self._sequence, email_id))
+        self._cond.notify_all()
+
+    def _retry_delay(self, attempts):
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(1 - RETRY_JITTER, 1 + RETRY_JITTER)
+
+    def _next_due(self):
+        """Blocks until an email is due; returns None once closed and drained."""
+        with self._cond:
+            while True:
+                if self._due:
+                    wait = self._due[0][0] - time.monotonic()
+                    if wait <= 0:
+                        email = self._emails[heapq.heappop(self._due)[2]]
+                        email.status = "sending"
+                        email.attempts += 1
+                        self._in_flight += 1
+                        return email
+                    self._cond.wait(wait)
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        while True:
+            email = self._next_due()
+            if email is None:
+                return
+            try:
+                message_id = self.send(email.recipient, email.subject, email.body)
+                error = None
+            except Exception as e:
+                message_id, error = None, e
+
+            with self._cond:
+                self._in_flight -= 1
+                if error is None:
+                    email.status = "sent"
+                    email.message_id = message_id
+                    email.error = None
+                    email.sent_at = datetime.datetime.now().astimezone().isoformat(timespec="seconds")
+                    self.stats["sent"] += 1
+                elif is_transient(error) and email.attempts < self.max_attempts:
+                    email.status = "retrying"
+                    email.error = str(error)
+                    self.stats["retries"] += 1
+                    self._schedule(email.email_id, self._retry_delay(email.attempts))
+                else:
+                    email.status = "failed"
+                    email.error = str(error)
+                    self.stats["failed"] += 1
+                    print(f"ERROR: Email '{email.subject}' to {email.recipient} failed after {email.attempts} attempt(s). {error}")
+                self._cond.notify_all()
+
+    def pending(self):
+        with self._cond:
+            return len(self._due) + self._in_flight
+
+    def flush(self, timeout=None):
+        """Waits until every queued email is sent or failed; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._due or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout=EXIT_DRAIN_SECONDS):
+        """Gives queued emails up to `timeout` seconds to go out, then stops the sender."""
+        if not self.flush(timeout):
+            print(f"ERROR: {self.pending()} queued email(s) were not sent before shutdown.")
+        with self._cond:
+            self._closed = True
+            self._due.clear()
+            self._cond.notify_all()
+
@@ -0,0 +1,213 @@
+import collections
+import threading
+
+from tracing import tracer
+
+# --- Endpointing Configuration ---
+FRAME_DURATION_MS = 30            # Must match the capture frames (transcriber_whisper.FRAME_DURATION_MS)
+DEFAULT_HANGOVER_FRAMES = 50      # ~1.5 s, used until enough pauses have been observed
+MIN_HANGOVER_FRAMES = 8           # Never end an utterance after less than ~240 ms of silence
+MAX_HANGOVER_FRAMES = 67          # ... nor wait more than ~2 s
+PAUSE_HISTORY = 300               # Recent mid-utterance pauses the hangover is learned from
+MIN_PAUSES_TO_ADAPT = 15          # Pauses needed before the learned hangover replaces the default
+MIN_PAUSE_FRAMES = 3              # Shorter gaps are VAD flicker, not pauses
+PAUSE_PERCENTILE = 0.95           # Wait out this share of the speaker's usual pauses...
+PAUSE_MARGIN_FRAMES = 3           # ... plus a small margin
+
+SHORT_UTTERANCE_SECONDS = 1.5     # Speech this short is probably a command
+DICTATION_SECONDS = 6.0           # Speech this long is probably dictation
+COMMAND_SCALE = 0.4               # Hangover multipliers for each kind of utterance
+SHORT_SCALE = 0.85
+DICTATION_SCALE = 1.3
+REJOIN_FRAMES = 20                # Speech resuming this soon after an end means it was cut too early
+
+
+def _command_patterns():
+    """
+    The fast-path router's patterns for complete commands. Rules that take free
+    text ("take a note that ...") are left out: matching them says nothing about
+    whether the speaker has finished. Loaded on first use so the offline paths
+    never import the agents.
+    """
+    try:
+        from intent_router import INTENT_RULES
+    except ImportError:
+        return []
+    return [
+        pattern for rule in INTENT_RULES for pattern in rule.patterns
+        if "text" not in pattern.groupindex
+    ]
+
+
+class AdaptiveEndpointer:
+    """
+    Turns per-frame VAD decisions into utterance boundaries, like
+    `UtteranceSegmenter`, but with a hangover learned from the speaker.
+
+    Every pause inside an utterance (silence followed by more speech) is
+    recorded. Once enough are known, the base hangover is their 95th
+    percentile plus a margin instead of a fixed 1.5 s. Each utterance then
+    scales it:
+
+    - **command**: the latest partial transcript (from the streaming decoder,
+      via `hint`) fully matches one of the router's command patterns;
+    - **short**: no such match, but under SHORT_UTTERANCE_SECONDS of speech;
+    - **dictation**: more than DICTATION_SECONDS of speech, where a long
+      thinking pause should not split the note;
+    - **base** otherwise, and **default** until the distribution is learned.
+
+    If speech resumes within REJOIN_FRAMES of an end that was shortened for
+    a command or a short utterance, the gap was probably a pause. It is added
+    to the distribution and the end is counted as an early cut. Other quick
+    restarts are not fed back: in a meeting they are usually the next
+    speaker, and every such gap is longer than the current hangover, so
+    feeding them back would only ratchet it up.
+
+    Every endpoint's delay (the silence waited out) goes to the
+    "endpoint.delay" stage histogram. `stats()` compares it with the fixed
+    default.
+
+    `push` runs on the capture thread and `hint` on the streaming decoder's,
+    so both hold `_lock`; a hint can then never land on the utterance after
+    the one it was decoded from.
+    """
+
+    def __init__(self, default_hangover_frames=DEFAULT_HANGOVER_FRAMES, command_patterns=None,
+                 frame_ms=FRAME_DURATION_MS):
+        self.default_hangover_frames = default_hangover_frames
+        self.frame_ms = frame_ms
+        self._command_patterns = command_patterns
+        self._lock = threading.Lock()
+        self._pauses = collections.deque(maxlen=PAUSE_HISTORY)
+        self.is_speaking = False
+        self.silence_counter = 0
+        self.silence_frames = default_hangover_frames   # Hangover of the current/last utterance
+        self.utterances = 0
+        self.last_endpoint = None
+        self._speech_frames = 0
+        self._base = default_hangover_frames
+        self._base_reason = "default"
+        self._command_match = False
+        self._frames_since_end = None
+        self._delays = collections.deque(maxlen=PAUSE_HISTORY)
+        self._reasons = collections.Counter()
+        self.early_cuts = 0
+
+    # --- Learned hangover ---
+
+    def _learned_base(self):
+        if len(self._pauses) < MIN_PAUSES_TO_ADAPT:
+            return self.default_hangover_frames, "default"
+        ordered = sorted(self._pauses)
+        pause = ordered[min(len(ordered) - 1, int(len(ordered) * PAUSE_PERCENTILE))]
+        return pause + PAUSE_MARGIN_FRAMES, "base"
+
+    def _hangover(self):
+        speech_seconds = self._speech_frames * self.frame_ms / 1000
+        if self._command_match:
+            scale, reason = COMMAND_SCALE, "command"
+        elif speech_seconds < SHORT_UTTERANCE_SECONDS:
+            scale, reason = SHORT_SCALE, "short"
+        elif speech_seconds > DICTATION_SECONDS:
+            scale, reason = DICTATION_SCALE, "dictation"
+        else:
+            scale, reason = 1.0, self._base_reason
+        if self._base_reason == "default" and reason != "command":
+            # Without a learned distribution only a recognised command is shortened.
+            return self.default_hangover_frames, "default"
+        frames = round(self._base * scale)
+        return max(MIN_HANGOVER_FRAMES, min(MAX_HANGOVER_FRAMES, frames)), reason
+
+    def hint(self, partial_text, utterance=None):
+        """
+        Passes in the latest partial transcript of the current utterance.
+        `utterance` is the value of `utterances` the partial belongs to;
+        hints for an earlier utterance are ignored.
+        """
+        if self._command_patterns is None:
+            self._command_patterns = _command_patterns()
+        text = partial_text.strip().strip(" .!?,")
+        command_match = any(pattern.fullmatch(text) for pattern in self._command_patterns)
+        with self._lock:
+            if utterance is not None and utterance != self.utterances:
+                return
+            self._command_match = command_match
+
+    # --- Per-frame decisions ---
+
+    def push(self, is_speech):
+        with self._lock:
+            return self._push(is_speech)
+
+    def _push(self, is_speech):
+        if not self.is_speaking:
+            if self._frames_since_end is not None:
+                self._frames_since_end += 1
+            if not is_speech:
+                return None
+            self._start()
+            return "start"
+        if is_speech:
+            if self.silence_counter >= MIN_PAUSE_FRAMES:
+                self._pauses.append(self.silence_counter)
+            self.silence_counter = 0
+            self._speech_frames += 1
+            return None
+        self.silence_counter += 1
+        hangover, reason = self._hangover()
+        if self.silence_counter > hangover:
+            self._end(hangover, reason)
+            return "end"
+        return None
+
+    def _start(self):
+        if (self._frames_since_end is not None and self._frames_since_end <= REJOIN_FRAMES
+                and self.last_endpoint["reason"] in ("command", "short")):
+            # The shortened hangover cut a sentence in two; that gap was a pause.
+            self._pauses.append(self.silence_counter + self._frames_since_end - 1)
+            self.early_cuts += 1
+        self.is_speaking = True
+        self.silence_counter = 0
+        self.utterances += 1
+        self._speech_frames = 1
+        self._command_match = False
+        self._frames_since_end = None
+        self._base, self._base_reason = self._learned_base()
+
+    def _end(self, hangover, reason):
+        self.is_speaking = False
+        self.silence_frames = hangover
+        self._frames_since_end = 0
+        delay_seconds = self.silence_counter * self.frame_ms / 1000
+        self.last_endpoint = {
+            "reason": reason,
+            "speech_seconds": round(self._speech_frames * self.frame_ms / 1000, 2),
+            "hangover_ms": hangover * self.frame_ms,
+            "delay_ms": round(delay_seconds * 1000),
+        }
+        self._delays.append(delay_seconds)
+        self._reasons[reason] += 1
+        tracer.record("endpoint.delay", delay_seconds)
+        tracer.record(f"endpoint.delay.{reason}", delay_seconds)
+
+    # --- Metrics ---
+
+    def stats(self):
+        with self._lock:
+            return self._stats()
+
+    def _stats(self):
+        ordered = sorted(self._delays)
+        fixed_ms = (self.default_hangover_frames + 1) * self.frame_ms
+        mean_ms = sum(ordered) / len(ordered) * 1000 if ordered else None
+        return {
+            "utterances": len(ordered),
+            "learned_pauses": len(self._pauses),
+            "base_hangover_ms": self._learned_base()[0] * self.frame_ms,
+            "delay_mean_ms": round(mean_ms) if mean_ms is not None else None,
+            "delay_p50_ms": round(ordered[len(ordered) // 2] * 1000) if ordered else None,
+            "delay_p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000) if ordered else None,
+            "saved_ms_per_utterance_vs_fixed": round(fixed_ms - mean_ms) if mean_ms is not None else None,
+            "by_reason": dict(self._reasons),
+            "early_cuts": self.early_cuts,
+        }
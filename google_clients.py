@@ -0,0 +1,200 @@
+import os
+import datetime
+import threading
+
+from tracing import tracer
+
+# googleapiclient, google-auth and oauthlib take a noticeable part of startup,
+# so they are imported on first use rather than when an agent module loads.
+
+# --- Client Pool Configuration ---
+REFRESH_MARGIN_SECONDS = 300     # Refresh tokens this long before they expire
+REFRESH_CHECK_SECONDS = 60       # How often the background refresher looks at the tokens
+HTTP_TIMEOUT_SECONDS = 30
+
+
+class ServiceClient:
+    """One built API client together with the credentials it was built with."""
+
+    def __init__(self, pool, service, credentials, token_path):
+        self.pool = pool
+        self.service = service
+        self.credentials = credentials
+        self.token_path = token_path
+        self._local = threading.local()   # per-thread keep-alive HTTP connection
+        self._refresh_lock = threading.Lock()   # one refresh at a time for these credentials
+
+    def execute(self, request):
+        """Executes a request built from `service` on this thread's own connection."""
+        with tracer.span("google.api", attributes={"method": request.methodId or "", "http_method": request.method}):
+            http = getattr(self._local, "http", None)
+            if http is None:
+                http = self.pool._new_http(self)
+                self._local.http = http
+            elif self.credentials is not None and self.pool._needs_refresh(self.credentials):
+                self.pool._refresh(self)
+            return request.execute(http=http)
+
+
+class GoogleServiceClients:
+    """
+    Process-wide pool of Google API clients shared by the calendar and email agents.
+
+    Each (api, version, token) client is built once from the static discovery
+    document instead of on every tool call. Credentials are loaded from disk
+    once and refreshed by a background thread shortly before they expire.
+    httplib2 connections are not thread-safe, so `ServiceClient.execute` runs
+    every request on a keep-alive connection owned by the calling thread.
+
+    The pool lock only guards the dictionaries. Building a client (which may
+    run the interactive OAuth flow) and refreshing a token hold a lock of
+    their own client, so a first-time Gmail sign-in never holds up Calendar
+    callers.
+
+    Integration tests can pass `http_factory` (e.g. returning a
+    `googleapiclient.http.HttpMockSequence`) to swap the transport for a
+    local fake; credentials are then skipped entirely.
+    """
+
+    def __init__(self, http_factory=None, refresh_margin_seconds=REFRESH_MARGIN_SECONDS,
+                 refresh_check_seconds=REFRESH_CHECK_SECONDS):
+        self.http_factory = http_factory
+        self.refresh_margin = datetime.timedelta(seconds=refresh_margin_seconds)
+        self.refresh_check_seconds = refresh_check_seconds
+        self._entries = {}
+        self._build_locks = {}   # key -> lock held while that client is built
+        self._lock = threading.Lock()
+        self._refresher = None
+        self._stop = threading.Event()
+        self.stats = {"builds": 0, "reuses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    # --- Credentials ---
+
+    def _load_credentials(self, token_path, credentials_path, scopes):
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
+        creds = None
+        if os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path, scopes)
+
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(credentials_path, scopes)
+                creds = flow.run_local_server(port=0)
+            with open(token_path, "w") as token:
+                token.write(creds.to_json())
+        return creds
+
+    def _needs_refresh(self, creds):
+        if not creds.expiry:
+            return False
+        # google-auth stores expiry as a naive UTC datetime.
+        now = datetime.datetime.utcnow()
+        return creds.expiry - now <= self.refresh_margin
+
+    def _refresh(self, client):
+        from google.auth.transport.requests import Request
+
+        with client._refresh_lock:
+            if not self._needs_refresh(client.credentials):
+                return
+            client.credentials.refresh(Request())
+            with open(client.token_path, "w") as token:
+                token.write(client.credentials.to_json())
+        with self._lock:
+            self.stats["refreshes"] += 1
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_check_seconds):
+            with self._lock:
+                clients = list(self._entries.values())
+            for client in clients:
+                if client.credentials is None:
+                    continue
+                try:
+                    self._refresh(client)
+                except Exception as e:
+                    with self._lock:
+                        self.stats["refresh_errors"] += 1
+                    print(f"ERROR: Background token refresh failed for {client.token_path}. {e}")
+
+    def _start_refresher(self):
+        if self._refresher is None and self.http_factory is None:
+            self._refresher = threading.Thread(target=self._refresh_loop, name="google-token-refresh", daemon=True)
+            self._refresher.start()
+
+    # --- Clients ---
+
+    def _new_http(self, client):
+        if self.http_factory is not None:
+            return self.http_factory()
+        import httplib2
+        import google_auth_httplib2
+
+        if self._needs_refresh(client.credentials):
+            self._refresh(client)
+        return google_auth_httplib2.AuthorizedHttp(
+            client.credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS)
+        )
+
+    def get_client(self, api, version, scopes, token_path, credentials_path):
+        """Returns the shared client for an API, building it on first use."""
+        key = (api, version, token_path)
+        with self._lock:
+            client = self._entries.get(key)
+            if client is not None:
+                self.stats["reuses"] += 1
+                return client
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        # Only callers of this same client wait for the build (and any OAuth sign-in).
+        with build_lock:
+            with self._lock:
+                client = self._entries.get(key)
+                if client is not None:
+                    self.stats["reuses"] += 1
+                    return client
+
+            from googleapiclient.discovery import build
+
+            if self.http_factory is not None:
+                service = build(api, version, http=self.http_factory(), static_discovery=True)
+                client = ServiceClient(self, service, None, token_path)
+            else:
+                creds = self._load_credentials(token_path, credentials_path, scopes)
+                service = build(api, version, credentials=creds, static_discovery=True, cache_discovery=False)
+                client = ServiceClient(self, service, creds, token_path)
+            with self._lock:
+                self._entries[key] = client
+                self.stats["builds"] += 1
+                self._start_refresher()
+            return client
+
+    def close(self):
+        self._stop.set()
+
+
+# --- Process-wide instance ---
+_clients = None
+_clients_lock = threading.Lock()
+
+def configure_google_clients(http_factory=None, **kwargs):
+    """Replaces the shared pool, e.g. with a fake transport in integration tests."""
+    global _clients
+    with _clients_lock:
+        if _clients is not None:
+            _clients.close()
+        _clients = GoogleServiceClients(http_factory=http_factory, **kwargs)
+        return _clients
+
+def get_google_clients():
+    """Returns the shared client pool, creating it on first use."""
+    global _clients
+    with _clients_lock:
+        if _clients is None:
+            _clients = GoogleServiceClients()
+        return _clients
@@ -0,0 +1,189 @@
+import re
+import sys
+
+sys.path.append('..')
+from note_taker_agent.agent import save_note, save_action_item
+from agenda_tracker_agent.agent import read_the_full_agenda, get_next_agenda_item
+
+# --- Router Configuration ---
+# Phrases the note-taker agent treats as action items rather than plain notes.
+ACTION_ITEM_PATTERN = re.compile(
+    r"\b(i will|i'll|we need to|we have to|we should|the next step is|action item)\b", re.IGNORECASE
+)
+TRAILING_PUNCTUATION = " .!?,"
+
+
+# --- Step 1: Turn tool results into the reply the agents would have given ---
+
+def _reply_next_item(result):
+    if result["status"] == "success":
+        return f"Next on the agenda: {result['next_item']}."
+    return result["message"]
+
+def _reply_agenda(result):
+    if result["status"] != "success":
+        return result["message"]
+    items = [item for item in result["agenda"] if item]
+    return "Here is the agenda:\n" + "\n".join(f"{i}. {item}" for i, item in enumerate(items, 1))
+
+def _reply_saved(result, kind, text):
+    if result["status"] == "success":
+        return f"{kind} saved: {text}"
+    return f"Sorry, I could not save that {kind.lower()}. {result['message']}"
+
+def _reply_calendar(result):
+    if result["status"] != "success":
+        return f"Sorry, I could not read your calendar. {result['message']}"
+    if "events" not in result:
+        return result["message"]
+    return "Here are your upcoming events:\n" + "\n".join(f"- {event}" for event in result["events"])
+
+
+# --- Step 2: Handlers that call the specialist tools directly ---
+
+def _handle_next_item(match, tool_context):
+    return _reply_next_item(get_next_agenda_item(tool_context))
+
+def _handle_read_agenda(match, tool_context):
+    return _reply_agenda(read_the_full_agenda(tool_context))
+
+def _handle_note(match, tool_context):
+    text = match.group("text").strip(TRAILING_PUNCTUATION)
+    if ACTION_ITEM_PATTERN.search(text):
+        return _reply_saved(save_action_item(text, tool_context), "Action item", text)
+    return _reply_saved(save_note(text, tool_context), "Note", text)
+
+def _handle_action_item(match, tool_context):
+    text = match.group("text").strip(TRAILING_PUNCTUATION)
+    return _reply_saved(save_action_item(text, tool_context), "Action item", text)
+
+def _handle_calendar(match, tool_context):
+    # Imported here so the calendar agent only loads once someone asks for it.
+    from calendar_agent.agent import get_upcoming_events
+    return _reply_calendar(get_upcoming_events())
+
+
+class IntentRule:
+    """A set of anchored patterns that map an utterance straight to one handler."""
+
+    def __init__(self, intent, patterns, handler, read_only=False):
+        self.intent = intent
+        self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        self.handler = handler
+        self.read_only = read_only
+
+    def match(self, text):
+        for pattern in self.patterns:
+            match = pattern.fullmatch(text)
+            if match:
+                return match
+        return None
+
+
+INTENT_RULES = [
+    IntentRule("agenda_next", [
+        r"(ok(ay)?,? |so,? )?(what'?s|what is|whats) next",
+        r"(let'?s )?(go to|move on to) the next (item|topic)",
+        r"(ok(ay)?,? )?(let'?s )?move on",
+        r"next (agenda )?(item|topic)( please)?",
+    ], _handle_next_item),
+    IntentRule("agenda_read", [
+        r"(please )?(read|show|start|open)( me)? the( full)? agenda",
+        r"what'?s on the agenda",
+    ], _handle_read_agenda),
+    IntentRule("note", [
+        r"(please )?(take|make) a note( that|:)? (?P<text>.+)",
+        r"(please )?(note|remember)( that|:)? (?P<text>.+)",
+    ], _handle_note),
+    IntentRule("action_item", [
+        r"(?P<text>(we need to|we have to|i will|i'll|the next step is) .+)",
+        r"(add an? )?action item:? (?P<text>.+)",
+    ], _handle_action_item),
+    IntentRule("calendar", [
+        r"what'?s on my (calendar|schedule)( today)?",
+        r"(what are|show|list) my (upcoming|next) (events|meetings)",
+        r"(check|read) my (calendar|schedule)",
+    ], _handle_calendar, read_only=True),
+]
+
+
+class RouteMatch:
+    """An utterance the router is confident about, ready to run without the LLM."""
+
+    def __init__(self, rule, match):
+        self.rule = rule
+        self.match = match
+
+    @property
+    def intent(self):
+        return self.rule.intent
+
+    @property
+    def read_only(self):
+        return self.rule.read_only
+
+    def execute(self, tool_context=None):
+        """
+        Runs the tool call and returns the reply text (blocking; call it off the
+        event loop). `tool_context` carries the session state, e.g. a
+        `note_store.MeetingContext`.
+        """
+        return self.rule.handler(self.match, tool_context)
+
+
+class IntentRouter:
+    """
+    Deterministic fast path in front of the coordinator.
+
+    Regular commands ("what's next", "take a note that ...") are matched
+    against anchored patterns and sent straight to the specialist's tool,
+    skipping both Gemini round trips. Everything else returns None from
+    `route` and falls back to the coordinator. Latency saved is estimated
+    against the average of the coordinator turns recorded with
+    `record_fallback`.
+    """
+
+    def __init__(self, rules=INTENT_RULES):
+        self.rules = rules
+        self.total = 0
+        self.hits = {}
+        self.fast_path_seconds = []
+        self.fallback_seconds = []
+
+    def route(self, utterance):
+        self.total += 1
+        text = " ".join(utterance.split()).strip(TRAILING_PUNCTUATION)
+        for rule in self.rules:
+            match = rule.match(text)
+            if match:
+                self.hits[rule.intent] = self.hits.get(rule.intent, 0) + 1
+                return RouteMatch(rule, match)
+        return None
+
+    def record_fast_path(self, seconds):
+        self.fast_path_seconds.append(seconds)
+
+    def record_fallback(self, seconds):
+        self.fallback_seconds.append(seconds)
+
+    def stats(self):
+        hit_count = sum(self.hits.values())
+        summary = {
+            "utterances": self.total,
+            "hits": hit_count,
+            "hit_rate": round(hit_count / self.total, 3) if self.total else 0.0,
+            "hits_by_intent": dict(self.hits),
+            "fast_path_ms_avg": None,
+            "llm_path_ms_avg": None,
+            "estimated_ms_saved": None,
+        }
+        if self.fast_path_seconds:
+            fast_avg = sum(self.fast_path_seconds) / len(self.fast_path_seconds)
+            summary["fast_path_ms_avg"] = round(fast_avg * 1000, 1)
+        if self.fallback_seconds:
+            llm_avg = sum(self.fallback_seconds) / len(self.fallback_seconds)
+            summary["llm_path_ms_avg"] = round(llm_avg * 1000, 1)
+            if self.fast_path_seconds:
+                saved = (llm_avg - fast_avg) * len(self.fast_path_seconds)
+                summary["estimated_ms_saved"] = round(saved * 1000, 1)
+        return summary
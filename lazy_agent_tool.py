@@ -0,0 +1,56 @@
+import importlib
+import threading
+
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.tools import agent_tool
+
+
+class LazyAgentTool(agent_tool.AgentTool):
+    """
+    An AgentTool whose specialist is imported on its first call.
+
+    The coordinator only needs each specialist's name and description to
+    offer it to Gemini. Until the specialist is loaded, AgentTool is set up
+    and builds its declaration from a bare stand-in agent with that name and
+    description; the module (and everything it imports) loads the first time
+    the tool actually runs, after which the declaration comes from the real
+    agent. Only for specialists without an input or output schema, which is
+    every agent in this project; the declarations are then the same.
+    """
+
+    def __init__(self, module_name, name, description, attribute="root_agent", **agent_tool_options):
+        self._module_name = module_name
+        self._attribute = attribute
+        self._agent = None
+        self._agent_lock = threading.Lock()
+        self._stand_in_tool = None
+        super().__init__(BaseAgent(name=name, description=description), **agent_tool_options)
+
+    @property
+    def agent(self):
+        if self._agent is None:
+            with self._agent_lock:
+                if self._agent is None:
+                    agent = getattr(importlib.import_module(self._module_name), self._attribute)
+                    if agent.name != self.name:
+                        raise ValueError(f"{self._module_name}.{self._attribute} is named '{agent.name}', expected '{self.name}'.")
+                    self._agent = agent
+                    print(f"DEBUG: Loaded specialist '{self.name}' on first use")
+        return self._agent
+
+    @agent.setter
+    def agent(self, value):
+        if self._stand_in_tool is None:
+            # AgentTool.__init__ hands over the stand-in; it only ever declares the tool.
+            self._stand_in_tool = agent_tool.AgentTool(value)
+        else:
+            self._agent = value
+
+    @property
+    def loaded(self):
+        return self._agent is not None
+
+    def _get_declaration(self):
+        if self._agent is None:
+            return self._stand_in_tool._get_declaration()
+        return super()._get_declaration()
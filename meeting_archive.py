@@ -0,0 +1,509 @@
+import os
+import re
+import glob
+import json
+import queue
+import sqlite3
+import hashlib
+import datetime
+import threading
+import collections
+
+import numpy as np
+
+from note_store import DATA_DIR, get_note_store
+from text_index import tokenize
+
+# --- Archive Configuration ---
+ARCHIVE_DB_PATH = os.environ.get("ARCHIVE_DB_PATH", os.path.join(DATA_DIR, "archive.db"))
+LEGACY_NOTES_DIR = os.path.dirname(os.path.abspath(__file__))   # meeting_notes_YYYY-MM-DD.txt etc.
+BM25_K1 = 1.2
+BM25_B = 0.75
+SEARCH_LIMIT = 5
+MAX_SEARCH_LIMIT = 25
+SNIPPET_CHARS = 300               # Longest text returned per hit, to keep the agent's context small
+SEARCH_WAIT_SECONDS = 0.5         # Default timeout of `wait_for_meeting`; searches never wait
+CATCH_UP_BATCH = 500              # Records per indexing job during a catch-up, so live items interleave
+MAX_BLOCKS_PER_TERM = 8           # Posting blocks a term may collect before they are merged into one
+DOCUMENT_TYPES = ("note", "action_item", "transcript")
+LEGACY_FILES = {"meeting_notes_": "note", "action_items_": "action_item"}
+
+_LEGACY_DATE = re.compile(r"(\d{4}-\d{2}-\d{2})\.txt$")
+_DOC_IDS = np.dtype("<u4")
+_TFS = np.dtype("<u2")
+
+
+def _connect(db_path):
+    if os.path.dirname(db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def _timestamp(value):
+    """Epoch seconds from an ISO string (naive means local time) or a datetime."""
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return value.timestamp()
+
+def _source_key(meeting_id, doc_type, ts, text):
+    # Identifies a document however it reaches the index (listener, catch-up or backfill).
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+    return f"{meeting_id}|{doc_type}|{ts:.6f}|{digest}"
+
+
+class _DocumentTable:
+    """Per-document columns indexed by document ID, for filtering and length normalisation."""
+
+    def __init__(self, capacity=1024):
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.type = np.full(capacity, -1, dtype=np.int8)
+        self.length = np.zeros(capacity, dtype=np.uint32)
+        self.meeting = np.full(capacity, -1, dtype=np.int32)
+        self.meeting_codes = {}
+        self.count = 0
+        self.total_length = 0
+        self.max_id = 0
+        self._length_norms = None
+
+    def add(self, doc_id, ts, doc_type, length, meeting_id):
+        if doc_id >= len(self.ts):
+            capacity = max(doc_id + 1, 2 * len(self.ts))
+            for name in ("ts", "type", "length", "meeting"):
+                column = getattr(self, name)
+                grown = np.full(capacity, -1 if name in ("type", "meeting") else 0, dtype=column.dtype)
+                grown[:len(column)] = column
+                setattr(self, name, grown)
+        self.ts[doc_id] = ts
+        self.type[doc_id] = DOCUMENT_TYPES.index(doc_type)
+        self.length[doc_id] = length
+        self.meeting[doc_id] = self.meeting_codes.setdefault(meeting_id, len(self.meeting_codes))
+        self.count += 1
+        self.total_length += length
+        self.max_id = max(self.max_id, doc_id)
+        self._length_norms = None
+
+    def length_norms(self):
+        """BM25's k1 * (1 - b + b * length / average length) for every document, until the next add."""
+        if self._length_norms is None:
+            average_length = self.total_length / self.count
+            self._length_norms = BM25_K1 * (1 - BM25_B + BM25_B * self.length[:self.max_id + 1] / average_length)
+        return self._length_norms
+
+
+class MeetingArchive:
+    """
+    On-disk inverted index over every note, action item and transcript segment.
+
+    Each item is one document in SQLite. A term's postings (document IDs and
+    term frequencies) are stored as packed arrays in blocks: every indexing
+    batch appends one block per term it contains, and once a term has more
+    than MAX_BLOCKS_PER_TERM blocks they are merged, so a term is read back
+    in a few rows however long its history. Each document's time, type,
+    length and meeting are also kept in memory as arrays.
+
+    `search` reads the blocks of the query terms, drops postings outside the
+    date, type and meeting filters, and scores BM25 for all remaining
+    documents at once with numpy, so a query over a year of meetings takes
+    a few milliseconds even for common words.
+
+    Writes go through a queue to one indexing thread that commits each batch
+    in a single transaction. Saved notes arrive through a NoteStore listener.
+    Transcripts come from `add_transcript`. On start the thread also catches
+    up with note files written while the archive was not running, including
+    the old meeting_notes_/action_items_ text files. Every path is
+    idempotent, because documents are keyed by meeting, type, time and text.
+    The catch-up reads the files on its own thread and queues them in
+    CATCH_UP_BATCH-sized jobs, so live items are indexed in between.
+
+    A search never waits for the indexer: it covers what is indexed so far,
+    and `pending(meeting_id)` tells how many of a meeting's records are still
+    queued. Callers off the event loop that need those records can
+    `wait_for_meeting` first.
+    """
+
+    def __init__(self, db_path=ARCHIVE_DB_PATH, notes_dir=None, legacy_dir=LEGACY_NOTES_DIR):
+        self.db_path = db_path
+        self.notes_dir = notes_dir or os.path.join(DATA_DIR, "notes")
+        self.legacy_dir = legacy_dir
+        self._conn = _connect(db_path)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._pending = collections.Counter()   # meeting_id -> queued records not yet indexed
+        self._pending_changed = threading.Condition()
+        self._catch_up_thread = None
+        self._documents = _DocumentTable()
+        self._blocks = collections.Counter()   # term -> posting blocks on disk
+        self.documents_indexed = 0
+        self.blocks_merged = 0
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    source_key TEXT NOT NULL UNIQUE,
+                    meeting_id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    speaker TEXT,
+                    length INTEGER NOT NULL,
+                    text TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    block INTEGER NOT NULL,
+                    doc_ids BLOB NOT NULL,
+                    tfs BLOB NOT NULL,
+                    PRIMARY KEY (term, block)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS sources (
+                    path TEXT PRIMARY KEY,
+                    offset INTEGER NOT NULL
+                ) WITHOUT ROWID;
+            """)
+        # Loading the document columns is the indexing thread's first job, so
+        # start-up does not wait for it.
+        self._queue.put(("load", None))
+        self._thread = threading.Thread(target=self._run, name="archive-indexer", daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        with self._lock:
+            for doc_id, ts, doc_type, length, meeting_id in self._conn.execute(
+                "SELECT id, ts, type, length, meeting_id FROM documents ORDER BY id"
+            ):
+                self._documents.add(doc_id, ts, doc_type, length, meeting_id)
+            self._blocks.update(dict(self._conn.execute("SELECT term, COUNT(*) FROM postings GROUP BY term")))
+
+    # --- Feeding the index ---
+
+    def index_records(self, records):
+        """NoteStore listener: queues a batch of freshly written note records."""
+        with self._pending_changed:
+            self._pending.update(record["meeting_id"] for record in records)
+        self._queue.put(("records", records))
+
+    def add_transcript(self, meeting_id, text, speaker=None, ts=None):
+        """Queues one transcript segment; `ts` defaults to now."""
+        if not text or not text.strip():
+            return
+        self.index_records([{
+            "ts": ts or datetime.datetime.now().astimezone().isoformat(),
+            "meeting_id": meeting_id,
+            "speaker": speaker,
+            "type": "transcript",
+            "text": text.strip(),
+        }])
+
+    def catch_up(self):
+        """Indexes note files (and legacy text files) added since the last catch-up, in the background."""
+        self._catch_up_thread = threading.Thread(target=self._catch_up, name="archive-catch-up", daemon=True)
+        self._catch_up_thread.start()
+
+    def _catch_up(self):
+        try:
+            records, offsets = self._read_new_sources()
+        except Exception as e:
+            print(f"ERROR: Archive catch-up failed. {e}")
+            return
+        for start in range(0, len(records), CATCH_UP_BATCH):
+            self.index_records(records[start:start + CATCH_UP_BATCH])
+        # Recorded only once the records before it are indexed.
+        if offsets:
+            self._queue.put(("sources", offsets))
+
+    def flush(self):
+        """Blocks until everything queued so far, including any catch-up, is searchable."""
+        if self._catch_up_thread is not None:
+            self._catch_up_thread.join()
+        self._queue.join()
+
+    def pending(self, meeting_id):
+        """Records of a meeting queued but not yet searchable; never blocks."""
+        with self._pending_changed:
+            return self._pending.get(meeting_id, 0)
+
+    def wait_for_meeting(self, meeting_id, timeout=SEARCH_WAIT_SECONDS):
+        """Waits until a meeting's queued records are indexed; False on timeout."""
+        with self._pending_changed:
+            return self._pending_changed.wait_for(lambda: not self._pending.get(meeting_id), timeout)
+
+    def _run(self):
+        while True:
+            jobs = [self._queue.get()]
+            while True:
+                try:
+                    jobs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for kind, payload in jobs if kind == "records" for record in payload]
+            try:
+                if any(kind == "load" for kind, _ in jobs):
+                    self._load()
+                if records:
+                    self._index(records)
+                for kind, payload in jobs:
+                    if kind == "sources":
+                        self._save_offsets(payload)
+            except Exception as e:
+                print(f"ERROR: Archive indexing failed. {e}")
+            finally:
+                with self._pending_changed:
+                    self._pending.subtract(record["meeting_id"] for record in records)
+                    self._pending = +self._pending
+                    self._pending_changed.notify_all()
+                for _ in jobs:
+                    self._queue.task_done()
+            if any(kind == "stop" for kind, _ in jobs):
+                return
+
+    def _read_new_sources(self):
+        """Records added to the note files since their saved offsets, and the offsets after them."""
+        with self._lock:
+            offsets = dict(self._conn.execute("SELECT path, offset FROM sources"))
+        records = []
+        updated = {}
+        for path in sorted(glob.glob(os.path.join(self.notes_dir, "*.jsonl"))):
+            offset = offsets.get(path, 0)
+            if os.path.getsize(path) <= offset:
+                continue
+            with open(path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    if line.strip():
+                        records.append(json.loads(line))
+            updated[path] = offset
+        for prefix, doc_type in LEGACY_FILES.items():
+            for path in sorted(glob.glob(os.path.join(self.legacy_dir, f"{prefix}*.txt"))):
+                match = _LEGACY_DATE.search(path)
+                if match is None or os.path.getsize(path) == offsets.get(path):
+                    continue
+                records.extend(self._legacy_records(path, match.group(1), doc_type))
+                updated[path] = os.path.getsize(path)
+        return records, updated
+
+    def _save_offsets(self, offsets):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO sources (path, offset) VALUES (?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET offset = excluded.offset",
+                offsets.items(),
+            )
+
+    @staticmethod
+    def _legacy_records(path, day, doc_type):
+        # The old files hold "- item\n" entries, some with the newline written literally as "\n".
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read().replace("\\n", "\n")
+        ts = f"{day}T12:00:00"
+        return [
+            {"ts": ts, "meeting_id": f"legacy-{day}", "speaker": None, "type": doc_type, "text": line.lstrip("- ").strip()}
+            for line in content.splitlines() if line.strip("- ").strip()
+        ]
+
+    def _index(self, records):
+        added = []
+        postings = collections.defaultdict(lambda: ([], []))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for record in records:
+                    terms = collections.Counter(tokenize(record["text"]))
+                    if not terms or record.get("type") not in DOCUMENT_TYPES:
+                        continue
+                    ts = _timestamp(record["ts"])
+                    length = sum(terms.values())
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO documents (source_key, meeting_id, type, ts, speaker, length, text) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (_source_key(record["meeting_id"], record["type"], ts, record["text"]),
+                         record["meeting_id"], record["type"], ts, record.get("speaker"), length, record["text"]),
+                    )
+                    if cursor.rowcount == 0:
+                        continue   # Already indexed through another path.
+                    doc_id = cursor.lastrowid
+                    for term, tf in terms.items():
+                        doc_ids, tfs = postings[term]
+                        doc_ids.append(doc_id)
+                        tfs.append(min(tf, np.iinfo(_TFS).max))
+                    added.append((doc_id, ts, record["type"], length, record["meeting_id"]))
+                if added:
+                    block = added[0][0]
+                    self._conn.executemany(
+                        "INSERT INTO postings (term, block, doc_ids, tfs) VALUES (?, ?, ?, ?)",
+                        [(term, block, np.array(ids, _DOC_IDS).tobytes(), np.array(tfs, _TFS).tobytes())
+                         for term, (ids, tfs) in postings.items()],
+                    )
+                    for term in postings:
+                        self._blocks[term] += 1
+                        if self._blocks[term] > MAX_BLOCKS_PER_TERM:
+                            self._merge_blocks(term)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                self._blocks.clear()
+                self._blocks.update(dict(self._conn.execute("SELECT term, COUNT(*) FROM postings GROUP BY term")))
+                raise
+            for document in added:
+                self._documents.add(*document)
+        self.documents_indexed += len(added)
+
+    def _merge_blocks(self, term):
+        rows = self._conn.execute(
+            "SELECT block, doc_ids, tfs FROM postings WHERE term = ? ORDER BY block", (term,)
+        ).fetchall()
+        self._conn.execute("DELETE FROM postings WHERE term = ?", (term,))
+        self._conn.execute(
+            "INSERT INTO postings (term, block, doc_ids, tfs) VALUES (?, ?, ?, ?)",
+            (term, rows[0][0], b"".join(row[1] for row in rows), b"".join(row[2] for row in rows)),
+        )
+        self._blocks[term] = 1
+        self.blocks_merged += 1
+
+    # --- Searching ---
+
+    def _postings(self, terms):
+        """{term: (doc_ids, tfs)} for the query terms that occur in the archive."""
+        placeholders = ",".join("?" * len(terms))
+        blocks = collections.defaultdict(lambda: ([], []))
+        for term, doc_ids, tfs in self._conn.execute(
+            f"SELECT term, doc_ids, tfs FROM postings WHERE term IN ({placeholders}) ORDER BY term, block", terms
+        ):
+            blocks[term][0].append(doc_ids)
+            blocks[term][1].append(tfs)
+        return {
+            term: (np.frombuffer(b"".join(ids), _DOC_IDS), np.frombuffer(b"".join(tfs), _TFS))
+            for term, (ids, tfs) in blocks.items()
+        }
+
+    def search(self, query, since=None, until=None, types=None, meeting_id=None, limit=SEARCH_LIMIT):
+        """
+        BM25-ranked documents matching any query term, newest first among equal
+        scores. `since`/`until` are datetimes or ISO strings ([since, until)),
+        `types` a subset of DOCUMENT_TYPES. Returns a list of dicts.
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
+        since = _timestamp(since) if since is not None else None
+        until = _timestamp(until) if until is not None else None
+        type_codes = [DOCUMENT_TYPES.index(t) for t in types] if types else None
+
+        with self._lock:
+            documents = self._documents
+            if not documents.count:
+                return []
+            if meeting_id is not None and meeting_id not in documents.meeting_codes:
+                return []
+            length_norms = documents.length_norms()
+            filtered = since is not None or until is not None or type_codes is not None or meeting_id is not None
+            scores = np.zeros(documents.max_id + 1, dtype=np.float64)
+            for doc_ids, tfs in self._postings(terms).values():
+                # The idf uses the whole archive; filters only decide which documents are scored.
+                idf = np.log(1 + (documents.count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+                if filtered:
+                    keep = np.ones(len(doc_ids), dtype=bool)
+                    if since is not None:
+                        keep &= documents.ts[doc_ids] >= since
+                    if until is not None:
+                        keep &= documents.ts[doc_ids] < until
+                    if type_codes is not None:
+                        keep &= np.isin(documents.type[doc_ids], type_codes)
+                    if meeting_id is not None:
+                        keep &= documents.meeting[doc_ids] == documents.meeting_codes[meeting_id]
+                    doc_ids, tfs = doc_ids[keep], tfs[keep]
+                tf = tfs.astype(np.float64)
+                scores[doc_ids] += idf * (BM25_K1 + 1) * tf / (tf + length_norms[doc_ids])
+
+            matched = np.flatnonzero(scores)
+            if not len(matched):
+                return []
+            if len(matched) > limit:
+                matched = matched[np.argpartition(scores[matched], -limit)[-limit:]]
+            top = matched[np.lexsort((-documents.ts[matched], -scores[matched]))]
+            placeholders = ",".join("?" * len(top))
+            rows = {
+                row[0]: row[1:] for row in self._conn.execute(
+                    f"SELECT id, meeting_id, type, ts, speaker, text FROM documents WHERE id IN ({placeholders})",
+                    [int(doc_id) for doc_id in top],
+                )
+            }
+        results = []
+        for doc_id in top:
+            meeting, doc_type, ts, speaker, text = rows[int(doc_id)]
+            results.append({
+                "meeting_id": meeting,
+                "type": doc_type,
+                "date": datetime.datetime.fromtimestamp(ts).astimezone().isoformat(timespec="minutes"),
+                "speaker": speaker,
+                "text": text if len(text) <= SNIPPET_CHARS else text[:SNIPPET_CHARS].rstrip() + "...",
+                "score": round(float(scores[doc_id]), 3),
+            })
+        return results
+
+    def stats(self):
+        with self._lock:
+            documents = self._documents
+            return {
+                "documents": documents.count,
+                "meetings": len(documents.meeting_codes),
+                "terms": len(self._blocks),
+                "posting_blocks": sum(self._blocks.values()),
+                "blocks_merged": self.blocks_merged,
+                "avg_length": round(documents.total_length / documents.count, 1) if documents.count else 0,
+            }
+
+    def close(self):
+        self._queue.put(("stop", None))
+        self._thread.join()
+        with self._lock:
+            self._conn.close()
+
+
+# --- Process-wide instance ---
+_archive = None
+_archive_lock = threading.Lock()
+
+def get_meeting_archive():
+    """
+    Returns the process-wide archive. The first call starts indexing every
+    note saved from then on and catches up with the notes already on disk.
+    """
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = MeetingArchive()
+            get_note_store().add_listener(_archive.index_records)
+            _archive.catch_up()
+        return _archive
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Search the notes, action items and transcripts of past meetings.")
+    parser.add_argument("query")
+    parser.add_argument("--since", default=None, help="ISO date, e.g. 2025-09-01")
+    parser.add_argument("--until", default=None, help="ISO date (exclusive)")
+    parser.add_argument("--type", choices=DOCUMENT_TYPES, default=None)
+    parser.add_argument("--meeting", default=None)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    archive = MeetingArchive()
+    archive.catch_up()
+    archive.flush()
+    for hit in archive.search(args.query, args.since, args.until, [args.type] if args.type else None,
+                              args.meeting, args.limit):
+        print(f"{hit['date']}  {hit['meeting_id']}  {hit['type']}  ({hit['score']})\n    {hit['text']}")
+    print(f"({archive.stats()['documents']} documents indexed)")
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,509 @@
+"""
+Multi-stream server: one process transcribing and assisting many meetings.
+
+Each connection is one meeting's audio stream. The client sends one JSON
+header line, e.g. {"meeting_id": "standup-3", "user_id": "alice"}, followed
+by raw 16 kHz mono int16 PCM. The server answers with JSON lines:
+
+    {"type": "transcript", "text": ..., "latency_ms": ..., "slo_met": ...}
+    {"type": "reply", "text": ..., "latency_ms": ...}
+    {"type": "stats", ...}          # when the client closes its side
+
+With the optional `websockets` package installed, the same protocol is also
+served over WebSocket (first message text header, then binary PCM frames).
+
+    python meeting_server.py --port 8765 --workers 2
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+import threading
+import collections
+import concurrent.futures
+
+import webrtcvad
+
+try:
+    import websockets
+except ImportError:  # WebSocket support is optional; the TCP socket always works.
+    websockets = None
+
+sys.path.append('..')
+from batch_decoder import decode_batch
+from endpointing import AdaptiveEndpointer
+from meeting_archive import get_meeting_archive
+from note_store import get_note_store
+from tracing import write_metrics_at_exit
+from transcriber_whisper import (
+    initialize_model, transcribe_audio,
+    VAD_AGGRESSIVENESS, SAMPLE_RATE, FRAME_SIZE, SAMPLE_WIDTH, MODEL_TYPE, LANGUAGE, SILENCE_FRAMES,
+)
+
+# --- Server Configuration ---
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WS_PORT = 8766
+DECODE_WORKERS = 2              # Decode batches running at once (one model replica each)
+MAX_BATCH = 8                   # Utterances handed to one decode call
+SLO_SECONDS = 2.0               # Target from end of utterance to transcript, per stream
+MAX_PENDING_PER_STREAM = 4      # Older utterances are dropped past this backlog
+FRAME_BYTES = FRAME_SIZE * SAMPLE_WIDTH
+
+_stream_ids = itertools.count(1)   # One scheduler stream per connection, even within a meeting
+
+
+def _percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 1)
+
+
+def decode_sequential(audios):
+    """One model call per utterance, as the single-meeting pipeline does."""
+    return [transcribe_audio(audio) for audio in audios]
+
+def decode_batched(audios):
+    """
+    Default: the scheduler has already formed the batch, so it goes straight
+    to the model with one encoder pass. Each decode worker borrows its own
+    model replica, so `--workers` batches run in parallel.
+    """
+    return decode_batch(audios, MODEL_TYPE, LANGUAGE, max_batch=MAX_BATCH)
+
+
+# --- Fair decode scheduling ---
+
+class DecodeJob:
+    __slots__ = ("stream_id", "meeting_id", "audio", "submitted", "deadline", "future")
+
+    def __init__(self, stream_id, meeting_id, audio, submitted, deadline, future):
+        self.stream_id = stream_id
+        self.meeting_id = meeting_id
+        self.audio = audio
+        self.submitted = submitted
+        self.deadline = deadline
+        self.future = future
+
+
+class StreamStats:
+    def __init__(self):
+        self.meeting_id = None
+        self.utterances = 0
+        self.dropped = 0
+        self.slo_misses = 0
+        self.latencies = collections.deque(maxlen=1000)
+
+    def summary(self):
+        return {
+            "utterances": self.utterances,
+            "dropped": self.dropped,
+            "slo_misses": self.slo_misses,
+            "p50_ms": _percentile(self.latencies, 0.5),
+            "p95_ms": _percentile(self.latencies, 0.95),
+        }
+
+
+class FairDecodeScheduler:
+    """
+    Shares the Whisper model between every stream.
+
+    A stream is one connection, keyed by its own id; two connections to the
+    same meeting are separate streams. Each stream has its own FIFO of
+    finished utterances. When a decode worker
+    frees up, the scheduler builds a batch of at most one utterance per stream
+    (so a talkative meeting cannot starve a quiet one), choosing the heads
+    with the earliest SLO deadline first, and runs `decode_batch(audios)` on
+    a worker thread. A stream never has two utterances decoding at once, so
+    its transcripts come back in order. Past `max_pending_per_stream` the
+    oldest waiting utterance of that stream is dropped.
+    """
+
+    def __init__(self, decode_batch=decode_batched, workers=DECODE_WORKERS, max_batch=MAX_BATCH,
+                 slo_seconds=SLO_SECONDS, max_pending_per_stream=MAX_PENDING_PER_STREAM):
+        self.decode_batch = decode_batch
+        self.workers = workers
+        self.max_batch = max_batch
+        self.slo_seconds = slo_seconds
+        self.max_pending_per_stream = max_pending_per_stream
+        self._queues = collections.OrderedDict()   # stream_id -> deque of DecodeJob
+        self._busy_streams = set()
+        self._free_workers = workers
+        self._wakeup = asyncio.Event()
+        self._executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="decode")
+        self.stream_stats = collections.defaultdict(StreamStats)
+        self.batches = 0
+        self.batch_sizes = collections.deque(maxlen=1000)
+
+    async def submit(self, stream_id, audio, meeting_id=None):
+        """Queues one utterance and waits for its transcript (None if it was dropped)."""
+        loop = asyncio.get_running_loop()
+        now = time.perf_counter()
+        job = DecodeJob(stream_id, meeting_id, audio, now, now + self.slo_seconds, loop.create_future())
+        self.stream_stats[stream_id].meeting_id = meeting_id
+        queue = self._queues.setdefault(stream_id, collections.deque())
+        queue.append(job)
+        if len(queue) > self.max_pending_per_stream:
+            dropped = queue.popleft()
+            self.stream_stats[stream_id].dropped += 1
+            dropped.future.set_result(None)
+        self._wakeup.set()
+        return await job.future
+
+    def close_stream(self, stream_id):
+        queue = self._queues.pop(stream_id, None)
+        for job in queue or ():
+            job.future.set_result(None)
+
+    def _next_batch(self):
+        heads = [
+            queue[0] for stream_id, queue in self._queues.items()
+            if queue and stream_id not in self._busy_streams
+        ]
+        heads.sort(key=lambda job: job.deadline)
+        batch = heads[:self.max_batch]
+        for job in batch:
+            self._queues[job.stream_id].popleft()
+            self._busy_streams.add(job.stream_id)
+        # Rotate so ties between equal deadlines do not always favour the same stream.
+        if self._queues:
+            self._queues.move_to_end(next(iter(self._queues)))
+        return batch
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._free_workers > 0:
+                batch = self._next_batch()
+                if not batch:
+                    break
+                self._free_workers -= 1
+                loop.create_task(self._decode(loop, batch))
+
+    async def _decode(self, loop, batch):
+        try:
+            transcripts = await loop.run_in_executor(self._executor, self.decode_batch, [job.audio for job in batch])
+            error = None
+        except Exception as e:
+            transcripts, error = [None] * len(batch), e
+            meetings = ", ".join(sorted({str(job.meeting_id) for job in batch}))
+            print(f"ERROR: Decode batch of {len(batch)} ({meetings}) failed. {e}")
+        finished = time.perf_counter()
+        self.batches += 1
+        self.batch_sizes.append(len(batch))
+        for job, transcript in zip(batch, transcripts):
+            self._busy_streams.discard(job.stream_id)
+            stats = self.stream_stats[job.stream_id]
+            stats.utterances += 1
+            stats.latencies.append(finished - job.submitted)
+            if finished > job.deadline:
+                stats.slo_misses += 1
+            if not job.future.done():
+                job.future.set_result(transcript if error is None else None)
+        self._free_workers += 1
+        self._wakeup.set()
+
+    def stats(self):
+        latencies = [latency for stats in self.stream_stats.values() for latency in stats.latencies]
+        return {
+            "streams": len(self.stream_stats),
+            "batches": self.batches,
+            "avg_batch_size": round(sum(self.batch_sizes) / len(self.batch_sizes), 2) if self.batch_sizes else None,
+            "utterances": sum(stats.utterances for stats in self.stream_stats.values()),
+            "dropped": sum(stats.dropped for stats in self.stream_stats.values()),
+            "slo_misses": sum(stats.slo_misses for stats in self.stream_stats.values()),
+            "slo_seconds": self.slo_seconds,
+            "p50_ms": _percentile(latencies, 0.5),
+            "p95_ms": _percentile(latencies, 0.95),
+            "p99_ms": _percentile(latencies, 0.99),
+        }
+
+
+# --- Agent turns ---
+
+class AgentLoop:
+    """
+    Runs agent turns on an event loop of their own thread.
+
+    On the serving loop, anything a turn does synchronously (callbacks, the
+    session store, a tool that blocks) would stall every stream's socket
+    reads, VAD and decode dispatch, not just the stream that asked.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="agents", daemon=True)
+        self._thread.start()
+
+    def run(self, coro):
+        """Schedules `coro` on the agent loop; the result can be awaited from any other loop."""
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    async def _drain(self):
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def close(self, timeout=5.0):
+        """Lets turns still running (and their background history writes) finish, then stops the loop."""
+        try:
+            asyncio.run_coroutine_threadsafe(self._drain(), self._loop).result(timeout)
+        except Exception as e:
+            print(f"ERROR: Agent turns did not finish before shutdown. {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+# --- One meeting's stream ---
+
+class MeetingStream:
+    """
+    Segments one connection's PCM with webrtcvad, sends finished utterances to
+    the shared scheduler and, in order, through the meeting's own ADK session
+    on the server's agent loop.
+    `send(message)` is the transport's coroutine for writing a JSON message.
+    """
+
+    def __init__(self, server, header, send):
+        self.server = server
+        self.send = send
+        self.stream_id = next(_stream_ids)
+        self.meeting_id = header.get("meeting_id") or f"stream-{self.stream_id}"
+        self.user_id = header.get("user_id") or self.meeting_id
+        self.session_id = None
+        self.vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+        self.segmenter = AdaptiveEndpointer(default_hangover_frames=SILENCE_FRAMES)
+        self._pending = bytearray()
+        self._frames = []
+        self._utterances = asyncio.Queue()
+        self._worker = None
+        self.audio_seconds = 0.0
+        self.replies = 0
+
+    async def open(self):
+        if self.server.agents:
+            from run_app import session_service, runner
+            session = await self.server.agent_loop.run(session_service.create_session(
+                app_name=runner.app_name,
+                user_id=self.user_id,
+                state={"meeting_id": self.meeting_id, "speaker": self.user_id},
+            ))
+            self.session_id = session.id
+        self._worker = asyncio.create_task(self._process_utterances())
+        print(f"DEBUG: Stream opened for meeting {self.meeting_id}")
+
+    def feed(self, pcm):
+        """Adds received PCM; every complete 30 ms frame goes through VAD."""
+        self._pending.extend(pcm)
+        frame_count = len(self._pending) // FRAME_BYTES
+        for i in range(frame_count):
+            frame = bytes(self._pending[i * FRAME_BYTES:(i + 1) * FRAME_BYTES])
+            self._push_frame(frame)
+        del self._pending[:frame_count * FRAME_BYTES]
+        self.audio_seconds += frame_count * FRAME_SIZE / SAMPLE_RATE
+
+    def _push_frame(self, frame):
+        event = self.segmenter.push(self.vad.is_speech(frame, SAMPLE_RATE))
+        if event is None and not self.segmenter.is_speaking:
+            return
+        self._frames.append(frame)
+        if event == "end":
+            self._end_utterance()
+
+    def _end_utterance(self):
+        audio, self._frames = b"".join(self._frames), []
+        # Decoding starts right away; replies still go out in spoken order.
+        ended = time.perf_counter()
+        decode = asyncio.ensure_future(self.server.scheduler.submit(self.stream_id, audio, self.meeting_id))
+        self._utterances.put_nowait((decode, ended))
+
+    async def _process_utterances(self):
+        while True:
+            item = await self._utterances.get()
+            if item is None:
+                return
+            decode, ended = item
+            transcript = await decode
+            if transcript is None:
+                await self.send({"type": "dropped"})
+                continue
+            transcript = transcript.strip()
+            if not transcript:
+                continue
+            latency = time.perf_counter() - ended
+            await self.send({
+                "type": "transcript",
+                "text": transcript,
+                "latency_ms": round(latency * 1000, 1),
+                "slo_met": latency <= self.server.scheduler.slo_seconds,
+            })
+            try:
+                get_meeting_archive().add_transcript(self.meeting_id, transcript, speaker=self.user_id)
+            except Exception as e:
+                print(f"ERROR: Failed to archive a transcript of {self.meeting_id}. {e}")
+            if self.server.agents:
+                from run_app import process_user_command
+                try:
+                    reply = await self.server.agent_loop.run(
+                        process_user_command(transcript, self.user_id, self.session_id, self.meeting_id)
+                    )
+                except Exception as e:
+                    print(f"ERROR: Failed to process '{transcript}' for {self.meeting_id}. {e}")
+                    continue
+                self.replies += 1
+                await self.send({
+                    "type": "reply",
+                    "text": reply,
+                    "latency_ms": round((time.perf_counter() - ended) * 1000, 1),
+                })
+
+    async def close(self):
+        """Ends any utterance in progress, waits for its replies and reports stats."""
+        if self.segmenter.is_speaking and self._frames:
+            self._end_utterance()
+        self._utterances.put_nowait(None)
+        try:
+            if self._worker is not None:
+                await self._worker
+        finally:
+            self.server.scheduler.close_stream(self.stream_id)
+        stats = {
+            "type": "stats",
+            "meeting_id": self.meeting_id,
+            "stream_id": self.stream_id,
+            "audio_seconds": round(self.audio_seconds, 2),
+            "replies": self.replies,
+            "endpointing": self.segmenter.stats(),
+            **self.server.scheduler.stream_stats[self.stream_id].summary(),
+        }
+        print(f"DEBUG: Stream closed: {stats}")
+        return stats
+
+
+# --- Transports ---
+
+class MeetingServer:
+    def __init__(self, scheduler, agents=True):
+        self.scheduler = scheduler
+        self.agents = agents
+        self.agent_loop = AgentLoop() if agents else None
+        self.active_streams = 0
+        self.peak_streams = 0
+        self._meeting_streams = collections.Counter()   # meeting_id -> open connections
+
+    async def _serve_stream(self, header, send, chunks):
+        stream = MeetingStream(self, header, send)
+        self.active_streams += 1
+        self.peak_streams = max(self.peak_streams, self.active_streams)
+        self._meeting_streams[stream.meeting_id] += 1
+        try:
+            await stream.open()
+            try:
+                async for pcm in chunks:
+                    stream.feed(pcm)
+            finally:
+                # Also when the connection drops, so the stream leaves the scheduler.
+                stats = await stream.close()
+            await send(stats)
+        finally:
+            self.active_streams -= 1
+            self._meeting_streams[stream.meeting_id] -= 1
+            if not self._meeting_streams[stream.meeting_id]:
+                del self._meeting_streams[stream.meeting_id]
+                # The last connection of the meeting is gone; release its note writer thread and file.
+                await asyncio.to_thread(get_note_store().close_meeting, stream.meeting_id)
+
+    async def handle_tcp(self, reader, writer):
+        async def send(message):
+            writer.write((json.dumps(message) + "\n").encode())
+            await writer.drain()
+
+        async def chunks():
+            while True:
+                data = await reader.read(64 * 1024)
+                if not data:
+                    return
+                yield data
+
+        try:
+            header = json.loads(await reader.readline() or b"{}")
+            await self._serve_stream(header, send, chunks())
+        except (ConnectionError, json.JSONDecodeError) as e:
+            print(f"ERROR: Stream failed. {e}")
+        finally:
+            writer.close()
+
+    async def handle_websocket(self, websocket, *args):
+        async def send(message):
+            await websocket.send(json.dumps(message))
+
+        async def chunks():
+            async for message in websocket:
+                if isinstance(message, bytes):
+                    yield message
+
+        try:
+            header = json.loads(await websocket.recv())
+            await self._serve_stream(header, send, chunks())
+        except Exception as e:
+            print(f"ERROR: WebSocket stream failed. {e}")
+
+    def stats(self):
+        return {"active_streams": self.active_streams, "peak_streams": self.peak_streams, **self.scheduler.stats()}
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, ws_port=None, workers=DECODE_WORKERS,
+                max_batch=MAX_BATCH, slo_seconds=SLO_SECONDS, agents=True, decode_batch=decode_batched):
+    write_metrics_at_exit()
+    # One replica per decode worker, so that many batches can decode at once.
+    initialize_model(replicas=workers)
+    scheduler = FairDecodeScheduler(decode_batch, workers=workers, max_batch=max_batch, slo_seconds=slo_seconds)
+    server = MeetingServer(scheduler, agents=agents)
+    scheduler_task = asyncio.create_task(scheduler.run())
+
+    tcp_server = await asyncio.start_server(server.handle_tcp, host, port)
+    print(f"Meeting server listening on tcp://{host}:{port}")
+    ws_server = None
+    if ws_port:
+        if websockets is None:
+            print("WARNING: 'websockets' is not installed; WebSocket endpoint disabled.")
+        else:
+            ws_server = await websockets.serve(server.handle_websocket, host, ws_port, max_size=None)
+            print(f"Meeting server listening on ws://{host}:{ws_port}")
+    try:
+        await tcp_server.serve_forever()
+    finally:
+        scheduler_task.cancel()
+        if ws_server is not None:
+            ws_server.close()
+        if server.agent_loop is not None:
+            server.agent_loop.close()
+        print(f"Server stats: {server.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe and assist many meetings from one process.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--ws-port", type=int, default=None, help=f"Also serve WebSocket (e.g. {DEFAULT_WS_PORT})")
+    parser.add_argument("--workers", type=int, default=DECODE_WORKERS, help="Concurrent decode batches")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--sequential", action="store_true", help="Decode one utterance per model call")
+    parser.add_argument("--slo", type=float, default=SLO_SECONDS, help="Per-stream transcript latency target (s)")
+    parser.add_argument("--no-agents", action="store_true", help="Only transcribe; do not run the agents")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.ws_port, args.workers, args.max_batch, args.slo,
+                          agents=not args.no_agents,
+                          decode_batch=decode_sequential if args.sequential else decode_batched))
+    except KeyboardInterrupt:
+        print("\nGoodbye!")
+
+
+if __name__ == "__main__":
+    main()
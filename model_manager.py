@@ -0,0 +1,301 @@
+import os
+import time
+import queue
+import threading
+import collections
+import numpy as np
+
+# --- Model Manager Configuration ---
+DEFAULT_BACKEND = os.environ.get("WHISPER_BACKEND", "openai")
+MODEL_CACHE_LIMIT_MB = int(os.environ.get("WHISPER_CACHE_MB", "4096"))
+WARMUP_SECONDS = 1.0          # Length of the silent clip decoded right after a load
+LATENCY_WINDOW = 1000         # Per-model call latencies kept for the percentile metrics
+
+# Approximate resident size of the fp32 weights per model size, used to keep the
+# cache under MODEL_CACHE_LIMIT_MB. int8 backends take roughly a third of this.
+APPROX_MODEL_MB = {
+    "tiny": 150,
+    "base": 290,
+    "small": 970,
+    "medium": 3060,
+    "large": 6200,
+}
+
+
+# --- Backends ---
+
+class OpenAIWhisperBackend:
+    """The reference `openai-whisper` package running fp32 on CPU."""
+
+    name = "openai"
+    size_factor = 1.0
+
+    def load(self, model_type):
+        import whisper
+        return whisper.load_model(model_type, device="cpu")
+
+    def transcribe(self, model, audio, language):
+        result = model.transcribe(audio, language=language, fp16=False)
+        return result['text'].strip()
+
+    def transcribe_batch(self, model, audios, language):
+        """
+        Decodes several clips of at most 30 s in one pass: each is padded to a
+        30 s log-mel window, the mels are stacked, and `whisper.decode` runs the
+        encoder once for the whole batch. Greedy decoding without the
+        temperature fallback of `model.transcribe`.
+        """
+        import torch
+        import whisper
+
+        n_mels = getattr(model.dims, "n_mels", 80)
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(audio)), n_mels)
+            for audio in audios
+        ]).to(model.device)
+        options = whisper.DecodingOptions(language=language, fp16=False, without_timestamps=True)
+        with torch.no_grad():
+            results = whisper.decode(model, mel, options)
+        return [result.text.strip() for result in results]
+
+
+class QuantizedWhisperBackend(OpenAIWhisperBackend):
+    """`openai-whisper` with its Linear layers dynamically quantized to int8."""
+
+    name = "openai-int8"
+    size_factor = 0.35
+
+    def load(self, model_type):
+        import torch
+        import whisper
+
+        model = super().load(model_type)
+        # Whisper subclasses nn.Linear only to cast weights for fp16, which is a
+        # no-op on CPU. quantize_dynamic matches exact types, so swap the class.
+        for module in model.modules():
+            if isinstance(module, whisper.model.Linear):
+                module.__class__ = torch.nn.Linear
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class FasterWhisperBackend:
+    """CTranslate2 via `faster-whisper`, int8 inference on CPU."""
+
+    name = "faster-whisper"
+    size_factor = 0.35
+
+    def load(self, model_type):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("The 'faster-whisper' backend requires the 'faster-whisper' package.")
+        return WhisperModel(model_type, device="cpu", compute_type="int8")
+
+    def transcribe(self, model, audio, language):
+        segments, _ = model.transcribe(audio, language=language)
+        return "".join(segment.text for segment in segments).strip()
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (OpenAIWhisperBackend(), QuantizedWhisperBackend(), FasterWhisperBackend())
+}
+
+
+# --- The Manager ---
+
+class _ModelEntry:
+    """A loaded model size/backend pair with its pool of replicas."""
+
+    def __init__(self, key, replicas, size_mb, load_seconds):
+        self.key = key
+        self.pool = queue.Queue()
+        for replica in replicas:
+            self.pool.put(replica)
+        self.replica_count = len(replicas)
+        self.size_mb = size_mb
+        self.load_seconds = load_seconds
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class ModelManager:
+    """
+    Owns every Whisper model in the process.
+
+    Models are keyed by (backend, model_type) and kept in an LRU cache capped
+    at `cache_limit_mb`. Each entry holds `replicas` independent instances so
+    that several decoder threads can run at once; a call borrows one replica
+    and returns it afterwards. `preload` loads and warms a model up front so
+    the first real utterance does not pay for it.
+    """
+
+    def __init__(self, backend=DEFAULT_BACKEND, cache_limit_mb=MODEL_CACHE_LIMIT_MB):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown Whisper backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+        self.default_backend = backend
+        self.cache_limit_mb = cache_limit_mb
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = collections.defaultdict(threading.Lock)
+        self.load_history = []
+        self.evictions = 0
+
+    def _key(self, model_type, backend):
+        return (backend or self.default_backend, model_type)
+
+    def _evict_for(self, size_mb, keep):
+        """Drops least recently used models until `size_mb` more fits under the cap."""
+        with self._lock:
+            used = sum(entry.size_mb for entry in self._entries.values())
+            for key in list(self._entries):
+                if used + size_mb <= self.cache_limit_mb:
+                    break
+                if key == keep:
+                    continue
+                entry = self._entries.pop(key)
+                used -= entry.size_mb
+                self.evictions += 1
+                print(f"Evicted Whisper model {key} ({entry.size_mb:.0f} MB).")
+
+    def get(self, model_type, backend=None, replicas=1):
+        """Returns the cache entry for a model, loading it (and evicting others) if needed."""
+        key = self._key(model_type, backend)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.replica_count >= replicas:
+                self._entries.move_to_end(key)
+                return entry
+
+        with self._load_locks[key]:
+            implementation = BACKENDS[key[0]]
+            size_mb = APPROX_MODEL_MB.get(model_type, APPROX_MODEL_MB["large"]) * implementation.size_factor
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                if entry.replica_count < replicas:
+                    # More decoder threads than replicas: grow the pool in place.
+                    extra = replicas - entry.replica_count
+                    self._evict_for(size_mb * extra, keep=key)
+                    for _ in range(extra):
+                        entry.pool.put(implementation.load(model_type))
+                    entry.replica_count = replicas
+                    entry.size_mb = size_mb * replicas
+                return entry
+            self._evict_for(size_mb * replicas, keep=key)
+
+            print(f"Loading Whisper model '{model_type}' ({key[0]} backend, {replicas} replica(s))...")
+            started = time.perf_counter()
+            loaded = [implementation.load(model_type) for _ in range(replicas)]
+            load_seconds = time.perf_counter() - started
+            print(f"Model loaded successfully in {load_seconds:.1f}s.")
+
+            entry = _ModelEntry(key, loaded, size_mb * replicas, load_seconds)
+            with self._lock:
+                self._entries[key] = entry
+                self.load_history.append({"model": key, "load_seconds": load_seconds})
+            return entry
+
+    def preload(self, model_type, backend=None, replicas=1, warmup=True):
+        """Loads a model ahead of time and runs a dummy decode on every replica."""
+        entry = self.get(model_type, backend, replicas)
+        if warmup:
+            silence = np.zeros(int(WARMUP_SECONDS * 16000), dtype=np.float32)
+            started = time.perf_counter()
+            replicas_out = [entry.pool.get() for _ in range(entry.replica_count)]
+            try:
+                for replica in replicas_out:
+                    BACKENDS[entry.key[0]].transcribe(replica, silence, "en")
+            finally:
+                for replica in replicas_out:
+                    entry.pool.put(replica)
+            print(f"Warm-up decode took {time.perf_counter() - started:.2f}s.")
+        return entry
+
+    def transcribe_batch(self, audios, model_type, language="en", backend=None):
+        """
+        Decodes a list of float32 clips (each at most 30 s) with one call on a
+        free replica. Backends without a batched path decode them in turn.
+        """
+        entry = self.get(model_type, backend)
+        implementation = BACKENDS[entry.key[0]]
+        replica = entry.pool.get()
+        started = time.perf_counter()
+        try:
+            if hasattr(implementation, "transcribe_batch"):
+                return implementation.transcribe_batch(replica, audios, language)
+            return [implementation.transcribe(replica, audio, language) for audio in audios]
+        finally:
+            elapsed = time.perf_counter() - started
+            entry.pool.put(replica)
+            entry.latencies.append(elapsed)
+            entry.calls += 1
+
+    def transcribe(self, audio, model_type, language="en", backend=None):
+        """Decodes float32 audio on a free replica of the requested model."""
+        entry = self.get(model_type, backend)
+        replica = entry.pool.get()
+        started = time.perf_counter()
+        try:
+            return BACKENDS[entry.key[0]].transcribe(replica, audio, language)
+        finally:
+            elapsed = time.perf_counter() - started
+            entry.pool.put(replica)
+            entry.latencies.append(elapsed)
+            entry.calls += 1
+
+    def metrics(self):
+        """Load times, cache usage and per-model call latency percentiles (in ms)."""
+        with self._lock:
+            entries = list(self._entries.values())
+        models = {}
+        for entry in entries:
+            latencies = list(entry.latencies)
+            models[f"{entry.key[0]}/{entry.key[1]}"] = {
+                "replicas": entry.replica_count,
+                "size_mb": round(entry.size_mb),
+                "load_seconds": round(entry.load_seconds, 3),
+                "calls": entry.calls,
+                "latency_ms_p50": _ms(_percentile(latencies, 50)),
+                "latency_ms_p95": _ms(_percentile(latencies, 95)),
+                "latency_ms_max": _ms(max(latencies) if latencies else None),
+            }
+        return {
+            "backend": self.default_backend,
+            "cache_limit_mb": self.cache_limit_mb,
+            "cache_used_mb": round(sum(entry.size_mb for entry in entries)),
+            "evictions": self.evictions,
+            "loads": list(self.load_history),
+            "models": models,
+        }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+# --- Process-wide instance ---
+_manager = None
+_manager_lock = threading.Lock()
+
+def configure_model_manager(backend=DEFAULT_BACKEND, cache_limit_mb=MODEL_CACHE_LIMIT_MB):
+    """Replaces the process-wide ModelManager, e.g. to pick a backend from the command line."""
+    global _manager
+    with _manager_lock:
+        _manager = ModelManager(backend=backend, cache_limit_mb=cache_limit_mb)
+        return _manager
+
+def get_model_manager():
+    """Returns the process-wide ModelManager, creating it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ModelManager()
+        return _manager
@@ -0,0 +1,350 @@
+import os
+import json
+import time
+import queue
+import atexit
+import datetime
+import threading
+
+# --- Note Store Configuration ---
+DATA_DIR = os.environ.get(
+    "MEETING_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+FLUSH_INTERVAL_SECONDS = float(os.environ.get("NOTE_FLUSH_INTERVAL", "0.2"))
+FSYNC_POLICY = os.environ.get("NOTE_FSYNC_POLICY", "batch")   # "always", "batch" or "never"
+MAX_BATCH_RECORDS = 500
+DEFAULT_MEETING_ID = "default"
+FSYNC_POLICIES = ("always", "batch", "never")
+
+
+# --- Meeting identity for tools ---
+
+class MeetingContext:
+    """
+    Stand-in for ADK's ToolContext when a tool is called directly (e.g. by the
+    fast-path router): it only carries the session state the tools read.
+    """
+
+    def __init__(self, meeting_id, speaker=None):
+        self.state = {"meeting_id": meeting_id, "speaker": speaker}
+
+def meeting_id_from_context(tool_context):
+    """The meeting a tool call belongs to, taken from the session state run_app sets up."""
+    if tool_context is None:
+        return DEFAULT_MEETING_ID
+    return tool_context.state.get("meeting_id") or DEFAULT_MEETING_ID
+
+def speaker_from_context(tool_context):
+    if tool_context is None:
+        return None
+    return tool_context.state.get("speaker")
+
+
+# --- The writer ---
+
+_FLUSH = object()   # Queued by flush(): ends the batch being gathered right away
+
+
+class WriterClosedError(ValueError):
+    """An append reached a meeting's writer after `close_meeting` closed it."""
+
+
+class _Commit:
+    """Lets a caller wait for its batch to be written and see whether that failed."""
+    __slots__ = ("event", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.error = None
+
+    def done(self, error=None):
+        self.error = error
+        self.event.set()
+
+    def wait(self, meeting_id):
+        self.event.wait()
+        if self.error is not None:
+            raise OSError(f"Notes for meeting {meeting_id} could not be written: {self.error}") from self.error
+
+
+class MeetingNoteWriter:
+    """
+    Single long-lived writer for one meeting's JSONL file.
+
+    Callers only enqueue records. A background thread group-commits them:
+    it waits for the first record, gathers whatever else arrives within
+    `flush_interval` (up to MAX_BATCH_RECORDS), and writes the batch with one
+    write() and at most one fsync. With the "always" policy `append` blocks
+    until its batch is on disk; otherwise it returns immediately. `flush`
+    ends the batch being gathered at once instead of waiting out the window.
+
+    If a write or fsync fails (disk full, I/O error) the writer is marked
+    failed. Callers waiting on that batch and every later `append` and
+    `flush` raise instead of blocking; closing the meeting starts a fresh
+    writer.
+    """
+
+    def __init__(self, meeting_id, path, flush_interval=FLUSH_INTERVAL_SECONDS, fsync_policy=FSYNC_POLICY):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync_policy}'. Choose from: {', '.join(FSYNC_POLICIES)}")
+        self.meeting_id = meeting_id
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync_policy = fsync_policy
+        self.records_written = 0
+        self.batches_written = 0
+        self.error = None
+        self._queue = queue.Queue()
+        self._closed = False
+        self._closing = threading.Lock()   # An append is either queued before the stop marker or refused
+        self._listeners = []
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name=f"notes-{meeting_id}", daemon=True)
+        self._thread.start()
+
+    def _check(self):
+        if self.error is not None:
+            raise OSError(f"Notes for meeting {self.meeting_id} could not be written: {self.error}") from self.error
+
+    def _put(self, item):
+        with self._closing:
+            if self._closed:
+                raise WriterClosedError(f"The note writer of meeting {self.meeting_id} is closed.")
+            self._queue.put(item)
+
+    def append(self, record):
+        self._check()
+        committed = _Commit() if self.fsync_policy == "always" else None
+        self._put((record, committed))
+        if committed is not None:
+            committed.wait(self.meeting_id)
+
+    def flush(self):
+        """Blocks until every record queued before this call has been written."""
+        self._check()
+        committed = _Commit()
+        try:
+            self._put((_FLUSH, committed))
+        except WriterClosedError:
+            return   # close() already wrote everything.
+        committed.wait(self.meeting_id)
+
+    def add_listener(self, listener):
+        """Calls `listener(records)` with every batch after it is written."""
+        self._listeners.append(listener)
+
+    def _collect_batch(self, first):
+        batch = [first]
+        if first is None or first[0] is _FLUSH:
+            return batch
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < MAX_BATCH_RECORDS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is None or item[0] is _FLUSH:
+                break
+        return batch
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = self._collect_batch(self._queue.get())
+            if batch[-1] is None:
+                stopping = True
+                batch.pop()
+            if not batch:
+                continue
+            records = [record for record, _ in batch if record is not _FLUSH]
+            if records and self.error is None:
+                try:
+                    self._file.write("".join(json.dumps(record) + "\n" for record in records))
+                    self._file.flush()
+                    if self.fsync_policy != "never":
+                        os.fsync(self._file.fileno())
+                    self.records_written += len(records)
+                    self.batches_written += 1
+                except Exception as e:
+                    self.error = e
+                    print(f"ERROR: Writing notes for meeting {self.meeting_id} failed; refusing further notes. {e}")
+            for _, committed in batch:
+                if committed is not None:
+                    committed.done(self.error)
+            if self.error is not None:
+                continue   # Nothing was written, so there is nothing to tell the listeners.
+            for listener in self._listeners if records else ():
+                try:
+                    listener(records)
+                except Exception as e:
+                    print(f"ERROR: Note listener failed. {e}")
+        try:
+            self._file.close()
+        except OSError as e:
+            print(f"ERROR: Closing the notes of meeting {self.meeting_id} failed. {e}")
+
+    def close(self):
+        """Flushes everything queued so far and stops the writer thread; later appends raise."""
+        with self._closing:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+
+class NoteStore:
+    """
+    Notes and action items for every meeting, one JSONL file per meeting under
+    `data_dir`. Each line is {"ts", "meeting_id", "speaker", "type", "text"}.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, flush_interval=FLUSH_INTERVAL_SECONDS, fsync_policy=FSYNC_POLICY):
+        self.data_dir = data_dir
+        self.flush_interval = flush_interval
+        self.fsync_policy = fsync_policy
+        self._writers = {}
+        self._listeners = []
+        self._appends = {}   # meeting_id -> records appended by this process; never reset
+        self._lock = threading.Lock()
+
+    def path_for(self, meeting_id):
+        safe_id = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in meeting_id)
+        return os.path.join(self.data_dir, "notes", f"{safe_id}.jsonl")
+
+    def writer(self, meeting_id):
+        with self._lock:
+            writer = self._writers.get(meeting_id)
+            if writer is None:
+                writer = MeetingNoteWriter(
+                    meeting_id, self.path_for(meeting_id), self.flush_interval, self.fsync_policy
+                )
+                for listener in self._listeners:
+                    writer.add_listener(listener)
+                self._writers[meeting_id] = writer
+            return writer
+
+    def add_listener(self, listener):
+        """Registers `listener(records)` on every current and future meeting writer."""
+        with self._lock:
+            self._listeners.append(listener)
+            for writer in self._writers.values():
+                writer.add_listener(listener)
+
+    def append(self, meeting_id, record_type, text, speaker=None):
+        record = {
+            "ts": datetime.datetime.now().astimezone().isoformat(),
+            "meeting_id": meeting_id,
+            "speaker": speaker,
+            "type": record_type,
+            "text": text,
+        }
+        with self._lock:
+            self._appends[meeting_id] = self._appends.get(meeting_id, 0) + 1
+        try:
+            self.writer(meeting_id).append(record)
+        except WriterClosedError:
+            # close_meeting won the race; the meeting gets a new writer rather than losing the note.
+            self.writer(meeting_id).append(record)
+        return record
+
+    def flush(self, meeting_id):
+        """Makes every note already saved for a meeting visible to readers."""
+        with self._lock:
+            writer = self._writers.get(meeting_id)
+        if writer is not None:
+            writer.flush()
+
+    def version(self, meeting_id):
+        """
+        A value that changes whenever a meeting's notes do: the records this
+        process has appended (counted as soon as a note is saved, before it is
+        flushed, and never reset when a writer is closed and reopened) and the
+        file's size and mtime (which catch writes from other processes).
+        Readers compare it with what they cached without waiting for the writer.
+        """
+        with self._lock:
+            appends = self._appends.get(meeting_id, 0)
+        try:
+            stat = os.stat(self.path_for(meeting_id))
+        except FileNotFoundError:
+            return (appends, 0, 0)
+        return (appends, stat.st_size, stat.st_mtime_ns)
+
+    def tail_records(self, meeting_id, offset=0):
+        """
+        Reads the records written after byte `offset` of a meeting's file.
+        Returns (records, new_offset); pass new_offset back to read only what
+        was added since.
+        """
+        self.flush(meeting_id)
+        path = self.path_for(meeting_id)
+        if not os.path.exists(path):
+            return [], offset
+        records = []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break   # A line still being written; pick it up next time.
+                offset += len(line)
+                if line.strip():
+                    records.append(json.loads(line))
+        return records, offset
+
+    def read_records(self, meeting_id, since=None, until=None, record_types=None):
+        """
+        Streams a meeting's records in write order, optionally limited to a
+        [since, until) range of timezone-aware datetimes and a set of record types.
+        """
+        self.flush(meeting_id)
+        path = self.path_for(meeting_id)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record_types is not None and record["type"] not in record_types:
+                    continue
+                if since is not None or until is not None:
+                    ts = datetime.datetime.fromisoformat(record["ts"])
+                    if since is not None and ts < since:
+                        continue
+                    if until is not None and ts >= until:
+                        continue
+                yield record
+
+    def close_meeting(self, meeting_id):
+        """Writes out a finished meeting's notes and stops its writer thread."""
+        with self._lock:
+            writer = self._writers.pop(meeting_id, None)
+        if writer is not None:
+            writer.close()
+
+    def close_all(self):
+        with self._lock:
+            writers = list(self._writers.values())
+            self._writers.clear()
+        for writer in writers:
+            writer.close()
+
+
+# --- Process-wide instance ---
+_store = None
+_store_lock = threading.Lock()
+
+def get_note_store():
+    """Returns the process-wide NoteStore; pending notes are flushed at exit."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NoteStore()
+            atexit.register(_store.close_all)
+        return _store
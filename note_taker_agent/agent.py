@@ -1,10 +1,22 @@
+import sys
 import datetime
 from google.adk.agents import Agent
+from google.adk.tools import ToolContext
+
+sys.path.append('..')
+from tracing import (
+    trace_model_start, trace_model_end, trace_model_error, trace_tool_start, trace_tool_end, trace_tool_error,
+)
+from context_budget import budget_context, record_prompt_tokens
+from note_store import get_note_store, meeting_id_from_context, speaker_from_context
+from meeting_archive import get_meeting_archive, DOCUMENT_TYPES
+from response_cache import invalidate_responses
+
 # --- Tool 1: For saving general notes ---
 
-def save_note(note: str) -> dict:
+def save_note(note: str, tool_context: ToolContext = None) -> dict:
     """
-    Saves a given text note to a file named 'meeting_notes.txt'.
+    Saves a given text note to the current meeting's notes.
 
     Args:
         note (str): The text content to be saved as a note.
@@ -13,12 +25,12 @@ def save_note(note: str) -> dict:
         A dictionary confirming the status of the operation.
     """
     try:
-        filename = f"meeting_notes_{datetime.date.today()}.txt"
-        with open(filename, 'a') as f:
-            f.write(f"- {note}\\n")
+        meeting_id = meeting_id_from_context(tool_context)
+        get_note_store().append(meeting_id, "note", note, speaker_from_context(tool_context))
+        invalidate_responses(meeting_id)
         
-        print(f"DEBUG: Note '{note}' saved to {filename}")
-        return {"status": "success", "message": f"Note saved to {filename}."}
+        print(f"DEBUG: Note '{note}' saved for meeting {meeting_id}")
+        return {"status": "success", "message": f"Note saved for meeting {meeting_id}."}
         
     except Exception as e:
         print(f"ERROR: Failed to save note. {e}")
@@ -26,9 +38,9 @@ def save_note(note: str) -> dict:
 
 # --- Tool 2: For saving specific action items ---
 
-def save_action_item(action_item: str) -> dict:
+def save_action_item(action_item: str, tool_context: ToolContext = None) -> dict:
     """
-    Saves a specific action item to a file named 'action_items.txt'.
+    Saves a specific action item to the current meeting's action items.
 
     Args:
         action_item (str): The text of the action item to be saved.
@@ -37,28 +49,70 @@ def save_action_item(action_item: str) -> dict:
         A dictionary confirming the status of the operation.
     """
     try:
-        filename = f"action_items_{datetime.date.today()}.txt"
-        with open(filename, 'a') as f:
-            f.write(f"- {action_item}\\n")
+        meeting_id = meeting_id_from_context(tool_context)
+        get_note_store().append(meeting_id, "action_item", action_item, speaker_from_context(tool_context))
+        invalidate_responses(meeting_id)
         
-        print(f"DEBUG: Action Item '{action_item}' saved to {filename}")
-        return {"status": "success", "message": f"Action item saved to {filename}."}
+        print(f"DEBUG: Action Item '{action_item}' saved for meeting {meeting_id}")
+        return {"status": "success", "message": f"Action item saved for meeting {meeting_id}."}
         
     except Exception as e:
         print(f"ERROR: Failed to save action item. {e}")
         return {"status": "error", "message": str(e)}
 
+# --- Tool 3: For searching notes, action items and transcripts of past meetings ---
+
+def search_meeting_archive(query: str, days: int = 0, since: str = "", until: str = "", record_type: str = "",
+                           tool_context: ToolContext = None) -> dict:
+    """
+    Searches the notes, action items and transcripts of all meetings, best matches first.
+
+    Args:
+        query (str): The words to look for, e.g. "vendor contract decision".
+        days (int): Only search the last this many days (0 for no limit), e.g. 31 for "last month".
+        since (str): Optional ISO date (YYYY-MM-DD); only search from this day on.
+        until (str): Optional ISO date (YYYY-MM-DD); only search before this day.
+        record_type (str): Optional "note", "action_item" or "transcript" to search only that kind.
+
+    Returns:
+        A dictionary with the status and the matching records (meeting, type, date, speaker and text).
+    """
+    try:
+        if record_type and record_type not in DOCUMENT_TYPES:
+            return {"status": "error", "message": f"record_type must be one of {', '.join(DOCUMENT_TYPES)}."}
+        if days and not since:
+            since = (datetime.datetime.now().astimezone() - datetime.timedelta(days=days)).isoformat()
+        archive = get_meeting_archive()
+        # The search does not wait for the indexer; the reply says if this meeting's latest lines are still queued.
+        pending = archive.pending(meeting_id_from_context(tool_context))
+        results = archive.search(
+            query,
+            since=since or None,
+            until=until or None,
+            types=[record_type] if record_type else None,
+        )
+        print(f"DEBUG: Archive search '{query}' returned {len(results)} result(s)")
+        message = f"Found {len(results)} matching record(s)." if results else "Nothing in the meeting archive matches that."
+        if pending:
+            message += f" The last {pending} record(s) of this meeting are still being indexed and are not included."
+        return {"status": "success", "message": message, "results": results}
+
+    except Exception as e:
+        print(f"ERROR: Failed to search the meeting archive. {e}")
+        return {"status": "error", "message": str(e)}
+
 
 # --- The Enhanced Agent Definition ---
 
 root_agent = Agent(
     name="note_taker_agent",
     model="gemini-2.0-flash",
-    description="An agent that saves notes and also identifies and saves action items.",
+    description="An agent that saves notes and action items, and searches the notes and transcripts of past meetings.",
     instruction="""
-    You are an intelligent meeting assistant with two primary tools:
+    You are an intelligent meeting assistant with three primary tools:
     1. `save_note`: For general note-taking.
     2. `save_action_item`: For specific, actionable tasks.
+    3. `search_meeting_archive`: For questions about what was said or decided in past meetings.
 
     Your job is to listen to the user and decide which tool to use.
 
@@ -70,8 +124,19 @@ root_agent = Agent(
       "the next step is," or other clear indicators of a task, you MUST
       call the `save_action_item` tool.
       Example: "remember that we need to contact the vendor" -> call save_action_item(action_item="we need to contact the vendor")
+
+    - If the user asks what was said, decided or assigned before, call the
+      `search_meeting_archive` tool with the key words of the question, and
+      answer from the results, mentioning the date of each one you use.
+      Example: "what did we decide about the vendor last month" -> call search_meeting_archive(query="decide vendor", days=31)
       
     Always confirm which action you have taken.
     """,
-    tools=[save_note, save_action_item]
+    tools=[save_note, save_action_item, search_meeting_archive],
+    before_model_callback=[budget_context, trace_model_start],
+    after_model_callback=[record_prompt_tokens, trace_model_end],
+    before_tool_callback=trace_tool_start,
+    after_tool_callback=trace_tool_end,
+    on_model_error_callback=trace_model_error,
+    on_tool_error_callback=trace_tool_error,
 )
@@ -0,0 +1,131 @@
+import re
+import time
+import functools
+import threading
+import collections
+
+# --- Cache Configuration ---
+TOOL_CACHE_TTL_SECONDS = 60        # Read-only tool results (calendar listings, agenda file)
+RESPONSE_CACHE_TTL_SECONDS = 60    # Final replies to read-only questions
+MAX_ENTRIES = 256
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live.
+
+    Counts hits, misses, expirations and evictions (entries pushed out by
+    `max_entries`) so the effect of caching shows up in the run summary.
+    """
+
+    def __init__(self, name, ttl_seconds, max_entries=MAX_ENTRIES):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Returns (True, value) on a fresh hit and (False, None) otherwise."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, ttl_seconds=None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate=None):
+        """Drops every entry, or only those whose key satisfies `predicate`."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate is None or predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# --- Shared caches ---
+tool_cache = TTLCache("tools", TOOL_CACHE_TTL_SECONDS)
+response_cache = TTLCache("responses", RESPONSE_CACHE_TTL_SECONDS)
+
+
+def cached_tool(cache=tool_cache, ttl_seconds=None):
+    """
+    Caches a read-only tool's successful results, keyed by its name and arguments.
+    Error results are never cached. `functools.wraps` keeps the signature and
+    docstring that ADK uses to build the tool declaration.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = func(*args, **kwargs)
+            if not isinstance(value, dict) or value.get("status") != "error":
+                cache.set(key, value, ttl_seconds)
+            return value
+
+        return wrapper
+    return decorator
+
+
+def response_key(user_id, meeting_id, utterance):
+    """Cache key of a reply: the same question gets its own entry in every meeting."""
+    return (user_id, meeting_id, normalize_utterance(utterance))
+
+
+def invalidate_responses(meeting_id=None):
+    """
+    Called by tools that change meeting data (notes, action items, the
+    agenda). Any cached reply in that meeting may have been built from the
+    old data, so all of them go; without a meeting, every reply does.
+    """
+    if meeting_id is None:
+        return response_cache.invalidate()
+    return response_cache.invalidate(lambda key: key[1] == meeting_id)
+
+
+def normalize_utterance(utterance):
+    """Lower-cases and strips punctuation so "What's on my calendar?" and "whats on my calendar" share a key."""
+    text = re.sub(r"[^\w\s]", "", utterance.lower())
+    return " ".join(text.split())
+
+
+def cache_stats():
+    return {cache.name: cache.stats() for cache in (tool_cache, response_cache)}
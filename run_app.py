@@ -1,6 +1,9 @@
 import asyncio
+import collections
 import sys
 import os
+import time
+import datetime
 from dotenv import load_dotenv
 
 # --- Step 1: Load Environment Variables & Import ADK ---
@@ -8,19 +11,38 @@ dotenv_path = os.path.join(os.path.dirname(__file__), 'coordinator_agent', '.env
 load_dotenv(dotenv_path=dotenv_path)
 
 from google.adk.agents import Agent
+from google.adk.agents.run_config import RunConfig, ToolThreadPoolConfig
 from google.adk.sessions import InMemorySessionService
 from google.adk.runners import Runner
 from google.genai import types as genai_types
 from google.adk.memory import InMemoryMemoryService
+from google.adk.events import Event
+from google.adk.sessions.base_session_service import GetSessionConfig
 
 # --- Step 2: Import Your Agents and the New Whisper Transcriber ---
 sys.path.append('..')
 from coordinator_agent.agent import root_agent as coordinator_agent
 from transcriber_whisper import run_transcription  # Import our new function
+from intent_router import IntentRouter
+from response_cache import response_cache, response_key, cache_stats
+from note_store import MeetingContext, get_note_store
+from context_budget import context_budget
+from tracing import tracer, current_span, start_metrics_server, write_metrics_at_exit, METRICS_PORT
+from speculation import speculator
+from meeting_archive import get_meeting_archive
 
-# --- Step 3: Initialize Services & Runner (No Changes) ---
-memory_service = InMemoryMemoryService()
-session_service = InMemorySessionService()
+# --- Step 3: Initialize Services & Runner ---
+# "memory" keeps everything in process; "sqlite" persists sessions and memory
+# across restarts (see durable_services.py).
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "memory")
+
+if SESSION_BACKEND == "sqlite":
+    from durable_services import SqliteSessionService, SqliteMemoryService, SESSION_DB_PATH
+    memory_service = SqliteMemoryService(SESSION_DB_PATH)
+    session_service = SqliteSessionService(SESSION_DB_PATH, on_compact=memory_service.add_compacted_events)
+else:
+    memory_service = InMemoryMemoryService()
+    session_service = InMemorySessionService()
 
 runner = Runner(
     agent=coordinator_agent,
@@ -29,35 +51,207 @@ runner = Runner(
     app_name="AI_Meeting_Assistant"
 )
 
-# --- Step 4: Define the Main Application Logic (No Changes) ---
-async def process_user_command(user_input, user_id, session_id):
-    """Takes transcribed text and sends it to the ADK runner."""
+# --- Step 4: Define the Main Application Logic ---
+MAX_IN_FLIGHT = 4  # Utterances in flight at once; LLM turns of one session still run one at a time
+TOOL_THREADS = 8   # Sync tools (Google APIs, note fsyncs, archive search) run on this many threads
+
+# Without a tool pool ADK calls sync tools on the event loop, and one slow
+# Calendar request would stall every other turn and the cached replies.
+RUN_CONFIG = RunConfig(tool_thread_pool_config=ToolThreadPoolConfig(max_workers=TOOL_THREADS))
+
+# Specialists whose turns only read data, so their replies can be cached.
+READ_ONLY_AGENT_TOOLS = {"calendar_agent"}
+
+request_latencies = []
+intent_router = IntentRouter()
+
+# ADK appends every invocation's events to the one session history, so two
+# turns running on a session at once would interleave their function calls
+# and responses. Anything that writes a session's history holds its lock;
+# capture, the response cache and the fast-path tools still overlap.
+session_locks = collections.defaultdict(asyncio.Lock)
+history_tasks = set()
+
+def record_fast_path_turn_later(user_id, session_id, user_input, reply):
+    """Records a cached/fast-path turn in the background so the reply need not wait for an LLM turn's lock."""
+    task = asyncio.create_task(record_fast_path_turn(user_id, session_id, user_input, reply))
+    history_tasks.add(task)
+    task.add_done_callback(_history_task_done)
+
+def _history_task_done(task):
+    history_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"ERROR: Failed to record a fast-path turn. {task.exception()}")
+
+async def record_fast_path_turn(user_id, session_id, user_input, reply):
+    """Adds a routed turn to the session so later LLM turns still see it in the history."""
+    async with session_locks[session_id]:
+        # Only the session handle is needed here, not its history.
+        session = await session_service.get_session(
+            app_name=runner.app_name, user_id=user_id, session_id=session_id,
+            config=GetSessionConfig(num_recent_events=1),
+        )
+        if session is None:
+            return
+        invocation_id = Event.new_id()
+        for author, role, text in (("user", "user", user_input), (coordinator_agent.name, "model", reply)):
+            await session_service.append_event(session, Event(
+                invocation_id=invocation_id,
+                author=author,
+                content=genai_types.Content(role=role, parts=[genai_types.Part(text=text)]),
+            ))
+
+async def process_user_command(user_input, user_id, session_id, meeting_id=None):
+    """Takes transcribed text and sends it to the fast-path router or the ADK runner."""
     print(f"PROCESSING: '{user_input}'")
+    started = time.perf_counter()
+    command_span = current_span()
+
+    cache_key = response_key(user_id, meeting_id or session_id, user_input)
+    hit, cached_reply = response_cache.get(cache_key)
+    if hit:
+        print("CACHED RESPONSE")
+        if command_span is not None:
+            command_span.set_attribute("path", "cache")
+        record_fast_path_turn_later(user_id, session_id, user_input, cached_reply)
+        return cached_reply
+
+    route = intent_router.route(user_input)
+    if route is not None:
+        if command_span is not None:
+            command_span.set_attribute("path", "fast_path")
+        with tracer.span("router.execute", attributes={"intent": route.intent}):
+            final_response_text = await asyncio.to_thread(
+                route.execute, MeetingContext(meeting_id or session_id, speaker=user_id)
+            )
+        intent_router.record_fast_path(time.perf_counter() - started)
+        print(f"FAST PATH: {route.intent}")
+        record_fast_path_turn_later(user_id, session_id, user_input, final_response_text)
+        if route.read_only:
+            response_cache.set(cache_key, final_response_text)
+        return final_response_text
+
     message = genai_types.Content(
         role='user',
         parts=[genai_types.Part(text=user_input)]
     )
     final_response_text = ""
-    for event in runner.run(user_id=user_id, session_id=session_id, new_message=message):
-        if event.is_final_response():
-            final_response_text = event.content.parts[0].text
-    
-    if final_response_text:
-        print(f"[ASSISTANT]: {final_response_text}\n")
+    tools_used = set()
+    if command_span is not None:
+        command_span.set_attribute("path", "llm")
+    # Likely read-only tool calls start now and run while Gemini is routing.
+    speculative_turn = speculator.begin_turn(user_input, meeting_id or session_id)
+    try:
+        # One runner turn per session at a time; prefetches keep running while this waits.
+        async with session_locks[session_id]:
+            with tracer.span("runner.run") as run_span:
+                # Each event gets a span covering the time since the previous one.
+                last_event_ns = time.time_ns()
+                async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=message,
+                                                    run_config=RUN_CONFIG):
+                    calls = [call.name for call in event.get_function_calls()]
+                    tools_used.update(calls)
+                    now_ns = time.time_ns()
+                    tracer.start_span("runner.event", parent=run_span, start_ns=last_event_ns, attributes={
+                        "author": event.author,
+                        "function_calls": ",".join(calls),
+                        "final": event.is_final_response(),
+                    }).end(now_ns)
+                    last_event_ns = now_ns
+                    if event.is_final_response() and event.content and event.content.parts:
+                        final_response_text = event.content.parts[0].text or ""
+    finally:
+        speculation = speculator.end_turn(speculative_turn)
+        if speculation["prefetched"]:
+            print(f"SPECULATION: {speculation}")
+    intent_router.record_fallback(time.perf_counter() - started)
+    if final_response_text and tools_used and tools_used <= READ_ONLY_AGENT_TOOLS:
+        response_cache.set(cache_key, final_response_text)
+    return final_response_text
+
+async def command_worker(transcripts, user_id, session_id, meeting_id):
+    """Pulls transcripts off the queue and runs them through the agents."""
+    while True:
+        transcript, heard_at, utterance_span = await transcripts.get()
+        try:
+            get_meeting_archive().add_transcript(meeting_id, transcript, speaker=user_id)
+            with tracer.span("agent.command", parent=utterance_span):
+                final_response_text = await process_user_command(transcript, user_id, session_id, meeting_id)
+            latency = time.perf_counter() - heard_at
+            request_latencies.append(latency)
+            tracer.record("reply.after_transcript", latency)
+            if final_response_text:
+                print(f"[ASSISTANT]: {final_response_text} ({latency * 1000:.0f} ms)\n")
+        except Exception as e:
+            print(f"ERROR: Failed to process '{transcript}'. {e}")
+        finally:
+            transcripts.task_done()
 
-# --- Step 5: The New Main Entry Point ---
+def print_latency_summary():
+    print(f"Router: {intent_router.stats()}")
+    print(f"Caches: {cache_stats()}")
+    print(f"Speculation: {speculator.summary()}")
+    print(f"Context tokens by agent: {context_budget.stats()}")
+    for stage, quantiles in tracer.metrics.summary().items():
+        print(f"  {stage}: {quantiles}")
+    if not request_latencies:
+        return
+    ordered = sorted(request_latencies)
+    p50 = ordered[len(ordered) // 2]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"Requests: {len(ordered)}, latency p50 {p50 * 1000:.0f} ms, "
+          f"p95 {p95 * 1000:.0f} ms, max {ordered[-1] * 1000:.0f} ms")
+
+# --- Step 5: The Main Entry Point ---
 async def main():
     print("AI Meeting Assistant with LOCAL Whisper Transcription is running...")
     
     user_id = "live_user"
-    session = await session_service.create_session(app_name=runner.app_name, user_id=user_id)
-
-    callback = lambda transcript: asyncio.run(
-        process_user_command(transcript, user_id, session.id)
+    # Tools find the meeting (and who is speaking) in the session state; AgentTool
+    # copies it into every specialist's session.
+    meeting_id = f"meeting-{datetime.datetime.now():%Y-%m-%d-%H%M%S}"
+    session = await session_service.create_session(
+        app_name=runner.app_name,
+        user_id=user_id,
+        state={"meeting_id": meeting_id, "speaker": user_id},
     )
+    print(f"Meeting ID: {meeting_id}")
+    # Indexes every note and transcript of this meeting as it is saved.
+    get_meeting_archive()
+    write_metrics_at_exit()
+    if METRICS_PORT:
+        start_metrics_server(tracer.metrics, METRICS_PORT)
 
+    # The transcriber runs in a worker thread; it only hands transcripts over to
+    # this event loop, where up to MAX_IN_FLIGHT of them are processed at once.
     loop = asyncio.get_running_loop()
-    await loop.run_in_executor(None, run_transcription, callback)
+    transcripts = asyncio.Queue()
+    # The transcriber calls back inside the utterance's span; carrying it along
+    # lets the agent work continue the same trace.
+    callback = lambda transcript: loop.call_soon_threadsafe(
+        transcripts.put_nowait, (transcript, time.perf_counter(), current_span())
+    )
+    workers = [
+        asyncio.create_task(command_worker(transcripts, user_id, session.id, meeting_id))
+        for _ in range(MAX_IN_FLIGHT)
+    ]
+
+    try:
+        await loop.run_in_executor(None, run_transcription, callback)
+        await transcripts.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        if history_tasks:
+            await asyncio.gather(*history_tasks, return_exceptions=True)
+        get_note_store().close_meeting(meeting_id)
+        # Make this meeting's conversation searchable from later sessions.
+        final_session = await session_service.get_session(
+            app_name=runner.app_name, user_id=user_id, session_id=session.id
+        )
+        if final_session is not None:
+            await memory_service.add_session_to_memory(final_session)
+        print_latency_summary()
 
 # --- Step 6: Run the Application (No Changes) ---
 if __name__ == "__main__":
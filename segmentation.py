@@ -0,0 +1,164 @@
+import numpy as np
+
+from transcriber_whisper import FRAME_SIZE, SAMPLE_RATE, SILENCE_FRAMES
+
+# --- Segmentation Configuration ---
+RING_BUFFER_SECONDS = 120     # Audio kept addressable for utterances still being decoded
+SPEECH_MARGIN_DB = 12.0       # How far above the noise floor a frame must be to count as speech
+ABSOLUTE_FLOOR_DB = -55.0     # Frames quieter than this are never speech (dBFS)
+NOISE_FLOOR_PERCENTILE = 10   # Per-block percentile used to track background noise
+NOISE_FLOOR_SMOOTHING = 0.9   # Weight of the previous noise floor when a new block arrives
+
+
+class AudioRingBuffer:
+    """
+    Preallocated int16 ring buffer addressed by absolute sample index.
+
+    Samples are written once and never re-joined: `view(start, end)` returns a
+    slice of the underlying array, so an utterance reaches the decoder without
+    being copied. Only an utterance that straddles the wrap-around point has to
+    be stitched together.
+    """
+
+    def __init__(self, capacity=RING_BUFFER_SECONDS * SAMPLE_RATE):
+        self.capacity = int(capacity)
+        self._buffer = np.zeros(self.capacity, dtype=np.int16)
+        self.total_written = 0
+
+    def write(self, samples):
+        """Appends samples and returns the absolute index of the first one."""
+        samples = np.asarray(samples, dtype=np.int16)
+        start = self.total_written
+        if len(samples) > self.capacity:
+            # Only the newest `capacity` samples can be kept anyway.
+            self.total_written += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        offset = self.total_written % self.capacity
+        first = min(len(samples), self.capacity - offset)
+        self._buffer[offset:offset + first] = samples[:first]
+        if first < len(samples):
+            self._buffer[:len(samples) - first] = samples[first:]
+        self.total_written += len(samples)
+        return start
+
+    def view(self, start, end):
+        """Returns samples [start, end) by absolute index; zero-copy unless they wrap."""
+        if start < self.total_written - self.capacity or end > self.total_written or start > end:
+            raise IndexError(f"Samples [{start}, {end}) are no longer (or not yet) in the buffer.")
+        offset = start % self.capacity
+        length = end - start
+        if offset + length <= self.capacity:
+            return self._buffer[offset:offset + length]
+        return np.concatenate((self._buffer[offset:], self._buffer[:offset + length - self.capacity]))
+
+
+def frame_energy_db(samples, frame_size=FRAME_SIZE):
+    """Mean-square energy of every complete frame in dBFS, computed in one pass."""
+    frame_count = len(samples) // frame_size
+    frames = samples[:frame_count * frame_size].reshape(frame_count, frame_size).astype(np.float32)
+    frames /= 32768.0
+    power = np.einsum("ij,ij->i", frames, frames) / frame_size
+    return 10.0 * np.log10(power + 1e-10)
+
+
+class BlockSegmenter:
+    """
+    Vectorized energy VAD and endpointing over blocks of frames.
+
+    Speech decisions for a whole block come from one NumPy comparison against
+    an adaptive noise floor. Utterance boundaries follow the same rule as
+    `transcriber_whisper.UtteranceSegmenter` (an utterance ends once more than
+    `silence_frames` non-speech frames follow the last speech frame), but are
+    found from the gaps between speech frames instead of a per-frame loop.
+    Boundaries are absolute sample indices of everything pushed so far. A
+    live stream passes a `ring` to keep the audio addressable for
+    `ring.view`; audio that is already in memory needs none.
+    """
+
+    def __init__(self, ring=None, silence_frames=SILENCE_FRAMES, frame_size=FRAME_SIZE):
+        self.ring = ring
+        self.silence_frames = silence_frames
+        self.frame_size = frame_size
+        self.noise_floor_db = None
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._frames_seen = 0
+        self._utterance_start = None   # absolute frame index, None while silent
+        self._last_speech = None       # absolute frame index of the latest speech frame
+
+    @property
+    def is_speaking(self):
+        return self._utterance_start is not None
+
+    def speech_mask(self, energy_db):
+        """Speech/non-speech decision for each frame of a block."""
+        if len(energy_db) == 0:
+            return np.zeros(0, dtype=bool)
+        k = len(energy_db) * NOISE_FLOOR_PERCENTILE // 100
+        block_floor = float(np.partition(energy_db, k)[k])
+        if self.noise_floor_db is None:
+            self.noise_floor_db = block_floor
+        else:
+            self.noise_floor_db = (NOISE_FLOOR_SMOOTHING * self.noise_floor_db
+                                   + (1 - NOISE_FLOOR_SMOOTHING) * block_floor)
+        threshold = max(ABSOLUTE_FLOOR_DB, self.noise_floor_db + SPEECH_MARGIN_DB)
+        return energy_db > threshold
+
+    def push(self, samples):
+        """
+        Writes a block into the ring buffer (if any) and returns the utterances it
+        completed as (start_sample, end_sample) pairs.
+        """
+        if self.ring is not None:
+            self.ring.write(samples)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        frame_count = len(samples) // self.frame_size
+        self._pending = samples[frame_count * self.frame_size:].copy()
+        if frame_count == 0:
+            return []
+
+        mask = self.speech_mask(frame_energy_db(samples, self.frame_size))
+        block_start = self._frames_seen
+        self._frames_seen += frame_count
+
+        speech = np.flatnonzero(mask) + block_start
+        if self._last_speech is not None and self.is_speaking:
+            speech = np.concatenate(([self._last_speech], speech))
+
+        finished = []
+        if len(speech):
+            gaps = np.diff(speech) - 1
+            breaks = np.flatnonzero(gaps > self.silence_frames)
+            if not self.is_speaking:
+                self._utterance_start = int(speech[0])
+            for k in breaks:
+                finished.append((self._utterance_start, int(speech[k]) + self.silence_frames + 2))
+                self._utterance_start = int(speech[k + 1])
+            self._last_speech = int(speech[-1])
+
+        if self.is_speaking and self._frames_seen - self._last_speech - 1 > self.silence_frames:
+            finished.append((self._utterance_start, self._last_speech + self.silence_frames + 2))
+            self._utterance_start = None
+
+        return [(start * self.frame_size, end * self.frame_size) for start, end in finished]
+
+    def flush(self):
+        """Closes an utterance still open at the end of the input."""
+        if not self.is_speaking:
+            return []
+        start, end = self._utterance_start, self._frames_seen
+        self._utterance_start = None
+        return [(start * self.frame_size, end * self.frame_size)]
+
+    def utterances(self, samples, block_size=10 * SAMPLE_RATE):
+        """
+        Segments a whole in-memory recording block by block. Yields
+        (start, end, audio) with boundaries relative to `samples` and `audio`
+        a zero-copy slice of it.
+        """
+        base = self._frames_seen * self.frame_size + len(self._pending)
+        for offset in range(0, len(samples), block_size):
+            for start, end in self.push(samples[offset:offset + block_size]):
+                yield start - base, end - base, samples[start - base:end - base]
+        for start, end in self.flush():
+            yield start - base, end - base, samples[start - base:end - base]
@@ -0,0 +1,270 @@
+import re
+import time
+import asyncio
+import datetime
+import functools
+import importlib
+import threading
+import concurrent.futures
+
+from tracing import tracer
+
+# --- Speculation Configuration ---
+PREFETCH_WORKERS = 2
+PREFETCH_TTL_SECONDS = 30         # Unclaimed prefetches are discarded after this
+JOIN_TIMEOUT_SECONDS = 2.0        # Longest a tool waits for a prefetch that is still running
+EVENT_SOON_MINUTES = 15           # A calendar event this close makes time questions likely
+
+# Modules that register a speculative tool when imported, for tools whose
+# agent is only loaded on first use.
+SPECULATIVE_MODULES = {
+    "get_upcoming_events": "calendar_agent.agent",
+    "load_agenda": "agenda_tracker_agent.agenda_store",
+}
+
+CALENDAR_WORDS = re.compile(r"\b(calendar|schedule|meetings?|events?|appointments?|free|busy)\b", re.IGNORECASE)
+TIME_WORDS = re.compile(r"\b(time|late|when|next|wrap up|running over|how long)\b", re.IGNORECASE)
+AGENDA_WORDS = re.compile(r"\b(agenda|topics?|items?|next|move on|start)\b", re.IGNORECASE)
+
+
+def _on_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _next_event_start(result):
+    """Earliest timed start in a get_upcoming_events result ("Event: X at <iso>")."""
+    starts = []
+    for event in result.get("events", []):
+        _, _, start = event.rpartition(" at ")
+        if "T" not in start:
+            continue   # All-day events do not make anyone late.
+        try:
+            parsed = datetime.datetime.fromisoformat(start)
+        except ValueError:
+            continue
+        starts.append(parsed if parsed.tzinfo is not None else parsed.astimezone())
+    return min(starts) if starts else None
+
+
+class _Prefetch:
+    __slots__ = ("name", "args", "future", "started", "finished", "turn")
+
+    def __init__(self, name, args, turn):
+        self.name = name
+        self.args = args
+        self.turn = turn
+        self.future = None
+        self.started = time.perf_counter()
+        self.finished = None
+
+
+class SpeculativeTurn:
+    """The prefetches started for one user command and what came of them."""
+
+    def __init__(self, text):
+        self.text = text
+        self.started = time.perf_counter()
+        self.prefetched = []
+        self.hits = 0
+        self.saved_seconds = 0.0
+
+    def report(self, wasted):
+        return {
+            "prefetched": self.prefetched,
+            "hits": self.hits,
+            "wasted": wasted,
+            "saved_ms": round(self.saved_seconds * 1000, 1),
+        }
+
+
+class Speculator:
+    """
+    Starts likely read-only tool calls while the coordinator LLM is still
+    deciding what to do.
+
+    `begin_turn` looks at cheap signals (keywords in the utterance, whether
+    the meeting's agenda has been read yet, how soon the next calendar event
+    starts) and runs the predicted calls on a small thread pool. A tool
+    wrapped with `speculative` first asks `claim` for a prefetched result
+    with the same arguments: a finished one is used directly, a running one
+    is waited on for up to JOIN_TIMEOUT_SECONDS, and anything else (an error,
+    a timeout, no prefetch) falls back to calling the tool normally. A tool
+    called on an event loop thread never waits, since that would stall every
+    other turn on the loop; it only takes a prefetch that has finished.
+    `end_turn` discards unclaimed prefetches and reports the hits and the
+    wall-clock time they saved.
+
+    Only read-only calls may be registered: a wrong guess must cost nothing
+    but the wasted work.
+    """
+
+    def __init__(self, workers=PREFETCH_WORKERS, ttl_seconds=PREFETCH_TTL_SECONDS,
+                 join_timeout=JOIN_TIMEOUT_SECONDS, enabled=True):
+        self.ttl_seconds = ttl_seconds
+        self.join_timeout = join_timeout
+        self.enabled = enabled
+        self._functions = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="prefetch")
+        self._next_event_at = None
+        self.stats = {
+            "turns": 0, "prefetched": 0, "hits": 0, "wasted": 0, "failed": 0,
+            "late": 0, "unpredicted": 0, "saved_seconds": 0.0,
+        }
+
+    # --- Registration ---
+
+    def register(self, name, func):
+        self._functions[name] = func
+
+    def _function(self, name):
+        if name not in self._functions and name in SPECULATIVE_MODULES:
+            importlib.import_module(SPECULATIVE_MODULES[name])
+        return self._functions[name]
+
+    def observe(self, name, result):
+        """Keeps the signals up to date from any result of a speculative tool."""
+        if name == "get_upcoming_events" and isinstance(result, dict) and result.get("status") == "success":
+            self._next_event_at = _next_event_start(result)
+
+    # --- Prediction ---
+
+    def _event_soon(self):
+        if self._next_event_at is None:
+            return False
+        minutes = (self._next_event_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds() / 60
+        return 0 <= minutes <= EVENT_SOON_MINUTES
+
+    def predict(self, text, meeting_id, agenda_path=None):
+        """The (tool, args) calls this utterance is likely to need."""
+        calls = []
+        if CALENDAR_WORDS.search(text) or (self._event_soon() and TIME_WORDS.search(text)):
+            calls.append(("get_upcoming_events", ()))
+
+        # Only the first agenda request of a meeting reads the file; after
+        # that the position lives in memory and there is nothing to fetch.
+        from agenda_tracker_agent.agenda_store import agenda_store
+        if AGENDA_WORDS.search(text) and agenda_store.get(meeting_id) is None:
+            if agenda_path is None:
+                from agenda_tracker_agent.agent import DEFAULT_AGENDA_PATH
+                agenda_path = DEFAULT_AGENDA_PATH
+            calls.append(("load_agenda", (agenda_path,)))
+        return calls
+
+    # --- Turns ---
+
+    def begin_turn(self, text, meeting_id, agenda_path=None):
+        turn = SpeculativeTurn(text)
+        if not self.enabled:
+            return turn
+        self._expire()
+        calls = self.predict(text, meeting_id, agenda_path)
+        with self._lock:
+            self.stats["turns"] += 1
+            for name, args in calls:
+                if (name, args) in self._pending:
+                    continue   # Another meeting's turn is already fetching it.
+                prefetch = _Prefetch(name, args, turn)
+                prefetch.future = self._executor.submit(self._run_prefetch, prefetch)
+                self._pending[(name, args)] = prefetch
+                turn.prefetched.append(name)
+                self.stats["prefetched"] += 1
+        return turn
+
+    def _run_prefetch(self, prefetch):
+        try:
+            result = self._function(prefetch.name)(*prefetch.args)
+            self.observe(prefetch.name, result)
+            return result
+        finally:
+            prefetch.finished = time.perf_counter()
+
+    def claim(self, name, args=()):
+        """Returns (True, result) if a usable prefetch exists for this call, else (False, None)."""
+        claimed_at = time.perf_counter()
+        with self._lock:
+            prefetch = self._pending.pop((name, args), None)
+            if prefetch is None:
+                self.stats["unpredicted"] += 1
+                return False, None
+        try:
+            result = prefetch.future.result(timeout=0 if _on_event_loop() else self.join_timeout)
+        except concurrent.futures.TimeoutError:
+            with self._lock:
+                self.stats["late"] += 1
+            return False, None
+        except Exception as e:
+            print(f"DEBUG: Prefetch of {name} failed, calling it normally. {e}")
+            with self._lock:
+                self.stats["failed"] += 1
+            return False, None
+        if isinstance(result, dict) and result.get("status") == "error":
+            with self._lock:
+                self.stats["failed"] += 1
+            return False, None
+
+        # Saved: the part of the call that had already run when the tool asked for it.
+        saved = min(prefetch.finished, claimed_at) - prefetch.started
+        with self._lock:
+            prefetch.turn.hits += 1
+            prefetch.turn.saved_seconds += saved
+            self.stats["hits"] += 1
+            self.stats["saved_seconds"] += saved
+        return True, result
+
+    def end_turn(self, turn):
+        """Discards the turn's unclaimed prefetches and returns its report."""
+        with self._lock:
+            unclaimed = [key for key, prefetch in self._pending.items() if prefetch.turn is turn]
+            for key in unclaimed:
+                self._pending.pop(key).future.cancel()
+            self.stats["wasted"] += len(unclaimed)
+        if turn.prefetched:
+            tracer.record("speculation.saved_per_turn", turn.saved_seconds)
+        return turn.report(len(unclaimed))
+
+    def _expire(self):
+        now = time.perf_counter()
+        with self._lock:
+            expired = [key for key, p in self._pending.items() if now - p.started > self.ttl_seconds]
+            for key in expired:
+                self._pending.pop(key).future.cancel()
+            self.stats["wasted"] += len(expired)
+
+    def summary(self):
+        with self._lock:
+            stats = dict(self.stats)
+        saved_seconds = stats.pop("saved_seconds")
+        stats["hit_rate"] = round(stats["hits"] / stats["prefetched"], 3) if stats["prefetched"] else 0.0
+        stats["saved_ms_total"] = round(saved_seconds * 1000, 1)
+        stats["saved_ms_per_turn"] = round(saved_seconds / stats["turns"] * 1000, 1) if stats["turns"] else 0.0
+        return stats
+
+
+speculator = Speculator()
+
+
+def speculative(name=None):
+    """
+    Lets a read-only function be prefetched by the speculator and reuse the
+    prefetched result when it is later called with the same arguments.
+    """
+    def decorator(func):
+        tool_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            hit, result = speculator.claim(tool_name, args)
+            if not hit:
+                result = func(*args)
+                speculator.observe(tool_name, result)
+            return result
+
+        speculator.register(tool_name, func)
+        return wrapper
+    return decorator
@@ -0,0 +1,109 @@
+"""
+Startup profile: where the time goes when a module is imported.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+summarises the report: total import time, the slowest modules by cumulative
+time, and the time grouped by top-level package.
+
+    python startup_profile.py                 # profiles run_app
+    python startup_profile.py meeting_server --top 30
+    python startup_profile.py --json > startup.json
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+# --- Profile Configuration ---
+DEFAULT_MODULE = "run_app"
+DEFAULT_TOP = 20
+# Packages worth reporting on their own rather than by their first name part.
+PACKAGE_GROUPS = (
+    "google.adk", "google.genai", "google.auth", "google_auth_oauthlib",
+    "googleapiclient", "google.protobuf", "grpc",
+)
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+
+def profile_imports(module):
+    """Imports `module` in a child interpreter and returns [(name, self_us, cumulative_us)]."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise RuntimeError(f"Importing '{module}' failed: {error[0]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _group(name):
+    for package in PACKAGE_GROUPS:
+        if name == package or name.startswith(package + "."):
+            return package
+    return name.split(".")[0]
+
+
+def summarize(rows, top=DEFAULT_TOP):
+    total_us = sum(self_us for _, self_us, _ in rows)
+    groups = {}
+    for name, self_us, _ in rows:
+        key = _group(name)
+        groups[key] = groups.get(key, 0) + self_us
+    slowest = sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(rows),
+        "slowest": [
+            {"module": name, "cumulative_ms": round(cum / 1000, 1), "self_ms": round(own / 1000, 1)}
+            for name, own, cum in slowest
+        ],
+        "packages": [
+            {"package": key, "self_ms": round(us / 1000, 1)}
+            for key, us in sorted(groups.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+    }
+
+
+def print_summary(module, summary):
+    print(f"Import of '{module}': {summary['total_ms']} ms across {summary['modules']} modules\n")
+    print("Slowest modules (cumulative, including what they import):")
+    for row in summary["slowest"]:
+        print(f"  {row['cumulative_ms']:>9.1f} ms  {row['module']}")
+    print("\nTime by package (self time only, so nothing is counted twice):")
+    for row in summary["packages"]:
+        share = row["self_ms"] / summary["total_ms"] * 100 if summary["total_ms"] else 0
+        print(f"  {row['self_ms']:>9.1f} ms  {share:5.1f}%  {row['package']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time breakdown of the app's startup.")
+    parser.add_argument("module", nargs="?", default=DEFAULT_MODULE, help="Module to import (default: run_app)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Rows shown in each table")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    try:
+        summary = summarize(profile_imports(args.module), args.top)
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if args.json:
+        print(json.dumps({"module": args.module, **summary}, indent=2))
+    else:
+        print_summary(args.module, summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import io
+import re
+import datetime
+import threading
+
+from note_store import get_note_store
+from response_cache import TTLCache
+
+# --- Summary Configuration ---
+DIGEST_CACHE_TTL_SECONDS = 3600   # Rendered digests are also dropped when new notes arrive
+DIGEST_CACHE_ENTRIES = 64
+GREETING = "Hello,\n\nHere is a summary of our meeting.\n\n"
+SIGN_OFF = "\nBest regards,\nYour AI Meeting Assistant"
+
+_NON_WORD = re.compile(r"\W+")
+
+
+def _dedupe_key(text):
+    # "Ship the beta." and "ship the  beta" are the same item said twice.
+    return _NON_WORD.sub(" ", text.casefold()).strip()
+
+
+class _MeetingItems:
+    """Everything read so far from one meeting's note file, with each item's dedupe key."""
+
+    def __init__(self):
+        self.offset = 0           # Bytes of the note file already folded in
+        self.version = None       # NoteStore.version() when the file was last read
+        self.revision = 0         # Bumped whenever items are added
+        self.notes = []           # (ts, speaker, text, dedupe key)
+        self.action_items = []
+        self.seen = set()
+        self.duplicates = 0
+        self.lock = threading.Lock()
+
+    def fold(self, records):
+        # Repeats are kept: whether an item is a repeat depends on the range
+        # being summarised, so duplicates are dropped when rendering.
+        for record in records:
+            is_action = record["type"] == "action_item"
+            key = _dedupe_key(record["text"])
+            if (is_action, key) in self.seen:
+                self.duplicates += 1
+            self.seen.add((is_action, key))
+            item = (datetime.datetime.fromisoformat(record["ts"]), record.get("speaker"), record["text"], key)
+            (self.action_items if is_action else self.notes).append(item)
+        if records:
+            self.revision += 1
+
+
+class SummaryBuilder:
+    """
+    Builds follow-up email bodies from the note store.
+
+    Each meeting's note file is read incrementally: the builder remembers how
+    far it got and only parses records written since. A rendered summary
+    leaves out items that repeat an earlier note or action item within the
+    same time range. Rendered bodies are cached per
+    (meeting, time range) and reused until the meeting's notes change, which
+    is checked against `NoteStore.version` without waiting for the writer.
+    Meetings are identified by ID, so one that runs past midnight or over
+    several days is summarised as a whole unless a range is given.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or get_note_store()
+        self._meetings = {}
+        self._lock = threading.Lock()
+        self.cache = TTLCache("email_digest", DIGEST_CACHE_TTL_SECONDS, DIGEST_CACHE_ENTRIES)
+
+    def _items(self, meeting_id):
+        with self._lock:
+            items = self._meetings.get(meeting_id)
+            if items is None:
+                items = self._meetings[meeting_id] = _MeetingItems()
+        with items.lock:
+            version = self.store.version(meeting_id)
+            if items.version != version:
+                records, items.offset = self.store.tail_records(meeting_id, items.offset)
+                items.fold(records)
+                items.version = version
+        return items
+
+    def render(self, meeting_id, since=None, until=None):
+        """
+        The plain-text summary for a meeting, limited to notes in [since, until)
+        when given (timezone-aware datetimes).
+        """
+        items = self._items(meeting_id)
+        key = (meeting_id, since, until, items.revision)
+        hit, body = self.cache.get(key)
+        if hit:
+            return body
+        with items.lock:
+            notes = list(items.notes)
+            action_items = list(items.action_items)
+        body = self._write_body(notes, action_items, since, until)
+        self.cache.set(key, body)
+        return body
+
+    def _write_body(self, notes, action_items, since, until):
+        out = io.StringIO()
+        out.write(GREETING)
+        for heading, entries, empty in (
+            ("--- Meeting Notes ---\n", notes, "No general notes were taken for this meeting.\n"),
+            ("\n--- Action Items ---\n", action_items, "No action items were identified for this meeting.\n"),
+        ):
+            out.write(heading)
+            written = 0
+            seen = set()
+            for ts, _, text, key in entries:
+                if (since is not None and ts < since) or (until is not None and ts >= until):
+                    continue
+                if key in seen:
+                    continue
+                seen.add(key)
+                out.write(f"- {text}\n")
+                written += 1
+            if not written:
+                out.write(empty)
+        out.write(SIGN_OFF)
+        return out.getvalue()
+
+    def stats(self, meeting_id=None):
+        with self._lock:
+            meetings = dict(self._meetings) if meeting_id is None else {meeting_id: self._meetings.get(meeting_id)}
+        return {
+            "meetings": {
+                mid: {"notes": len(m.notes), "action_items": len(m.action_items), "duplicates_dropped": m.duplicates}
+                for mid, m in meetings.items() if m is not None
+            },
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+        }
+
+
+# --- Process-wide instance ---
+_builder = None
+_builder_lock = threading.Lock()
+
+def get_summary_builder():
+    global _builder
+    with _builder_lock:
+        if _builder is None:
+            _builder = SummaryBuilder()
+        return _builder
@@ -0,0 +1,14 @@
+"""
+Tests run against a scratch data directory, a stand-in model and fake
+Google APIs from the benchmark harness, so they need no microphone,
+Gemini or Google account.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import harness
+
+# Must happen before any app module is imported.
+harness.isolate()
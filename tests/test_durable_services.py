@@ -0,0 +1,37 @@
+import asyncio
+import logging
+import os
+
+from benchmarks import harness
+
+
+def test_compaction_keeps_function_calls_with_their_responses(tmp_path, caplog):
+    from google.adk.runners import Runner
+    from google.genai import types as genai_types
+    from coordinator_agent.agent import root_agent
+    from durable_services import SqliteSessionService
+
+    harness.use_model(root_agent, harness.make_fake_llm())
+    # A turn that calls a specialist is four events: request, function call, function response, reply.
+    sessions = SqliteSessionService(os.path.join(tmp_path, "sessions.db"), keep_recent_events=6, compact_every=1)
+    runner = Runner(agent=root_agent, app_name="compaction-test", session_service=sessions)
+
+    async def scenario():
+        session = await sessions.create_session(
+            app_name=runner.app_name, user_id="tester", state={"meeting_id": "test-meeting"},
+        )
+        for turn in range(6):
+            message = genai_types.Content(role="user", parts=[genai_types.Part(text=f"Take a note that item {turn} is done")])
+            async for _ in runner.run_async(user_id="tester", session_id=session.id, new_message=message):
+                pass
+        return await sessions.get_session(app_name=runner.app_name, user_id="tester", session_id=session.id)
+
+    with caplog.at_level(logging.WARNING):
+        session = asyncio.run(scenario())
+    sessions.close()
+
+    calls = {call.id for event in session.events for call in event.get_function_calls()}
+    responses = [response.id for event in session.events for response in event.get_function_responses()]
+    assert len(session.events) < 6 * 4          # Compaction ran
+    assert responses and set(responses) <= calls
+    assert "Dropping function responses" not in caplog.text
@@ -0,0 +1,30 @@
+import threading
+import time
+
+from google_clients import GoogleServiceClients
+
+
+def test_first_sign_in_for_one_api_does_not_block_another():
+    from google.auth.credentials import AnonymousCredentials
+
+    pool = GoogleServiceClients()
+    pool._start_refresher = lambda: None
+    signed_in = threading.Event()
+
+    def load_credentials(token_path, credentials_path, scopes):
+        if "gmail" in token_path:
+            signed_in.wait(5)   # The interactive OAuth flow, waiting for the user.
+        return AnonymousCredentials()
+
+    pool._load_credentials = load_credentials
+    gmail = threading.Thread(target=pool.get_client, args=("gmail", "v1", [], "token_gmail.json", "credentials.json"))
+    gmail.start()
+    try:
+        time.sleep(0.1)
+        started = time.perf_counter()
+        pool.get_client("calendar", "v3", [], "token_calendar.json", "credentials.json")
+        assert time.perf_counter() - started < 1.0
+    finally:
+        signed_in.set()
+        gmail.join()
+    assert pool.stats["builds"] == 2
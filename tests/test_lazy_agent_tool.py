@@ -0,0 +1,31 @@
+import pytest
+from google.adk.tools import agent_tool
+
+from lazy_agent_tool import LazyAgentTool
+
+
+@pytest.mark.parametrize("module_name, name, attribute", [
+    ("calendar_agent.agent", "calendar_agent", "root_agent"),
+    ("email_agent.agent", "email_agent", "root_agent"),
+])
+def test_lazy_declaration_matches_the_eager_one(module_name, name, attribute):
+    import importlib
+    from coordinator_agent.agent import root_agent
+
+    lazy = next(tool for tool in root_agent.tools if getattr(tool, "name", None) == name)
+    assert isinstance(lazy, LazyAgentTool)
+    fresh = LazyAgentTool(module_name, name, lazy.description)
+    before_loading = fresh._get_declaration()
+    assert not fresh.loaded
+
+    eager = agent_tool.AgentTool(getattr(importlib.import_module(module_name), attribute))
+    assert before_loading == eager._get_declaration()
+    assert fresh.agent is eager.agent
+    assert fresh._get_declaration() == eager._get_declaration()
+
+
+def test_agent_tool_options_are_passed_through():
+    tool = LazyAgentTool("calendar_agent.agent", "calendar_agent", "Reads the calendar.",
+                         skip_summarization=True, include_plugins=False)
+    assert tool.skip_summarization and not tool.include_plugins
+    assert not tool.loaded
@@ -0,0 +1,27 @@
+import os
+import threading
+import time
+
+from meeting_archive import MeetingArchive
+
+
+def test_search_does_not_wait_for_pending_records(tmp_path, monkeypatch):
+    archive = MeetingArchive(db_path=os.path.join(tmp_path, "archive.db"), notes_dir=str(tmp_path), legacy_dir=str(tmp_path))
+    archive.flush()
+    release = threading.Event()
+    index = archive._index
+    monkeypatch.setattr(archive, "_index", lambda records: (release.wait(5), index(records)))
+    try:
+        archive.add_transcript("test-meeting", "The zeppelin launch moves to May.")
+        started = time.perf_counter()
+        assert archive.search("zeppelin", meeting_id="test-meeting") == []
+        assert time.perf_counter() - started < 0.5
+        assert archive.pending("test-meeting") == 1
+
+        release.set()
+        assert archive.wait_for_meeting("test-meeting", timeout=5)
+        assert archive.pending("test-meeting") == 0
+        assert len(archive.search("zeppelin", meeting_id="test-meeting")) == 1
+    finally:
+        release.set()
+        archive.close()
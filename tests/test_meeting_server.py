@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+
+
+async def _loop_lag(seconds):
+    """Longest delay of a 10 ms sleep on the running loop over `seconds`."""
+    lags, ends = [], time.perf_counter() + seconds
+    while time.perf_counter() < ends:
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - started - 0.01)
+    return max(lags)
+
+
+def test_blocking_agent_turn_does_not_stall_the_serving_loop(monkeypatch):
+    import run_app
+    import meeting_server
+
+    async def blocking_turn(text, user_id, session_id, meeting_id):
+        time.sleep(1.0)
+        return "done"
+
+    monkeypatch.setattr(run_app, "process_user_command", blocking_turn)
+
+    async def scenario():
+        scheduler = meeting_server.FairDecodeScheduler(lambda audios: ["hello"] * len(audios), workers=1)
+        scheduler_task = asyncio.create_task(scheduler.run())
+        server = meeting_server.MeetingServer(scheduler, agents=True)
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        stream = meeting_server.MeetingStream(server, {"meeting_id": "test-meeting"}, send)
+        try:
+            await stream.open()
+            stream._end_utterance()
+            lag = await _loop_lag(1.2)
+            await stream.close()
+        finally:
+            server.agent_loop.close()
+            scheduler_task.cancel()
+        return lag, [message["type"] for message in sent]
+
+    lag, sent = asyncio.run(scenario())
+    assert sent == ["transcript", "reply"]
+    assert lag < 0.2
+
+
+def test_close_leaves_the_scheduler_when_the_worker_failed():
+    import meeting_server
+
+    async def scenario():
+        scheduler = meeting_server.FairDecodeScheduler(lambda audios: ["hello"] * len(audios), workers=1)
+        scheduler_task = asyncio.create_task(scheduler.run())
+        server = meeting_server.MeetingServer(scheduler, agents=False)
+
+        async def send(message):
+            raise ConnectionResetError("client went away")
+
+        stream = meeting_server.MeetingStream(server, {"meeting_id": "test-meeting"}, send)
+        await stream.open()
+        stream._end_utterance()
+        try:
+            with pytest.raises(ConnectionResetError):
+                await stream.close()
+        finally:
+            scheduler_task.cancel()
+        return stream.stream_id in scheduler._queues
+
+    assert not asyncio.run(scenario())
@@ -0,0 +1,48 @@
+import os
+import time
+
+import pytest
+
+from note_store import MeetingNoteWriter, NoteStore, WriterClosedError
+
+
+def test_flush_does_not_wait_out_the_group_commit_window(tmp_path):
+    writer = MeetingNoteWriter("test-meeting", os.path.join(tmp_path, "notes.jsonl"), flush_interval=2.0)
+    try:
+        writer.append({"text": "first"})
+        started = time.perf_counter()
+        writer.flush()
+        assert time.perf_counter() - started < 0.5
+        assert writer.records_written == 1
+    finally:
+        writer.close()
+
+
+def test_append_after_close_raises(tmp_path):
+    writer = MeetingNoteWriter("test-meeting", os.path.join(tmp_path, "notes.jsonl"), fsync_policy="always")
+    writer.close()
+    with pytest.raises(WriterClosedError):
+        writer.append({"text": "late"})
+
+
+def test_failed_write_raises_instead_of_hanging(tmp_path, monkeypatch):
+    writer = MeetingNoteWriter("test-meeting", os.path.join(tmp_path, "notes.jsonl"), fsync_policy="always")
+
+    def disk_full(fd):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(os, "fsync", disk_full)
+    with pytest.raises(OSError):
+        writer.append({"text": "lost"})
+    with pytest.raises(OSError):
+        writer.flush()
+    writer.close()
+
+
+def test_closing_a_meeting_keeps_its_notes_and_later_ones(tmp_path):
+    store = NoteStore(str(tmp_path), flush_interval=0.01)
+    store.append("test-meeting", "note", "before close")
+    store.close_meeting("test-meeting")
+    store.append("test-meeting", "note", "after close")
+    assert [record["text"] for record in store.read_records("test-meeting")] == ["before close", "after close"]
+    store.close_all()
@@ -0,0 +1,14 @@
+from response_cache import invalidate_responses, response_cache, response_key
+
+
+def test_replies_are_cached_and_invalidated_per_meeting():
+    response_cache.invalidate()
+    response_cache.set(response_key("tester", "meeting-a", "What's next on the agenda?"), "Budget.")
+    response_cache.set(response_key("tester", "meeting-b", "What's next on the agenda?"), "Hiring.")
+
+    assert response_cache.get(response_key("tester", "meeting-a", "whats next on the agenda")) == (True, "Budget.")
+    assert response_cache.get(response_key("tester", "meeting-c", "What's next on the agenda?")) == (False, None)
+
+    assert invalidate_responses("meeting-a") == 1
+    assert response_cache.get(response_key("tester", "meeting-a", "What's next on the agenda?")) == (False, None)
+    assert response_cache.get(response_key("tester", "meeting-b", "What's next on the agenda?")) == (True, "Hiring.")
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from benchmarks import harness
+
+SLOW_API_SECONDS = 1.0
+
+
+def test_slow_tool_does_not_delay_fast_path_or_cached_replies():
+    import run_app
+    from coordinator_agent.agent import root_agent
+    from response_cache import tool_cache
+
+    harness.use_model(root_agent, harness.make_fake_llm())
+    http = harness.install_fake_google()
+
+    async def scenario():
+        session = await run_app.session_service.create_session(
+            app_name=run_app.runner.app_name, user_id="tester", state={"meeting_id": "test-meeting"},
+        )
+        ask = lambda text: run_app.process_user_command(text, "tester", session.id, "test-meeting")
+        # The first turn imports the calendar agent and builds ADK's schemas; only later turns are timed.
+        await ask("Check the calendar events for this week")
+        http.latency_ms = SLOW_API_SECONDS * 1000
+        tool_cache.invalidate()
+
+        # Goes through the coordinator to the calendar agent and a 1 s Calendar request.
+        slow = asyncio.create_task(ask("Check the calendar events for next week"))
+        # The wait counts too: a tool blocking the loop would stretch it.
+        started = time.perf_counter()
+        await asyncio.sleep(0.2)
+        assert not slow.done()
+        reply = await ask("Take a note that the budget review moved to Friday")
+        fast_path_seconds = time.perf_counter() - started - 0.2
+        assert reply.startswith("Note saved")
+
+        run_app.response_cache.set(run_app.response_key("tester", "test-meeting", "Read me the weather"), "Sunny.")
+        started = time.perf_counter()
+        reply = await ask("Read me the weather")
+        cached_seconds = time.perf_counter() - started
+        assert reply == "Sunny."
+
+        assert not slow.done()
+        await slow
+        if run_app.history_tasks:
+            await asyncio.gather(*run_app.history_tasks)
+        return fast_path_seconds, cached_seconds
+
+    fast_path_seconds, cached_seconds = asyncio.run(scenario())
+    assert fast_path_seconds < SLOW_API_SECONDS / 2
+    assert cached_seconds < SLOW_API_SECONDS / 2
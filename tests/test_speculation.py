@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+from speculation import Speculator
+
+
+def _speculator_with_slow_prefetch(seconds):
+    speculator = Speculator()
+    speculator.register("slow_read", lambda: (time.sleep(seconds), {"status": "success"})[1])
+    speculator.predict = lambda text, meeting_id, agenda_path=None: [("slow_read", ())]
+    return speculator
+
+
+def test_claim_on_the_event_loop_does_not_wait_for_a_running_prefetch():
+    speculator = _speculator_with_slow_prefetch(0.5)
+    speculator.begin_turn("anything", "test-meeting")
+
+    async def claim():
+        started = time.perf_counter()
+        return speculator.claim("slow_read"), time.perf_counter() - started
+
+    (hit, _), waited = asyncio.run(claim())
+    assert not hit
+    assert waited < 0.05
+    assert speculator.stats["late"] == 1
+
+
+def test_claim_off_the_loop_joins_a_running_prefetch():
+    speculator = _speculator_with_slow_prefetch(0.2)
+    speculator.begin_turn("anything", "test-meeting")
+    assert speculator.claim("slow_read") == (True, {"status": "success"})
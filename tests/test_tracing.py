@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import types
+
+import tracing
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_failed_tool_call_ends_its_span_and_restores_the_parent(monkeypatch):
+    monkeypatch.setattr(tracing.tracer, "enabled", True)
+    tool = types.SimpleNamespace(name="flaky_tool")
+    tool_context = types.SimpleNamespace(agent_name="note_taker_agent", invocation_id="inv-1", function_call_id="call-1")
+
+    with tracing.tracer.span("runner.run") as run_span:
+        tracing.trace_tool_start(tool, {}, tool_context)
+        assert tracing.current_span().name == "tool.flaky_tool"
+        tracing.trace_tool_error(tool, {}, tool_context, RuntimeError("boom"))
+        assert tracing.current_span() is run_span
+        # A later call's span hangs off the run again, not off the failed tool.
+        assert tracing.tracer.start_span("tool.next").parent is run_span
+
+    assert tracing.tracer.metrics.summary()["tool.flaky_tool"]
+    assert not tracing._open_spans
+
+
+def test_failed_model_call_ends_its_span(monkeypatch):
+    monkeypatch.setattr(tracing.tracer, "enabled", True)
+    callback_context = types.SimpleNamespace(agent_name="meeting_coordinator", invocation_id="inv-2")
+    llm_request = types.SimpleNamespace(contents=[])
+
+    tracing.trace_model_start(callback_context, llm_request)
+    assert tracing.current_span().name == "llm.meeting_coordinator"
+    tracing.trace_model_error(callback_context, llm_request, TimeoutError("model timed out"))
+    assert tracing.current_span() is None
+    assert not tracing._open_spans
+
+
+def test_importing_tracing_writes_no_metrics_file(tmp_path):
+    env = dict(os.environ, TRACING="1", TRACE_DIR=str(tmp_path))
+    subprocess.run([sys.executable, "-c", "import tracing"], cwd=REPO_ROOT, env=env, check=True)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".prom")]
@@ -0,0 +1,17 @@
+import re
+
+# --- Tokenizer shared by the on-disk indexes ---
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOPWORDS = frozenset("""
+a an and are as at be but by do for from has have i if in is it its me my of on or our so
+that the their them then there these they this to us was we were what when which who will
+with you your
+""".split())
+
+
+def tokenize(text):
+    """Lower-cased word tokens with stopwords removed, in order (duplicates kept)."""
+    return [
+        token.replace("'", "") for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
@@ -0,0 +1,409 @@
+import os
+import json
+import time
+import atexit
+import secrets
+import threading
+import contextlib
+import contextvars
+import collections
+import http.server
+
+# --- Tracing Configuration ---
+TRACING_ENABLED = os.environ.get("TRACING", "1") != "0"
+TRACE_DIR = os.environ.get(
+    "TRACE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "traces")
+)
+SERVICE_NAME = "ai-meeting-assistant"
+EXPORT_BATCH_SPANS = 64          # Spans buffered before they are appended to the trace file
+HISTOGRAM_WINDOW = 4096          # Recent samples per stage used for the percentiles
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))   # 0 = no Prometheus endpoint
+QUANTILES = (0.5, 0.95, 0.99)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+# --- Per-stage latency histograms ---
+
+class StageHistogram:
+    """Count, sum and a sliding window of recent durations for one stage."""
+
+    def __init__(self, window=HISTOGRAM_WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.samples = collections.deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: None for q in QUANTILES}
+        return {q: ordered[min(len(ordered) - 1, int(len(ordered) * q))] for q in QUANTILES}
+
+
+class LatencyMetrics:
+    """Thread-safe registry of stage histograms, readable as a dict or Prometheus text."""
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = StageHistogram()
+            histogram.observe(seconds)
+
+    def summary(self):
+        """{stage: {"count", "p50_ms", "p95_ms", "p99_ms"}}."""
+        with self._lock:
+            stages = {stage: (h.count, h.quantiles()) for stage, h in self._stages.items()}
+        return {
+            stage: {"count": count, **{
+                f"p{int(q * 100)}_ms": round(value * 1000, 2) if value is not None else None
+                for q, value in quantiles.items()
+            }}
+            for stage, (count, quantiles) in sorted(stages.items())
+        }
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP meeting_stage_latency_seconds Latency of each pipeline stage.",
+            "# TYPE meeting_stage_latency_seconds summary",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._stages.items()):
+                for q, value in histogram.quantiles().items():
+                    if value is not None:
+                        lines.append(f'meeting_stage_latency_seconds{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+                lines.append(f'meeting_stage_latency_seconds_sum{{stage="{stage}"}} {histogram.total:.6f}')
+                lines.append(f'meeting_stage_latency_seconds_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+
+
+# --- Spans ---
+
+def _attribute_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """
+    One timed operation. Ending it records its duration under its name in the
+    stage histograms and hands it to the exporter.
+    """
+
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, tracer, name, parent=None, attributes=None, start_ns=None):
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def end(self, end_ns=None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        self.tracer._finish(self)
+
+    @property
+    def duration_seconds(self):
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e9
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,   # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent is not None:
+            span["parentSpanId"] = self.parent.span_id
+        return span
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled so callers never need to check."""
+    name = None
+    parent = None
+    error = None
+    duration_seconds = 0.0
+
+    def set_attribute(self, key, value):
+        pass
+
+    def end(self, end_ns=None):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class OtlpJsonFileExporter:
+    """
+    Appends finished spans to a JSON-lines file in the OTLP/JSON layout written
+    by the OpenTelemetry Collector's file exporter, so the file can be replayed
+    into any OTLP backend (Jaeger, Tempo, ...) or read with jq.
+    """
+
+    def __init__(self, path, batch_spans=EXPORT_BATCH_SPANS):
+        self.path = path
+        self.batch_spans = batch_spans
+        self._pending = []
+        self._lock = threading.Lock()
+        self.exported = 0
+
+    def export(self, span):
+        with self._lock:
+            self._pending.append(span)
+            if len(self._pending) < self.batch_spans:
+                return
+            batch, self._pending = self._pending, []
+        self._write(batch)
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    def _write(self, spans):
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "meeting_agent.tracing"}, "spans": [s.to_otlp() for s in spans]}],
+        }]}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload) + "\n")
+        self.exported += len(spans)
+
+
+class Tracer:
+    """
+    Creates spans, tracks the current one per thread/task via contextvars, and
+    feeds finished spans to the histograms and the exporter.
+    """
+
+    def __init__(self, exporter=None, metrics=None, enabled=TRACING_ENABLED):
+        self.exporter = exporter
+        self.metrics = metrics or LatencyMetrics()
+        self.enabled = enabled
+
+    def start_span(self, name, parent=None, attributes=None, start_ns=None):
+        """Starts a span under `parent` (default: the current span). It is not made current."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        if parent is None:
+            parent = _current_span.get()
+        if parent is _NOOP_SPAN:
+            parent = None
+        return Span(self, name, parent, attributes, start_ns)
+
+    @contextlib.contextmanager
+    def span(self, name, attributes=None, parent=None):
+        """Runs the block inside a new span that is current for its duration."""
+        span = self.start_span(name, parent=parent, attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    @contextlib.contextmanager
+    def use_span(self, span):
+        """Makes an existing span current (e.g. one handed over from another thread) without ending it."""
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    def record(self, stage, seconds):
+        """Adds a duration to a stage histogram without creating a span."""
+        if self.enabled:
+            self.metrics.observe(stage, seconds)
+
+    def _finish(self, span):
+        self.metrics.observe(span.name, span.duration_seconds)
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    def shutdown(self, metrics_path=None):
+        if self.exporter is not None:
+            self.exporter.flush()
+        if metrics_path and self.enabled:
+            self.metrics.write(metrics_path)
+
+
+def current_span():
+    return _current_span.get()
+
+
+# --- Prometheus text endpoint ---
+
+def start_metrics_server(metrics, port=METRICS_PORT):
+    """Serves `metrics` as Prometheus text on http://localhost:<port>/metrics from a daemon thread."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"DEBUG: Prometheus metrics at http://127.0.0.1:{server.server_port}/metrics")
+    return server
+
+
+# --- ADK callbacks: LLM calls, AgentTool hops and tool functions ---
+
+# Spans opened by a before-callback, with the token that restores the span
+# that was current before them. Keyed by (agent, invocation) for model calls
+# and by function call id for tools, so the after- or error-callback closes
+# exactly the span its own call opened.
+_open_spans = {}
+_open_spans_lock = threading.Lock()
+
+def _open_callback_span(key, span):
+    token = _current_span.set(span)
+    with _open_spans_lock:
+        _open_spans[key] = (span, token)
+
+def _close_callback_span(key, error=None):
+    with _open_spans_lock:
+        entry = _open_spans.pop(key, None)
+    if entry is None:
+        return None
+    span, token = entry
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # The closing callback runs in another context than the opening one.
+        _current_span.set(span.parent)
+    if error is not None:
+        span.error = error
+    span.end()
+    return span
+
+def _model_key(callback_context):
+    return ("llm", callback_context.invocation_id, callback_context.agent_name)
+
+def trace_model_start(callback_context, llm_request):
+    """before_model_callback: opens an `llm.<agent>` span."""
+    span = tracer.start_span(f"llm.{callback_context.agent_name}", attributes={
+        "agent": callback_context.agent_name,
+        "invocation_id": callback_context.invocation_id,
+        "contents": len(llm_request.contents),
+    })
+    _open_callback_span(_model_key(callback_context), span)
+    return None
+
+def trace_model_end(callback_context, llm_response):
+    """after_model_callback: closes the `llm.<agent>` span and records token usage."""
+    with _open_spans_lock:
+        entry = _open_spans.get(_model_key(callback_context))
+    if entry is None:
+        return None
+    span = entry[0]
+    usage = llm_response.usage_metadata
+    if usage is not None:
+        span.set_attribute("prompt_tokens", usage.prompt_token_count or 0)
+        span.set_attribute("output_tokens", usage.candidates_token_count or 0)
+    error = f"{llm_response.error_code}: {llm_response.error_message}" if llm_response.error_code else None
+    _close_callback_span(_model_key(callback_context), error)
+    return None
+
+def trace_model_error(callback_context, llm_request, error):
+    """on_model_error_callback: ends the `llm.<agent>` span of a model call that raised."""
+    _close_callback_span(_model_key(callback_context), f"{type(error).__name__}: {error}")
+    return None
+
+def _tool_span_name(tool):
+    # AgentTool hops show up as agent_tool.<specialist>, plain functions as tool.<name>.
+    from google.adk.tools.agent_tool import AgentTool
+    kind = "agent_tool" if isinstance(tool, AgentTool) else "tool"
+    return f"{kind}.{tool.name}"
+
+def _tool_key(tool, tool_context):
+    return ("tool", tool_context.invocation_id, tool_context.function_call_id or tool.name)
+
+def trace_tool_start(tool, args, tool_context):
+    """before_tool_callback: opens a span around one tool (or AgentTool) call."""
+    span = tracer.start_span(_tool_span_name(tool), attributes={
+        "tool": tool.name,
+        "agent": tool_context.agent_name,
+        "function_call_id": tool_context.function_call_id or "",
+    })
+    _open_callback_span(_tool_key(tool, tool_context), span)
+    return None
+
+def trace_tool_end(tool, args, tool_context, tool_response):
+    """after_tool_callback: closes the tool span, marking `{"status": "error"}` results."""
+    error = None
+    if isinstance(tool_response, dict) and tool_response.get("status") == "error":
+        error = str(tool_response.get("message"))
+    _close_callback_span(_tool_key(tool, tool_context), error)
+    return None
+
+def trace_tool_error(tool, args, tool_context, error):
+    """on_tool_error_callback: ends the span of a tool call that raised."""
+    _close_callback_span(_tool_key(tool, tool_context), f"{type(error).__name__}: {error}")
+    return None
+
+
+# --- Process-wide tracer ---
+_run_id = time.strftime("%Y-%m-%d-%H%M%S")
+TRACE_PATH = os.path.join(TRACE_DIR, f"spans-{_run_id}.jsonl")
+METRICS_PATH = os.path.join(TRACE_DIR, f"latency-{_run_id}.prom")
+
+tracer = Tracer(OtlpJsonFileExporter(TRACE_PATH) if TRACING_ENABLED else None)
+# Spans still buffered are appended to the trace file at exit. The .prom
+# summary is only written by the entry points that ask for it.
+atexit.register(tracer.shutdown)
+
+def write_metrics_at_exit(metrics_path=METRICS_PATH):
+    """Writes the per-stage latencies as Prometheus text when the process exits."""
+    atexit.register(tracer.shutdown, metrics_path)
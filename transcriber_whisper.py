@@ -1,8 +1,13 @@
+import time
+import heapq
+import queue
+import threading
 import webrtcvad
-import collections
 import numpy as np
-import pyaudio
-import whisper
+
+from model_manager import get_model_manager
+from tracing import tracer
+from endpointing import AdaptiveEndpointer
 
 # --- VAD & Audio Configuration ---
 VAD_AGGRESSIVENESS = 3      # 0 (least aggressive) to 3 (most aggressive)
@@ -16,79 +21,576 @@ SAMPLE_WIDTH = 2  # 16-bit audio
 MODEL_TYPE = "base"
 LANGUAGE = "en"
 
-# --- Global State ---
-model = None
+# --- Streaming Configuration ---
+STREAM_WINDOW_SECONDS = 8.0   # Longest stretch of audio decoded in one partial pass
+STREAM_OVERLAP_SECONDS = 1.0  # Audio carried over into the next window when it slides
+STREAM_STEP_MS = 600          # How much new audio triggers another partial decode
+
+# --- Pipeline Configuration ---
+DECODER_WORKERS = 1           # Threads pulling finished utterances off the queue
+UTTERANCE_QUEUE_SIZE = 8      # Utterances waiting for a decoder before backpressure kicks in
+OVERFLOW_POLICY = "drop_oldest"  # "drop_oldest" or "drop_newest" when the queue is full
+SILENCE_FRAMES = 50           # ~1.5 seconds of silence ends an utterance (offline paths; live capture adapts it)
+
 
-def initialize_model():
-    """Loads the Whisper model into memory."""
-    global model
-    if model is None:
-        print(f"Loading Whisper model '{MODEL_TYPE}'...")
-        model = whisper.load_model(MODEL_TYPE)
-        print("Model loaded successfully.")
+def initialize_model(replicas=1):
+    """
+    Loads and warms the Whisper model through the shared model manager.
+    Whisper installs hooks on the model during transcribe(), so each decoder
+    thread that should run concurrently needs its own replica.
+    """
+    get_model_manager().preload(MODEL_TYPE, replicas=replicas)
 
 def transcribe_audio(audio_data):
-    """Transcribes a byte buffer of audio data using the Whisper model."""
-    audio_np = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-    result = model.transcribe(audio_np, language=LANGUAGE, fp16=False)
-    return result['text'].strip()
+    """
+    Transcribes 16-bit audio using the Whisper model. Accepts a byte buffer or
+    an int16 array (e.g. a zero-copy view into a `segmentation.AudioRingBuffer`).
+    """
+    if isinstance(audio_data, np.ndarray):
+        audio_np = audio_data.astype(np.float32) / 32768.0
+    else:
+        audio_np = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+    return get_model_manager().transcribe(audio_np, MODEL_TYPE, language=LANGUAGE)
+
+def _normalize_word(word):
+    """Lower-cases a word and strips punctuation so hypotheses can be compared."""
+    return "".join(ch for ch in word.lower() if ch.isalnum())
+
+def _common_prefix_length(a, b):
+    """Number of leading words two hypotheses agree on."""
+    n = 0
+    for left, right in zip(a, b):
+        if _normalize_word(left) != _normalize_word(right):
+            break
+        n += 1
+    return n
 
-def run_transcription(callback_function):
+def _overlap_length(committed, hypothesis, max_words=12):
     """
-    Main function to start listening and transcribing with VAD.
+    Number of leading words of `hypothesis` that repeat the tail of `committed`.
+    Used to drop words re-decoded from the overlap after the window slides.
+    """
+    limit = min(len(committed), len(hypothesis), max_words)
+    for k in range(limit, 0, -1):
+        if _common_prefix_length(committed[-k:], hypothesis[:k]) == k:
+            return k
+    return 0
+
+
+class StreamingTranscriber:
+    """
+    Decodes an utterance incrementally while the speaker is still talking.
+
+    Audio is decoded in overlapping windows every `step_ms`. Words that two
+    consecutive hypotheses agree on are committed and never change again; the
+    remaining tail is reported as an unstable partial. When the window grows
+    past `window_seconds` the current hypothesis is committed and decoding
+    continues from the last `overlap_seconds` of audio.
+    """
+
+    def __init__(self, window_seconds=STREAM_WINDOW_SECONDS, overlap_seconds=STREAM_OVERLAP_SECONDS,
+                 step_ms=STREAM_STEP_MS, partial_callback=None):
+        bytes_per_second = SAMPLE_RATE * SAMPLE_WIDTH
+        self.window_bytes = int(window_seconds * bytes_per_second)
+        self.overlap_bytes = int(overlap_seconds * bytes_per_second)
+        self.step_bytes = int(step_ms / 1000 * bytes_per_second)
+        self.partial_callback = partial_callback
+        self.metrics = {}
+        self.reset()
+
+    def reset(self):
+        """Clears all state so the next utterance starts fresh."""
+        self._audio = bytearray()
+        self._window_start = 0
+        self._last_decode_end = 0
+        self._committed = []
+        self._window_committed = 0
+        self._window_skip = 0
+        self._previous = []
+        self._started_at = None
+        self._decodes = 0
+        self._first_partial_at = None
+
+    def start(self):
+        """Marks speech onset; time-to-first-partial is measured from here."""
+        self.reset()
+        self._started_at = time.perf_counter()
+
+    def add_frame(self, audio_frame):
+        """
+        Appends captured audio (one frame or several joined frames) and runs a
+        partial decode when enough new audio arrived since the last one.
+        """
+        if self._started_at is None:
+            self.start()
+        self._audio.extend(audio_frame)
+        if len(self._audio) - self._last_decode_end >= self.step_bytes:
+            self._decode_partial()
+
+    def _decode_window(self):
+        """Decodes the current window and returns its words with the overlap removed."""
+        self._last_decode_end = len(self._audio)
+        self._decodes += 1
+        words = transcribe_audio(bytes(self._audio[self._window_start:])).split()
+        if self._window_committed == 0 and self._window_start > 0:
+            self._window_skip = _overlap_length(self._committed, words)
+        return words[self._window_skip:]
+
+    def _decode_partial(self):
+        hypothesis = self._decode_window()
+
+        agreed = _common_prefix_length(hypothesis, self._previous)
+        if agreed > self._window_committed:
+            self._committed.extend(hypothesis[self._window_committed:agreed])
+            self._window_committed = agreed
+        self._previous = hypothesis
+
+        if self.partial_callback is not None and hypothesis:
+            if self._first_partial_at is None:
+                self._first_partial_at = time.perf_counter()
+            stable = " ".join(self._committed)
+            unstable = " ".join(hypothesis[self._window_committed:])
+            self.partial_callback(stable, unstable)
+
+        if len(self._audio) - self._window_start > self.window_bytes:
+            # The window is full: trust the whole hypothesis and slide forward.
+            self._committed.extend(hypothesis[self._window_committed:])
+            self._window_start = max(0, len(self._audio) - self.overlap_bytes)
+            self._window_committed = 0
+            self._window_skip = 0
+            self._previous = []
+
+    def finalize(self):
+        """Decodes whatever is left once silence is confirmed and returns the full transcript."""
+        finalize_started = time.perf_counter()
+        words = list(self._committed)
+        if len(self._audio) > self._window_start:
+            hypothesis = self._decode_window()
+            words.extend(hypothesis[self._window_committed:])
+        finished = time.perf_counter()
+
+        self.metrics = {
+            "audio_seconds": len(self._audio) / (SAMPLE_RATE * SAMPLE_WIDTH),
+            "decodes": self._decodes,
+            "time_to_first_partial_ms": (
+                (self._first_partial_at - self._started_at) * 1000
+                if self._first_partial_at is not None and self._started_at is not None else None
+            ),
+            "time_to_final_ms": (finished - finalize_started) * 1000,
+        }
+        self.reset()
+        return " ".join(words).strip()
+
+
+class UtteranceSegmenter:
+    """
+    Turns per-frame VAD decisions into utterance boundaries.
+
+    `push` returns "start" on the first speech frame, "end" once more than
+    `silence_frames` consecutive non-speech frames followed it, and None
+    otherwise. Every frame from "start" through "end" belongs to the
+    utterance. The live pipeline and the offline batch path share this so
+    both cut recordings the same way.
+    """
+
+    def __init__(self, silence_frames=SILENCE_FRAMES):
+        self.silence_frames = silence_frames
+        self.is_speaking = False
+        self.silence_counter = 0
+
+    def push(self, is_speech):
+        if not self.is_speaking:
+            if not is_speech:
+                return None
+            self.is_speaking = True
+            self.silence_counter = 0
+            return "start"
+        if is_speech:
+            self.silence_counter = 0
+            return None
+        self.silence_counter += 1
+        if self.silence_counter > self.silence_frames:
+            self.is_speaking = False
+            return "end"
+        return None
+
+
+def _print_partial(stable, unstable):
+    print(f"PARTIAL: {stable} [{unstable}]", end='\r')
+
+def _print_stream_metrics(metrics):
+    first_partial = metrics["time_to_first_partial_ms"]
+    first_partial = f"{first_partial:.0f} ms" if first_partial is not None else "n/a"
+    print(f"STREAM: {metrics['audio_seconds']:.1f}s audio, {metrics['decodes']} decodes, "
+          f"first partial {first_partial}, final {metrics['time_to_final_ms']:.0f} ms")
+
+class TranscriptionPipeline:
+    """
+    Producer/consumer pipeline that keeps the microphone drained.
+
+    A capture thread only reads frames and runs VAD. Finished utterances go
+    onto a bounded queue that a pool of decoder threads works through, and
+    transcripts are handed to `callback_function` by a separate dispatcher
+    thread in the order they were spoken. Neither Whisper nor the callback
+    can stall capture; when decoders fall behind, the queue applies
+    `overflow_policy` and the drop is counted instead.
+
+    In streaming mode the capture thread forwards frames to a single
+    streaming worker that drives a `StreamingTranscriber`.
     """
-    initialize_model()
-    vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
-    pa = pyaudio.PyAudio()
-
-    stream = pa.open(format=pyaudio.paInt16,
-                     channels=CHANNELS,
-                     rate=SAMPLE_RATE,
-                     input=True,
-                     frames_per_buffer=FRAME_SIZE)
-
-    print("\n--- AI Assistant is listening. Say 'exit' to quit. ---")
-    
-    while True:
-        frames = collections.deque()
-        is_speaking = False
-        silence_counter = 0
-        
-        # --- Listen for speech ---
+
+    def __init__(self, callback_function, streaming=False, partial_callback=None,
+                 decoder_workers=DECODER_WORKERS, queue_size=UTTERANCE_QUEUE_SIZE,
+                 overflow_policy=OVERFLOW_POLICY):
+        if overflow_policy not in ("drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self.callback_function = callback_function
+        self.streaming = streaming
+        self.partial_callback = partial_callback or _print_partial
+        self.decoder_workers = decoder_workers
+        self.overflow_policy = overflow_policy
+
+        self._utterances = queue.Queue(maxsize=queue_size)
+        self._stream_frames = queue.Queue()
+        self._transcripts = queue.Queue()
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._next_seq = 0
+        self._utterance_spans = {}   # seq -> "voice.utterance" span, closed by the dispatcher
+        # Learns the speaker's pauses; partial transcripts let it end commands sooner.
+        self.endpointer = AdaptiveEndpointer(default_hangover_frames=SILENCE_FRAMES)
+        self._stream_utterance = None
+        self._model_error = None     # Set if the background model load fails
+        self.stats = {
+            "frames_captured": 0,
+            "input_overflows": 0,
+            "utterances_captured": 0,
+            "utterances_dropped": 0,
+            "utterances_decoded": 0,
+            "empty_transcripts": 0,
+            "queue_high_watermark": 0,
+            "callback_errors": 0,
+            "decode_errors": 0,
+        }
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    # --- Producer ---
+
+    def _read_frame(self, stream):
+        try:
+            return stream.read(FRAME_SIZE, exception_on_overflow=True)
+        except IOError:
+            # PortAudio dropped input because we were not reading fast enough.
+            self._count("input_overflows")
+            return None
+
+    def _enqueue_utterance(self, audio, utterance_span):
+        seq = self._next_seq
+        self._next_seq += 1
+        self._count("utterances_captured")
+        self._utterance_spans[seq] = utterance_span
+        item = (seq, audio, time.time_ns())
+        try:
+            self._utterances.put_nowait(item)
+        except queue.Full:
+            if self.overflow_policy == "drop_oldest":
+                try:
+                    dropped_seq, _, _ = self._utterances.get_nowait()
+                    self._drop(dropped_seq)
+                except queue.Empty:
+                    pass
+                try:
+                    self._utterances.put_nowait(item)
+                except queue.Full:
+                    self._drop(seq)
+            else:
+                self._drop(seq)
+        with self._stats_lock:
+            depth = self._utterances.qsize()
+            if depth > self.stats["queue_high_watermark"]:
+                self.stats["queue_high_watermark"] = depth
+
+    def _drop(self, seq):
+        self._count("utterances_dropped")
+        print(f"\nWARNING: decoder backlog full, dropped utterance #{seq}.")
+        span = self._utterance_spans.pop(seq, None)
+        if span is not None:
+            span.error = "dropped: decoder backlog full"
+            span.end()
+        # The dispatcher still needs to hear about the gap to keep ordering.
+        self._transcripts.put((seq, None))
+
+    def _decode_failed(self, seq, error):
+        self._count("decode_errors")
+        print(f"\nERROR: Decoding utterance #{seq} failed, skipping it. {error}")
+        span = self._utterance_spans.pop(seq, None)
+        if span is not None:
+            span.error = f"decode failed: {error}"
+            span.end()
+        # As with a drop, the dispatcher must still see the gap or it would wait forever.
+        self._transcripts.put((seq, None))
+
+    def _capture_loop(self, stream, vad):
+        segmenter = self.endpointer
+        frames = []
+        utterance_span = capture_span = None
         print("LISTENING...")
-        while True:
-            audio_frame = stream.read(FRAME_SIZE)
-            if vad.is_speech(audio_frame, SAMPLE_RATE):
-                is_speaking = True
+        while not self._stop.is_set():
+            audio_frame = self._read_frame(stream)
+            if audio_frame is None:
+                continue
+            self._count("frames_captured")
+            vad_started = time.perf_counter()
+            event = segmenter.push(vad.is_speech(audio_frame, SAMPLE_RATE))
+            tracer.record("segmentation.frame", time.perf_counter() - vad_started)
+
+            if event == "start":
                 print("Speaking detected, recording...", end='\r')
+                # One trace per utterance: capture, endpointing and decode hang off it.
+                utterance_span = tracer.start_span("voice.utterance", parent=None)
+                capture_span = tracer.start_span("voice.capture", parent=utterance_span)
+                if self.streaming:
+                    self._stream_frames.put(("start", segmenter.utterances))
+            if event is None and not segmenter.is_speaking:
+                continue
+
+            if self.streaming:
+                self._stream_frames.put(("frame", audio_frame))
+            else:
                 frames.append(audio_frame)
+
+            if event == "end":
+                print("\nSilence detected, processing...")
+                # The trailing silence the endpointer waited out before ending the utterance.
+                now_ns = time.time_ns()
+                endpoint = segmenter.last_endpoint
+                tracer.start_span("voice.endpoint_silence", parent=utterance_span,
+                                  start_ns=now_ns - endpoint["delay_ms"] * 1_000_000,
+                                  attributes=endpoint).end(now_ns)
+                capture_span.end(now_ns)
+                if self.streaming:
+                    self._stream_frames.put(("end", utterance_span))
+                else:
+                    capture_span.set_attribute("frames", len(frames))
+                    self._enqueue_utterance(b"".join(frames), utterance_span)
+                    frames = []
+                print("LISTENING...")
+
+    # --- Consumers ---
+
+    def _decoder_loop(self):
+        while True:
+            item = self._utterances.get()
+            if item is None:
                 break
-        
-        # --- Record while speaking ---
-        while is_speaking:
-            audio_frame = stream.read(FRAME_SIZE)
-            frames.append(audio_frame)
-            if not vad.is_speech(audio_frame, SAMPLE_RATE):
-                silence_counter += 1
-                if silence_counter > 50:  # ~1.5 seconds of silence
-                    is_speaking = False
-                    print("\nSilence detected, processing...")
-            else:
-                silence_counter = 0
-        
-        # --- Transcribe the recorded speech ---
-        recorded_audio = b"".join(list(frames))
-        transcript = transcribe_audio(recorded_audio)
-        
-        if transcript:
-            print("USER SAID:", transcript)
-            if "exit" in transcript.lower():
+            seq, audio, enqueued_ns = item
+            if self._model_error is not None:
+                self._decode_failed(seq, self._model_error)
+                continue
+            utterance_span = self._utterance_spans.get(seq)
+            tracer.start_span("decode.queue_wait", parent=utterance_span, start_ns=enqueued_ns).end()
+            try:
+                with tracer.span("whisper.decode", parent=utterance_span,
+                                 attributes={"audio_seconds": len(audio) / (SAMPLE_RATE * SAMPLE_WIDTH)}):
+                    transcript = transcribe_audio(audio)
+            except Exception as e:
+                self._decode_failed(seq, e)
+                continue
+            self._count("utterances_decoded")
+            self._transcripts.put((seq, transcript))
+
+    def _streaming_loop(self):
+        streamer = StreamingTranscriber(partial_callback=self._on_partial)
+        while True:
+            # Drain whatever queued up while the last partial decode ran so a
+            # lagging worker catches up with one decode, not one per frame.
+            messages = [self._stream_frames.get()]
+            while True:
+                try:
+                    messages.append(self._stream_frames.get_nowait())
+                except queue.Empty:
+                    break
+
+            chunk = []
+            for kind, payload in messages:
+                if kind == "frame":
+                    chunk.append(payload)
+                    continue
+                if chunk:
+                    self._stream_add(streamer, b"".join(chunk))
+                    chunk = []
+                if kind == "stop":
+                    return
+                if kind == "start":
+                    self._stream_utterance = payload
+                    streamer.start()
+                elif kind == "end":
+                    seq = self._next_seq
+                    self._next_seq += 1
+                    self._count("utterances_captured")
+                    self._utterance_spans[seq] = payload
+                    if self._model_error is not None:
+                        streamer.reset()
+                        self._decode_failed(seq, self._model_error)
+                        continue
+                    try:
+                        with tracer.span("whisper.decode", parent=payload, attributes={"streaming": True}):
+                            transcript = streamer.finalize()
+                    except Exception as e:
+                        streamer.reset()
+                        self._decode_failed(seq, e)
+                        continue
+                    _print_stream_metrics(streamer.metrics)
+                    self._count("utterances_decoded")
+                    self._transcripts.put((seq, transcript))
+            if chunk:
+                self._stream_add(streamer, b"".join(chunk))
+
+    def _stream_add(self, streamer, audio):
+        # A failed partial decode only costs a partial; the audio is kept and finalize retries it.
+        try:
+            streamer.add_frame(audio)
+        except Exception as e:
+            self._count("decode_errors")
+            print(f"\nERROR: Partial decode failed. {e}")
+
+    def _on_partial(self, stable, unstable):
+        self.endpointer.hint(f"{stable} {unstable}", self._stream_utterance)
+        self.partial_callback(stable, unstable)
+
+    def _dispatch_loop(self):
+        next_seq = 0
+        pending = []
+        while True:
+            item = self._transcripts.get()
+            if item is None:
                 break
-            # Call the main application logic with the transcribed text
-            callback_function(transcript)
-
-    # --- Cleanup ---
-    stream.stop_stream()
-    stream.close()
-    pa.terminate()
-    print("Transcription stopped.")
+            heapq.heappush(pending, item)
+            while pending and pending[0][0] == next_seq:
+                seq, transcript = heapq.heappop(pending)
+                next_seq += 1
+                if transcript is None:
+                    continue
+                utterance_span = self._utterance_spans.pop(seq, None)
+                if not transcript:
+                    self._count("empty_transcripts")
+                    if utterance_span is not None:
+                        utterance_span.set_attribute("empty", True)
+                        utterance_span.end()
+                    continue
+                print("USER SAID:", transcript)
+                if "exit" in transcript.lower():
+                    if utterance_span is not None:
+                        utterance_span.end()
+                    self._stop.set()
+                    return
+                try:
+                    # Call the main application logic with the transcribed text. The
+                    # utterance span is current so the callback can continue the trace.
+                    with tracer.use_span(utterance_span):
+                        self.callback_function(transcript)
+                except Exception as e:
+                    self._count("callback_errors")
+                    print(f"ERROR: Callback failed for '{transcript}'. {e}")
+                finally:
+                    if utterance_span is not None:
+                        utterance_span.set_attribute("transcript_chars", len(transcript))
+                        utterance_span.end()
+
+    # --- Lifecycle ---
+
+    def _warm_up_model(self, replicas):
+        started = time.perf_counter()
+        try:
+            initialize_model(replicas=replicas)
+            self.stats["model_ready_seconds"] = round(time.perf_counter() - started, 2)
+            print(f"\nWhisper model ready after {self.stats['model_ready_seconds']}s.")
+        except Exception as e:
+            # Without a model nothing can be transcribed: stop instead of listening on.
+            print(f"\nERROR: Whisper model failed to load, stopping. {e}")
+            self._model_error = e
+            self._stop.set()
+            self._transcripts.put(None)
+
+    def run(self):
+        """Starts capture and the worker threads, blocking until the user says 'exit'."""
+        # PyAudio is only needed for live capture; batch and server modes never import it.
+        import pyaudio
+
+        # Load and warm up Whisper in the background so capture starts right away.
+        # Utterances spoken meanwhile wait in the queue; the first decode blocks
+        # until the model is ready (ModelManager serialises loads per model).
+        # If the load fails the pipeline stops and run() raises the error.
+        warmup = threading.Thread(
+            target=self._warm_up_model, args=(1 if self.streaming else self.decoder_workers,),
+            name="model-warmup", daemon=True,
+        )
+        warmup.start()
+        vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+        pa = pyaudio.PyAudio()
+
+        stream = pa.open(format=pyaudio.paInt16,
+                         channels=CHANNELS,
+                         rate=SAMPLE_RATE,
+                         input=True,
+                         frames_per_buffer=FRAME_SIZE)
+
+        if self.streaming:
+            workers = [threading.Thread(target=self._streaming_loop, name="stream-decoder", daemon=True)]
+        else:
+            workers = [
+                threading.Thread(target=self._decoder_loop, name=f"decoder-{i}", daemon=True)
+                for i in range(self.decoder_workers)
+            ]
+        dispatcher = threading.Thread(target=self._dispatch_loop, name="dispatcher", daemon=True)
+        capture = threading.Thread(target=self._capture_loop, args=(stream, vad), name="capture", daemon=True)
+        for thread in workers + [dispatcher, capture]:
+            thread.start()
+
+        print("\n--- AI Assistant is listening. Say 'exit' to quit. ---")
+        try:
+            dispatcher.join()
+        finally:
+            self._stop.set()
+            capture.join()
+            if self.streaming:
+                self._stream_frames.put(("stop", None))
+            else:
+                for _ in workers:
+                    self._utterances.put(None)
+            self._transcripts.put(None)
+
+            # --- Cleanup ---
+            stream.stop_stream()
+            stream.close()
+            pa.terminate()
+            print(f"Pipeline stats: {self.stats}")
+            print(f"Endpointing: {self.endpointer.stats()}")
+            print(f"Model stats: {get_model_manager().metrics()}")
+            print(f"Stage latency: {tracer.metrics.summary()}")
+            print("Transcription stopped.")
+        if self._model_error is not None:
+            raise self._model_error
+
+
+def run_transcription(callback_function, streaming=False, partial_callback=None,
+                      decoder_workers=DECODER_WORKERS, queue_size=UTTERANCE_QUEUE_SIZE):
+    """
+    Main function to start listening and transcribing with VAD.
+
+    With `streaming=True` the utterance is decoded in overlapping windows while
+    the user is still speaking, partial hypotheses go to `partial_callback`, and
+    only the remaining tail is decoded once silence is confirmed.
+    """
+    pipeline = TranscriptionPipeline(
+        callback_function,
+        streaming=streaming,
+        partial_callback=partial_callback,
+        decoder_workers=decoder_workers,
+        queue_size=queue_size,
+    )
+    pipeline.run()
+    return pipeline.stats